@@ -1,11 +1,39 @@
 #!/usr/bin/env python3
 import os
 import json
+import mmap
 import time
-from typing import Dict, Any, List, Optional
-from fastapi import FastAPI, HTTPException
+import codecs
+import asyncio
+import hashlib
+import tempfile
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from typing import Dict, Any, List, Literal, Optional, Union
+
+# Sets thread-count variables that numpy/torch/tokenizers read on import, so it comes first
+from chonkie_cpu import cpu_budget, configure_torch, thread_pool_workers
+
+from fastapi import FastAPI, HTTPException, Request, Response, UploadFile, File, Form, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field, ValidationError, model_validator
+
+from chonkie_semantic import VectorizedSemanticChunker, AutoThresholdSemanticChunker
+from chonkie_timing import StageTimer, activate, stage, instrument_chunker, profiled
+from chonkie_code import CachedCodeChunker, code_chunker_cache
+from chonkie_dedup import deduplicate
+from chonkie_late import CachedLateChunker, token_embedding_cache
+from chonkie_slumber import ConcurrentSlumberChunker, MAX_LLM_CONCURRENCY, get_decision_cache, make_genie
+from chonkie_cancel import ChunkCancelled, run_cancellable
+from chonkie_coalesce import SingleFlight
+from chonkie_select import select_config, throughput_tracker
+from chonkie_parallel import ParallelChunker, default_workers
+from chonkie_pipeline import PipelineChunker
+from chonkie_extract import SectionChunker, detect_format, iter_sections
+from chonkie_encode import JSON_MEDIA_TYPE, MSGPACK_MEDIA_TYPE, ARROW_MEDIA_TYPE, negotiate, encode
+from chonkie_stream import StreamingChunker, STREAM_HOLDBACK_CHUNKS, DEFAULT_HOLDBACK_CHUNKS, UNSTREAMABLE_CHUNKERS
+from chonkie_sweep import SweepPrecompute, DEFAULT_BOUNDARY_TOLERANCE, expand_grid, run_sweep
+from chonkie_jobs import ChunkJobStore, ChunkJobStatus, TERMINAL_STATUSES, job_status_payload
 
 try:
     import chonkie
@@ -24,14 +52,17 @@ app.add_middleware(
 )
 
 class ChunkConfig(BaseModel):
-    chunkerType: str = 'TokenChunker'
+    chunkerType: str = 'TokenChunker'  # Or "auto" to pick one that fits latencyBudgetMs
     chunkSize: Optional[int] = 512
     chunkOverlap: Optional[int] = 0
     tokenizerType: Optional[str] = 'CharacterTokenizer'
     embeddingProvider: Optional[str] = 'sentence-transformers'
     embeddingModel: Optional[str] = 'all-MiniLM-L6-v2'
-    semanticThreshold: Optional[float] = 0.5
+    semanticThreshold: Optional[Union[float, Literal['auto']]] = 0.5  # Or "auto" to pick one from the similarity curve
+    targetChunks: Optional[int] = None  # Auto threshold: aim for this many chunks
+    thresholdPercentile: Optional[float] = None  # Auto threshold: split in the lowest N% of similarities
     language: Optional[str] = 'auto'
+    latencyBudgetMs: Optional[float] = None  # chunkerType="auto" only
 
     # Advanced parameters
     similarityWindow: Optional[int] = 3
@@ -43,24 +74,152 @@ class ChunkConfig(BaseModel):
     neuralModel: Optional[str] = None
     deviceMap: Optional[str] = 'auto'
     stride: Optional[int] = None
+    vectorizedBoundaries: Optional[bool] = False  # Opt-in: pool windows from sentence embeddings (exact only for linear embedders)
+    chunkSizes: Optional[List[int]] = None  # LateChunker: chunk at several sizes, encoding the document once
+    genie: Optional[str] = None  # SlumberChunker: 'openai' or 'gemini' (default from CHONKIE_GENIE)
+    genieModel: Optional[str] = None
+    candidateSize: Optional[int] = None  # SlumberChunker: max tokens per candidate passage
+    llmConcurrency: Optional[int] = None  # SlumberChunker: LLM calls in flight, capped by CHONKIE_LLM_CONCURRENCY
+
+class DedupOptions(BaseModel):
+    mode: Literal['flag', 'drop'] = 'flag'  # 'flag' marks duplicates, 'drop' removes them
+    threshold: float = Field(0.9, gt=0, le=1)  # Estimated Jaccard similarity of word 3-grams
+
+class PipelineStage(BaseModel):
+    mode: Literal['split', 'pack'] = 'split'  # 'split' re-chunks each span; 'pack' merges neighbouring spans up to chunkSize tokens
+    config: ChunkConfig
+
+    @model_validator(mode='after')
+    def _check_stage(self):
+        if self.mode == 'pack' and (self.config.chunkSize is None or self.config.chunkSize <= 0):
+            raise ValueError("pack stages need a positive chunkSize")
+        if self.mode == 'split' and self.config.chunkerType == 'auto':
+            raise ValueError("chunkerType 'auto' is only supported for the first stage")
+        return self
 
 class ChunkRequest(BaseModel):
-    text: str
+    text: Optional[str] = None
+    path: Optional[str] = None  # File under CHONKIE_FILE_ROOTS, read instead of `text`
     config: ChunkConfig
     override_limit: Optional[bool] = False
+    dedup: Optional[DedupOptions] = None
+    include_content: Optional[bool] = True  # False returns offsets only
+    parallel: Optional[bool] = False  # Chunk a large document across worker processes
+    pipeline: Optional[List[PipelineStage]] = None  # Further stages applied to the chunks from `config`
+
+class ChunkBatchRequest(BaseModel):
+    texts: List[str]
+    config: ChunkConfig
+    override_limit: Optional[bool] = False
+    dedup: Optional[DedupOptions] = None
 
 class ChunkResult(BaseModel):
-    content: str
+    content: Optional[str] = None
     index: int
     start_index: int
     end_index: int
     token_count: Optional[int] = None
+    duplicate_of: Optional[Dict[str, int]] = None  # Canonical chunk's document and index
+    embedding: Optional[List[float]] = None  # LateChunker: chunk embedding pooled from document tokens
+
+class ChunkVariant(BaseModel):
+    chunk_size: int
+    chunks: List[ChunkResult]
+    total_chunks: int
 
 class ChunkResponse(BaseModel):
     chunks: List[ChunkResult]
     total_chunks: int
     processing_time: float
     config: dict
+    timings: Optional[Dict[str, float]] = None  # Per-stage milliseconds
+    profile: Optional[str] = None  # cProfile summary when ?profile=1
+    similarity_curve: Optional[List[float]] = None  # semanticThreshold="auto" only
+    threshold_selection: Optional[Dict[str, Any]] = None  # semanticThreshold="auto" only
+    dedup: Optional[Dict[str, Any]] = None
+    selection: Optional[Dict[str, Any]] = None  # chunkerType="auto": chosen chunker and predicted cost
+    variants: Optional[List[ChunkVariant]] = None  # LateChunker with chunkSizes: one entry per size
+    embedding_cache_hit: Optional[bool] = None  # LateChunker: document token embeddings came from the cache
+
+class FileChunkResult(ChunkResult):
+    page_start: int  # Page (PDF) or section (DOCX, HTML) the chunk starts in
+    page_end: int
+    page_offset: int  # Offset of the chunk start within page_start's text
+    section_title: Optional[str] = None  # Heading of that section (DOCX, HTML)
+
+class FileChunkResponse(BaseModel):
+    chunks: List[FileChunkResult]
+    total_chunks: int
+    format: str
+    sections: List[Dict[str, Any]]  # number, title, start_index, chars per page/section
+    total_sections: int
+    extracted_chars: int
+    truncated: bool = False  # Extraction stopped at CHONKIE_FILE_MAX_CHARS
+    processing_time: float
+    config: dict
+    timings: Optional[Dict[str, float]] = None
+    selection: Optional[Dict[str, Any]] = None
+
+class SweepRequest(BaseModel):
+    texts: Optional[List[str]] = None  # Sample corpus
+    paths: Optional[List[str]] = None  # Or files under CHONKIE_FILE_ROOTS
+    config: ChunkConfig  # Base config; grid values override its fields
+    grid: Dict[str, List[Any]]  # ChunkConfig field -> values to try, e.g. {"chunkSize": [256, 512]}
+    override_limit: Optional[bool] = False
+    boundary_tolerance: Optional[int] = DEFAULT_BOUNDARY_TOLERANCE  # Chars within which boundaries match
+    workers: Optional[int] = None  # Grid points run at once (default: CPU budget)
+
+class SweepPointResult(BaseModel):
+    params: Dict[str, Any]
+    total_chunks: Optional[int] = None
+    token_count: Optional[Dict[str, float]] = None  # Distribution: min, p10, p50, p90, max, mean, std
+    chars: Optional[Dict[str, float]] = None
+    over_chunk_size: Optional[float] = None  # Share of chunks with more tokens than chunkSize
+    boundary_stability: Optional[float] = None  # Mean boundary F1 against neighbouring grid points
+    stability_by_param: Optional[Dict[str, float]] = None
+    seconds: Optional[float] = None
+    chars_per_second: Optional[int] = None
+    error: Optional[str] = None
+
+class SweepResponse(BaseModel):
+    points: List[SweepPointResult]
+    total_points: int
+    documents: int
+    total_chars: int
+    boundary_tolerance: int
+    workers: int
+    precompute: Dict[str, Any]  # Sentence splits and embeddings computed vs shared
+    processing_time: float
+
+class CodeFile(BaseModel):
+    path: str  # Used for extension-based language detection
+    content: str
+
+class CodeRepositoryRequest(BaseModel):
+    files: List[CodeFile]
+    config: ChunkConfig
+    override_limit: Optional[bool] = False
+
+class CodeFileResult(BaseModel):
+    path: str
+    language: Optional[str] = None
+    chunks: List[ChunkResult] = []
+    total_chunks: int = 0
+    error: Optional[str] = None
+
+class CodeRepositoryResponse(BaseModel):
+    files: List[CodeFileResult]
+    total_files: int
+    total_chunks: int
+    languages: Dict[str, int]
+    processing_time: float
+    cache: Dict[str, Any]
+
+class ChunkBatchResponse(BaseModel):
+    results: List[ChunkResponse]
+    total_chunks: int
+    processing_time: float
+    dedup: Optional[Dict[str, Any]] = None
 
 def get_embeddings(embedding_provider: str = 'sentence-transformers', **kwargs):
     """Get embeddings based on provider"""
@@ -111,8 +270,8 @@ def get_tokenizer(tokenizer_type: str = 'CharacterTokenizer'):
     else:  # Default to CharacterTokenizer
         return chonkie.CharacterTokenizer()
 
-def create_chunker(config: ChunkConfig):
-    """Create chunker based on configuration"""
+def create_chunker(config: ChunkConfig, embeddings=None):
+    """Create chunker based on configuration; `embeddings` reuses an already loaded model"""
     chunk_size = config.chunkSize
     chunk_overlap = config.chunkOverlap
 
@@ -139,10 +298,12 @@ def create_chunker(config: ChunkConfig):
         return chonkie.RecursiveChunker(**params)
 
     elif config.chunkerType == 'SemanticChunker':
-        embeddings = get_embeddings(
-            config.embeddingProvider,
-            model=config.embeddingModel
-        )
+        if embeddings is None:
+            with stage('model_load'):
+                embeddings = get_embeddings(
+                    config.embeddingProvider,
+                    model=config.embeddingModel
+                )
         threshold = config.semanticThreshold
 
         # Get advanced semantic parameters (use defaults if None)
@@ -158,16 +319,26 @@ def create_chunker(config: ChunkConfig):
         elif include_delim is None or include_delim not in ['prev', 'next', None]:
             include_delim = "prev"  # Default to "prev" to preserve sentence-ending punctuation
 
-        return chonkie.SemanticChunker(
-            embedding_model=embeddings,
-            threshold=threshold,
-            chunk_size=chunk_size,
-            similarity_window=similarity_window,
-            min_sentences_per_chunk=min_sentences_per_chunk,
-            min_characters_per_sentence=min_characters_per_sentence,
-            include_delim=include_delim,
-            skip_window=0  # Explicitly disable skip window to prevent overlap-like behavior
-        )
+        params = {
+            'embedding_model': embeddings,
+            'chunk_size': chunk_size,
+            'similarity_window': similarity_window,
+            'min_sentences_per_chunk': min_sentences_per_chunk,
+            'min_characters_per_sentence': min_characters_per_sentence,
+            'include_delim': include_delim,
+            'skip_window': 0  # Explicitly disable skip window to prevent overlap-like behavior
+        }
+
+        if threshold == 'auto':
+            return AutoThresholdSemanticChunker(
+                target_chunks=config.targetChunks,
+                threshold_percentile=config.thresholdPercentile,
+                vectorized=bool(config.vectorizedBoundaries),
+                **params
+            )
+
+        chunker_class = VectorizedSemanticChunker if config.vectorizedBoundaries else chonkie.SemanticChunker
+        return chunker_class(threshold=threshold, **params)
 
     elif config.chunkerType == 'NeuralChunker':
         params = {
@@ -178,6 +349,30 @@ def create_chunker(config: ChunkConfig):
             params['min_characters_per_chunk'] = config.minCharactersPerChunk
         return chonkie.NeuralChunker(**params)
 
+    elif config.chunkerType == 'LateChunker':
+        params = {
+            'chunk_size': chunk_size,
+            'model': config.embeddingModel or 'all-MiniLM-L6-v2'
+        }
+        if config.minCharactersPerChunk is not None:
+            params['min_characters_per_chunk'] = config.minCharactersPerChunk
+        # Models and document token embeddings are cached for the process lifetime
+        with stage('model_load'):
+            return CachedLateChunker(**params)
+
+    elif config.chunkerType == 'SlumberChunker':
+        params = {
+            'chunk_size': chunk_size,
+            'genie': make_genie(config.genie, config.genieModel),
+            'max_in_flight': min(config.llmConcurrency or MAX_LLM_CONCURRENCY, MAX_LLM_CONCURRENCY)
+        }
+        if config.candidateSize is not None:
+            params['candidate_size'] = config.candidateSize
+        if config.minCharactersPerChunk is not None:
+            params['min_characters_per_chunk'] = config.minCharactersPerChunk
+        # Split decisions are cached by prompt hash on the data volume
+        return ConcurrentSlumberChunker(**params)
+
     elif config.chunkerType == 'CodeChunker':
         language = getattr(config, 'language', 'auto') or 'auto'
         params = {
@@ -186,13 +381,23 @@ def create_chunker(config: ChunkConfig):
         }
         if config.includeNodes is not None:
             params['include_nodes'] = config.includeNodes
-        return chonkie.CodeChunker(**params)
+        # Parsers and language detection are cached for the process lifetime
+        return CachedCodeChunker(**params)
 
     else:
         # Default to TokenChunker
         tokenizer = get_tokenizer()
         return chonkie.TokenChunker(tokenizer=tokenizer, chunk_size=chunk_size, chunk_overlap=chunk_overlap)
 
+@app.on_event("startup")
+async def fit_thread_pools():
+    # asyncio.to_thread's pool would otherwise be sized from the host's core count
+    asyncio.get_running_loop().set_default_executor(
+        ThreadPoolExecutor(max_workers=thread_pool_workers(cpu_budget), thread_name_prefix='chonkie-request')
+    )
+    # torch has no variable for its inter-op pool, and it can only be set before torch does any work
+    await asyncio.to_thread(configure_torch, cpu_budget)
+
 @app.get("/")
 async def root():
     return {"message": "Chonkie API is running"}
@@ -201,92 +406,1006 @@ async def root():
 async def health():
     return {"status": "healthy"}
 
-@app.post("/chunk", response_model=ChunkResponse)
-async def chunk_text(request: ChunkRequest):
+# Define chunker-specific limits
+CHUNKER_LIMITS = {
+    'TokenChunker': 25000,
+    'SentenceChunker': 25000,
+    'RecursiveChunker': 15000,
+    'SemanticChunker': 8000,
+    'CodeChunker': 20000,
+    'NeuralChunker': 5000,
+    'LateChunker': 5000,
+    'SlumberChunker': 30000,  # LLM calls run concurrently and are cached
+    'auto': 25000  # Candidates over their own limit are skipped
+}
+
+# Budget used by chunkerType="auto" when the request doesn't give one
+DEFAULT_LATENCY_BUDGET_MS = float(os.getenv('CHONKIE_DEFAULT_LATENCY_BUDGET_MS', '5000'))
+
+# Even with override, apply absolute maximum for system stability
+ABSOLUTE_MAX_CHARS = 500000  # 500K absolute maximum
+
+# Directories that `path` requests may read from
+FILE_ROOTS = [
+    os.path.realpath(root)
+    for root in os.getenv('CHONKIE_FILE_ROOTS', '/home/chonkie/data').split(':')
+    if root
+]
+
+# /chunk/file: cap on extracted text, and on the size of an uploaded file
+FILE_MAX_CHARS = int(os.getenv('CHONKIE_FILE_MAX_CHARS', '2000000'))
+FILE_MAX_UPLOAD_BYTES = int(float(os.getenv('CHONKIE_FILE_MAX_UPLOAD_MB', '50')) * 2**20)
+
+# Uploads are spooled (by Starlette, then copied by save_upload) to the temp directory. The image
+# points TMPDIR at the data volume, since a 64 MB /tmp tmpfs fits only one upload at the cap
+if os.getenv('TMPDIR'):
     try:
-        start_time = time.time()
-        
-        if not request.text or not request.text.strip():
-            raise HTTPException(status_code=400, detail="No text provided")
-        
-        # Define chunker-specific limits
-        chunker_limits = {
-            'TokenChunker': 25000,
-            'SentenceChunker': 25000,
-            'RecursiveChunker': 15000,
-            'SemanticChunker': 8000,
-            'CodeChunker': 20000,
-            'NeuralChunker': 5000,
-            'LateChunker': 5000,
-            'SlumberChunker': 3000
-        }
-        
-        # Apply character limits unless overridden
+        os.makedirs(os.environ['TMPDIR'], exist_ok=True)
+    except OSError as e:
+        print(f"[Upload] TMPDIR {os.environ['TMPDIR']} unavailable, uploads fall back to /tmp: {e}")
+UPLOAD_DIR = os.path.realpath(tempfile.gettempdir())
+UPLOAD_PREFIX = 'chonkie-upload-'
+
+# Job mode chunks large documents in segments so progress can be reported.
+# Anything within the per-chunker limits fits in a single segment, so job
+# results only differ from /chunk for override-sized documents.
+JOB_SEGMENT_CHARS = int(os.getenv('CHONKIE_JOB_SEGMENT_CHARS', '50000'))
+SEGMENT_DELIMITERS = ['\n\n', '\n', '. ', ' ']
+
+# Background pool for job mode
+chunk_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv('CHONKIE_WORKERS', str(cpu_budget.threads))),
+    thread_name_prefix='chonkie-job'
+)
+# Parallel mode only pays for its process round-trips on large documents
+PARALLEL_MIN_CHARS = int(os.getenv('CHONKIE_PARALLEL_MIN_CHARS', '100000'))
+PARALLEL_WORKERS = default_workers()
+_parallel_executor = None
+
+def get_parallel_executor() -> ProcessPoolExecutor:
+    """Process pool for parallel mode, started on first use"""
+    global _parallel_executor
+    if _parallel_executor is None:
+        _parallel_executor = ProcessPoolExecutor(max_workers=PARALLEL_WORKERS)
+    return _parallel_executor
+
+# Merges concurrent identical /chunk requests
+chunk_flight = SingleFlight()
+
+# How often a waiting /chunk request checks whether its client is still there
+DISCONNECT_POLL_SECONDS = float(os.getenv('CHONKIE_DISCONNECT_POLL_SECONDS', '0.25'))
+
+# Non-standard status nginx logs for requests the client closed
+CLIENT_CLOSED_REQUEST = 499
+
+# /chunk/stream: new chars needed before the open tail is re-chunked (0 = every fragment)
+STREAM_MIN_STEP_CHARS = int(os.getenv('CHONKIE_STREAM_MIN_STEP_CHARS', '0'))
+
+# WebSocket close codes
+WS_POLICY_VIOLATION = 1008
+WS_INTERNAL_ERROR = 1011
+
+job_store = ChunkJobStore(
+    max_jobs=int(os.getenv('CHONKIE_MAX_JOBS', '200')),
+    ttl_seconds=int(os.getenv('CHONKIE_JOB_TTL', '3600'))
+)
+
+def resolve_file_path(path: str) -> str:
+    """Resolve a requested path, refusing anything outside the allowed roots"""
+    resolved = os.path.realpath(path)
+    # Other clients' uploads may sit under a root while they are processed
+    if os.path.dirname(resolved) == UPLOAD_DIR and os.path.basename(resolved).startswith(UPLOAD_PREFIX):
+        raise HTTPException(status_code=403, detail=f"Path is outside the allowed directories: {path}")
+    for root in FILE_ROOTS:
+        if os.path.commonpath([root, resolved]) == root:
+            if not os.path.isfile(resolved):
+                raise HTTPException(status_code=404, detail=f"File not found: {path}")
+            return resolved
+    raise HTTPException(status_code=403, detail=f"Path is outside the allowed directories: {path}")
+
+def read_text_file(path: str, max_chars: int) -> str:
+    """Decode at most `max_chars` characters of a UTF-8 file straight from a memory map.
+
+    Decoding from a memoryview over the mapping skips the intermediate bytes
+    copy a plain read() makes. Each character takes at least one byte, so
+    decoding as many bytes as characters are still missing never overshoots:
+    ASCII text is done in one step, and multi-byte text takes a few more,
+    with the decoder carrying split sequences across them.
+    """
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return ''
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            view = memoryview(mapped)
+            try:
+                decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+                parts = []
+                chars = position = 0
+                while chars < max_chars and position < len(view):
+                    end = min(position + max_chars - chars, len(view))
+                    part = decoder.decode(view[position:end], final=end == len(view))
+                    parts.append(part)
+                    chars += len(part)
+                    position = end
+            finally:
+                view.release()
+    return parts[0] if len(parts) == 1 else ''.join(parts)
+
+def prepare_text(request: ChunkRequest) -> str:
+    """Validate the request text (or read the referenced file) and apply chunker limits"""
+    limit = CHUNKER_LIMITS.get(request.config.chunkerType, 25000)
+
+    if request.path is not None:
+        if request.text is not None:
+            raise HTTPException(status_code=400, detail="Provide either text or path, not both")
+        # Read one character past the limit so an oversized file is still detected
+        max_chars = ABSOLUTE_MAX_CHARS if request.override_limit else limit + 1
+        text = read_text_file(resolve_file_path(request.path), max_chars)
+    else:
         text = request.text
-        if not request.override_limit:
-            limit = chunker_limits.get(request.config.chunkerType, 25000)
-            if len(text) > limit:
-                raise HTTPException(
-                    status_code=400, 
-                    detail=f"Text too long ({len(text):,} chars). Limit for {request.config.chunkerType}: {limit:,}. Enable override to proceed."
-                )
-        else:
-            # Even with override, apply absolute maximum for system stability
-            if len(text) > 500000:  # 500K absolute maximum
-                text = text[:500000]
-        
+
+    if not text or not text.strip():
+        raise HTTPException(status_code=400, detail="No text provided")
+
+    # Apply character limits unless overridden
+    if not request.override_limit:
+        if len(text) > limit:
+            size = f"over {limit:,}" if request.path is not None else f"{len(text):,}"
+            raise HTTPException(
+                status_code=400, 
+                detail=f"Text too long ({size} chars). Limit for {request.config.chunkerType}: {limit:,}. Enable override to proceed."
+            )
+    elif len(text) > ABSOLUTE_MAX_CHARS:
+        text = text[:ABSOLUTE_MAX_CHARS]
+
+    return text
+
+def resolve_config(config: ChunkConfig, chars: int, override_limit: bool = False) -> tuple:
+    """Turn chunkerType="auto" into a concrete config; returns (config, selection or None)"""
+    if config.chunkerType != 'auto':
+        return config, None
+    try:
+        return select_config(config, chars, CHUNKER_LIMITS, DEFAULT_LATENCY_BUDGET_MS, override_limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+def apply_pipeline(chunker, pipeline: Optional[List[PipelineStage]]):
+    """Wrap a chunker so its output runs through the request's pipeline stages, if any"""
+    if not pipeline:
+        return chunker
+
+    stages = []
+    # Modes, pack budgets and 'auto' stages are validated by PipelineStage
+    for stage_config in pipeline:
+        if stage_config.mode == 'pack':
+            tokenizer = get_tokenizer(stage_config.config.tokenizerType)
+            stages.append(('pack', None, tokenizer, stage_config.config.chunkSize))
+            continue
+        stage_chunker = create_chunker(stage_config.config)
+        instrument_chunker(stage_chunker)
+        stages.append(('split', stage_chunker, None, stage_config.config.chunkSize))
+    return PipelineChunker(chunker, stages)
+
+def response_config(config: ChunkConfig, pipeline: Optional[List[PipelineStage]] = None) -> dict:
+    """Cleaned config for a response, with the pipeline stages after it"""
+    cleaned_config = clean_config(config)
+    if pipeline:
+        cleaned_config['pipeline'] = [
+            {'mode': stage_config.mode, **clean_config(stage_config.config)} for stage_config in pipeline
+        ]
+    return cleaned_config
+
+def strip_content(chunk_list: List[ChunkResult]) -> None:
+    """Drop chunk text so the response carries offsets only"""
+    for chunk in chunk_list:
+        chunk.content = None
+
+def _embedding_list(embedding) -> Optional[List[float]]:
+    if embedding is None:
+        return None
+    return [float(value) for value in embedding]
+
+def format_chunks(chunks, offset: int = 0, first_index: int = 0) -> List[ChunkResult]:
+    """Convert chonkie chunks to API results, shifting offsets by `offset`"""
+    chunk_list = []
+    for i, chunk in enumerate(chunks):
+        chunk_data = ChunkResult(
+            content=chunk.text if hasattr(chunk, 'text') else str(chunk),
+            index=first_index + i,
+            start_index=offset + getattr(chunk, 'start_index', 0),
+            end_index=offset + getattr(chunk, 'end_index', len(str(chunk))),
+            token_count=getattr(chunk, 'token_count', len(str(chunk).split())),
+            embedding=_embedding_list(getattr(chunk, 'embedding', None))
+        )
+        chunk_list.append(chunk_data)
+    return chunk_list
+
+def clean_config(config: ChunkConfig) -> dict:
+    """Create cleaned config that only shows relevant parameters for each chunker"""
+    cleaned_config = config.dict()
+
+    # Remove chunkSize for NeuralChunker
+    if config.chunkerType == 'NeuralChunker':
+        cleaned_config.pop('chunkSize', None)
+
+    # Remove chunkOverlap for chunkers that don't support it
+    chunkers_without_overlap = ['SentenceChunker', 'RecursiveChunker', 'SemanticChunker', 'CodeChunker', 'NeuralChunker']
+    if config.chunkerType in chunkers_without_overlap:
+        cleaned_config.pop('chunkOverlap', None)
+
+    # Remove None values from advanced parameters
+    for key in list(cleaned_config.keys()):
+        if cleaned_config[key] is None:
+            cleaned_config.pop(key)
+
+    return cleaned_config
+
+def split_segments(text: str, max_chars: int) -> List[tuple]:
+    """Split text into (offset, segment) pairs at the coarsest available delimiter"""
+    segments = []
+    start = 0
+    while len(text) - start > max_chars:
+        window_end = start + max_chars
+        cut = -1
+        for delim in SEGMENT_DELIMITERS:
+            # Only accept a cut in the second half of the window
+            pos = text.rfind(delim, start + max_chars // 2, window_end)
+            if pos != -1:
+                cut = pos + len(delim)
+                break
+        if cut == -1:
+            cut = window_end
+        segments.append((start, text[start:cut]))
+        start = cut
+    segments.append((start, text[start:]))
+    return segments
+
+def apply_dedup(documents: List[List[ChunkResult]], options: Optional[DedupOptions]) -> Optional[Dict[str, Any]]:
+    """Run near-duplicate detection across the documents' chunks, if requested"""
+    if options is None:
+        return None
+
+    with stage('dedup'):
+        summary = deduplicate(documents, threshold=options.threshold, drop=options.mode == 'drop')
+    print(f"[Dedup] {summary['duplicate_chunks']} of {summary['total_chunks']} chunks are duplicates")
+    return summary
+
+def request_key(text: str, config: ChunkConfig, dedup: Optional[DedupOptions] = None,
+                include_content: bool = True, pipeline: Optional[List[PipelineStage]] = None) -> str:
+    """Hash of the text and options, used to recognise repeated submissions"""
+    digest = hashlib.sha256()
+    digest.update(json.dumps(config.dict(), sort_keys=True).encode('utf-8'))
+    if pipeline:
+        digest.update(json.dumps([stage_config.dict() for stage_config in pipeline], sort_keys=True).encode('utf-8'))
+    digest.update(json.dumps(dedup.dict() if dedup else None, sort_keys=True).encode('utf-8'))
+    digest.update(b'1' if include_content else b'0')
+    digest.update(b'\0')
+    digest.update(text.encode('utf-8'))
+    return digest.hexdigest()
+
+def run_chunk_job(job_id: str, text: str, config: ChunkConfig, dedup: Optional[DedupOptions] = None,
+                  include_content: bool = True, pipeline: Optional[List[PipelineStage]] = None) -> None:
+    """Chunk a document segment by segment, recording progress in the job store"""
+    job_store.start_job(job_id)
+    try:
+        start_time = time.time()
+        timer = StageTimer()
+        with activate(timer):
+            with stage('construct'):
+                chunker = create_chunker(config)
+                instrument_chunker(chunker)
+                chunker = apply_pipeline(chunker, pipeline)
+
+            chunk_list = []
+            for offset, segment in split_segments(text, JOB_SEGMENT_CHARS):
+                with stage('chunk'):
+                    chunks = chunker.chunk(segment)
+                with stage('format'):
+                    chunk_list.extend(format_chunks(chunks, offset=offset, first_index=len(chunk_list)))
+                job_store.update_progress(job_id, offset + len(segment))
+
+            dedup_summary = apply_dedup([chunk_list], dedup)
+            if not include_content:
+                strip_content(chunk_list)
+
+        result = ChunkResponse(
+            chunks=chunk_list,
+            total_chunks=len(chunk_list),
+            processing_time=time.time() - start_time,
+            config=response_config(config, pipeline),
+            timings=timer.as_milliseconds(),
+            dedup=dedup_summary
+        )
+        job_store.complete_job(job_id, result)
+        print(f"[Jobs] Job {job_id} completed with {len(chunk_list)} chunks")
+
+    except Exception as e:
+        import traceback
+        print(f"ERROR: Job {job_id} failed: {str(e)}\n{traceback.format_exc()}")
+        job_store.fail_job(job_id, str(e))
+
+def run_chunk_request(request: ChunkRequest, text: str, config: ChunkConfig, selection: Optional[Dict[str, Any]],
+                      timings: bool = False, profile: bool = False) -> tuple:
+    """Chunk one /chunk request; returns (ChunkResponse, Server-Timing header)"""
+    start_time = time.time()
+    
+    timer = StageTimer()
+    with activate(timer), profiled(profile) as profile_summary:
         # Create chunker
-        chunker = create_chunker(request.config)
+        construct_start = time.perf_counter()
+        with stage('construct'):
+            chunker = create_chunker(config)
+            instrument_chunker(chunker)
+            parallel = (request.parallel and PARALLEL_WORKERS > 1 and len(text) >= PARALLEL_MIN_CHARS
+                        and ParallelChunker.supports(config))
+            if parallel:
+                chunker = ParallelChunker(
+                    chunker, config, get_parallel_executor(), PARALLEL_WORKERS, split_segments
+                )
+            chunker = apply_pipeline(chunker, request.pipeline)
         
         # Process text
-        chunks = chunker.chunk(text)
+        chunk_start = time.perf_counter()
+        sized = None
+        with stage('chunk'):
+            if config.chunkSizes and isinstance(chunker, CachedLateChunker):
+                # Every size pools from the same document encoding
+                sized = chunker.chunk_sizes(text, config.chunkSizes)
+                chunks = sized[0][1]
+            else:
+                chunks = chunker.chunk(text)
+        chunk_end = time.perf_counter()
+        # Feeds chunkerType="auto"; profiled, parallel and pipeline runs aren't representative
+        if not (profile or parallel or request.pipeline):
+            throughput_tracker.record(config, len(text), chunk_start - construct_start, chunk_end - chunk_start)
         
         # Format results
+        with stage('format'):
+            variants = None
+            if sized:
+                variants = [
+                    ChunkVariant(chunk_size=size, chunks=format_chunks(size_chunks), total_chunks=len(size_chunks))
+                    for size, size_chunks in sized
+                ]
+                chunk_list = variants[0].chunks
+            else:
+                chunk_list = format_chunks(chunks)
+        
+        dedup_summary = apply_dedup([chunk_list], request.dedup)
+        if not request.include_content:
+            for variant_chunks in ([variant.chunks for variant in variants] if variants else [chunk_list]):
+                strip_content(variant_chunks)
+    
+    result = ChunkResponse(
+        chunks=chunk_list,
+        total_chunks=len(chunk_list),
+        processing_time=time.time() - start_time,
+        config=response_config(config, request.pipeline),
+        timings=timer.as_milliseconds() if timings or profile else None,
+        profile=profile_summary.get('profile'),
+        similarity_curve=getattr(chunker, 'similarity_curve', None),
+        threshold_selection=getattr(chunker, 'threshold_selection', None),
+        dedup=dedup_summary,
+        selection=selection,
+        variants=variants,
+        embedding_cache_hit=getattr(chunker, 'last_cache_hit', None)
+    )
+    return result, timer.server_timing_header()
+
+def run_file_request(path: str, fmt: str, config: ChunkConfig, selection: Optional[Dict[str, Any]],
+                     include_content: bool = True, timings: bool = False) -> tuple:
+    """Extract a PDF/DOCX/HTML file section by section and chunk it as it streams in"""
+    start_time = time.time()
+    timer = StageTimer()
+    with activate(timer):
+        with stage('construct'):
+            chunker = create_chunker(config)
+            instrument_chunker(chunker)
+
+        # Windows stay within the chunker's own limit, so every chunk() call is a size /chunk accepts
+        window_chars = CHUNKER_LIMITS.get(config.chunkerType, 25000)
+        executor = get_parallel_executor() if fmt == 'pdf' and PARALLEL_WORKERS > 1 else None
+        sections = iter_sections(path, fmt, executor, PARALLEL_WORKERS)
+        section_chunker = SectionChunker(chunker, window_chars, split_segments, FILE_MAX_CHARS)
+
         chunk_list = []
-        for i, chunk in enumerate(chunks):
-            chunk_data = ChunkResult(
-                content=chunk.text if hasattr(chunk, 'text') else str(chunk),
-                index=i,
-                start_index=getattr(chunk, 'start_index', 0),
-                end_index=getattr(chunk, 'end_index', len(str(chunk))),
-                token_count=getattr(chunk, 'token_count', len(str(chunk).split()))
-            )
-            chunk_list.append(chunk_data)
+        chunk_stream = section_chunker.chunk(sections)
+        while True:
+            # Extraction runs inside next(), so it is timed together with chunking of the window it fills
+            with stage('extract_and_chunk'):
+                item = next(chunk_stream, None)
+            if item is None:
+                break
+            chunk, start, end, provenance = item
+            with stage('format'):
+                chunk_list.append(FileChunkResult(
+                    content=chunk.text if include_content and hasattr(chunk, 'text') else None,
+                    index=len(chunk_list),
+                    start_index=start,
+                    end_index=end,
+                    token_count=getattr(chunk, 'token_count', None),
+                    **provenance
+                ))
+
+    if section_chunker.truncated_at is not None:
+        print(f"[File] Stopped at section {section_chunker.truncated_at}: over {FILE_MAX_CHARS:,} chars")
+    print(f"[File] {fmt}: {len(section_chunker.sections)} sections, {section_chunker.chars:,} chars, "
+          f"{len(chunk_list)} chunks")
+
+    result = FileChunkResponse(
+        chunks=chunk_list,
+        total_chunks=len(chunk_list),
+        format=fmt,
+        sections=section_chunker.sections,
+        total_sections=len(section_chunker.sections),
+        extracted_chars=section_chunker.chars,
+        truncated=section_chunker.truncated_at is not None,
+        processing_time=time.time() - start_time,
+        config=clean_config(config),
+        timings=timer.as_milliseconds() if timings else None,
+        selection=selection
+    )
+    return result, timer.server_timing_header()
+
+def sweep_configs(base: ChunkConfig, grid: Dict[str, List[Any]]) -> tuple:
+    """Grid points and the ChunkConfig for each; raises ValueError for a bad grid"""
+    fields = base.dict()
+    unknown = [name for name in grid if name not in fields]
+    if unknown:
+        raise ValueError(f"Unknown config fields in grid: {', '.join(unknown)}")
+    points = expand_grid(grid)
+    configs = [ChunkConfig(**{**fields, **point}) for point in points]
+    if any(config.chunkerType == 'auto' for config in configs):
+        raise ValueError("chunkerType 'auto' can't be swept; list concrete chunker types instead")
+    return points, configs
+
+def build_sweep_chunker(config: ChunkConfig, precompute: SweepPrecompute):
+    """Chunker for one grid point, sharing models, sentence splits and embeddings across the sweep"""
+    embeddings = None
+    if config.chunkerType == 'SemanticChunker':
+        embeddings = precompute.embeddings(config.embeddingProvider, config.embeddingModel, get_embeddings)
+    chunker = create_chunker(config, embeddings=embeddings)
+    precompute.attach(chunker)
+    return chunker
+
+def save_upload(upload: UploadFile) -> str:
+    """Copy an upload to a temporary file (worker processes open it by path)"""
+    suffix = os.path.splitext(upload.filename or '')[1]
+    with tempfile.NamedTemporaryFile(prefix=UPLOAD_PREFIX, suffix=suffix, dir=UPLOAD_DIR, delete=False) as f:
+        try:
+            upload.file.seek(0)
+            while True:
+                block = upload.file.read(1 << 20)
+                if not block:
+                    break
+                if f.tell() + len(block) > FILE_MAX_UPLOAD_BYTES:
+                    raise HTTPException(
+                        status_code=413,
+                        detail=f"File too large. Limit: {FILE_MAX_UPLOAD_BYTES // 2**20} MB"
+                    )
+                f.write(block)
+        except BaseException:
+            os.unlink(f.name)
+            raise
+        return f.name
+
+def response_media_type(http_request: Request) -> str:
+    """JSON, MessagePack or Arrow, from the Accept header"""
+    media_type = negotiate(http_request.headers.get('accept'))
+    if media_type is None:
+        raise HTTPException(
+            status_code=406,
+            detail=f"Supported response types: {JSON_MEDIA_TYPE}, {MSGPACK_MEDIA_TYPE}, {ARROW_MEDIA_TYPE}"
+        )
+    return media_type
+
+async def encoded_response(result: BaseModel, media_type: str, response: Response) -> Response:
+    """Binary response for a negotiated MessagePack/Arrow request, keeping headers already set"""
+    body = await asyncio.to_thread(lambda: encode(result.dict(), media_type))
+    headers = {name: value for name, value in response.headers.items() if name != 'content-length'}
+    return Response(content=body, media_type=media_type, headers=headers)
+
+async def until_disconnected(http_request: Request, work) -> tuple:
+    """Await `work`, cancelling it if the client disconnects first; returns (result, disconnected)"""
+    task = asyncio.ensure_future(work)
+    while True:
+        done, _ = await asyncio.wait({task}, timeout=DISCONNECT_POLL_SECONDS)
+        if done:
+            return task.result(), False
+        if await http_request.is_disconnected():
+            task.cancel()
+            try:
+                await task
+            except (asyncio.CancelledError, ChunkCancelled):
+                pass
+            return None, True
+
+@app.post("/chunk", response_model=ChunkResponse)
+async def chunk_text(request: ChunkRequest, response: Response, http_request: Request,
+                     timings: bool = False, profile: bool = False):
+    try:
+        media_type = response_media_type(http_request)
+        response.headers['Vary'] = 'Accept'
+        text = prepare_text(request)
+        config, selection = resolve_config(request.config, len(text), request.override_limit)
         
-        processing_time = time.time() - start_time
+        if profile:
+            # A profile describes one run, so it is never shared
+            work = run_cancellable(run_chunk_request, request, text, config, selection, timings, profile)
+        else:
+            # Identical requests already in flight share one computation
+            key = request_key(text, config, request.dedup, request.include_content, request.pipeline)
+            key += ':t' if timings else ''
+            work = chunk_flight.run(key, run_chunk_request, request, text, config, selection, timings)
         
-        # Create cleaned config that only shows relevant parameters for each chunker
-        cleaned_config = request.config.dict()
-
-        # Remove chunkSize for NeuralChunker
-        if request.config.chunkerType == 'NeuralChunker':
-            cleaned_config.pop('chunkSize', None)
-
-        # Remove chunkOverlap for chunkers that don't support it
-        chunkers_without_overlap = ['SentenceChunker', 'RecursiveChunker', 'SemanticChunker', 'CodeChunker', 'NeuralChunker']
-        if request.config.chunkerType in chunkers_without_overlap:
-            cleaned_config.pop('chunkOverlap', None)
-
-        # Remove None values from advanced parameters
-        for key in list(cleaned_config.keys()):
-            if cleaned_config[key] is None:
-                cleaned_config.pop(key)
+        outcome, disconnected = await until_disconnected(http_request, work)
+        if disconnected:
+            print(f"[Chunk] Client disconnected, abandoned {len(text):,} chars ({config.chunkerType})")
+            return Response(status_code=CLIENT_CLOSED_REQUEST)
         
-        result = ChunkResponse(
+        if profile:
+            result, server_timing = outcome
+        else:
+            (result, server_timing), coalesced = outcome
+            if coalesced:
+                print(f"[Coalesce] Joined in-flight request ({len(text):,} chars, {config.chunkerType})")
+                response.headers['X-Chonkie-Coalesced'] = 'true'
+        
+        response.headers['Server-Timing'] = server_timing
+        if media_type != JSON_MEDIA_TYPE:
+            return await encoded_response(result, media_type, response)
+        return result
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        import traceback
+        error_detail = f"{str(e)}\n{traceback.format_exc()}"
+        print(f"ERROR: {error_detail}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/chunk/file", response_model=FileChunkResponse)
+async def chunk_file(response: Response, http_request: Request,
+                     file: Optional[UploadFile] = File(None),
+                     path: Optional[str] = Form(None),
+                     config: str = Form('{}'),
+                     include_content: bool = Form(True),
+                     timings: bool = False):
+    """Chunk a PDF, DOCX or HTML document, uploaded or under CHONKIE_FILE_ROOTS.
+
+    `config` is a ChunkConfig as JSON. Chunks carry the page (PDF) or
+    section (DOCX, HTML) they start and end in, alongside offsets into the
+    extracted text.
+    """
+    upload_path = None
+    try:
+        try:
+            chunk_config = ChunkConfig(**json.loads(config))
+        except (ValueError, ValidationError) as e:
+            raise HTTPException(status_code=400, detail=f"Invalid config: {e}")
+
+        if (file is None) == (path is None):
+            raise HTTPException(status_code=400, detail="Provide either file or path")
+        if file is not None:
+            upload_path = await asyncio.to_thread(save_upload, file)
+            source, filename, content_type = upload_path, file.filename, file.content_type
+        else:
+            source, filename, content_type = resolve_file_path(path), path, None
+
+        try:
+            fmt = detect_format(source, filename, content_type)
+        except ValueError as e:
+            raise HTTPException(status_code=415, detail=str(e))
+
+        # Size isn't known until extraction ends; "auto" picks a chunker for one window's worth
+        chunk_config, selection = resolve_config(chunk_config, CHUNKER_LIMITS['auto'])
+
+        work = run_cancellable(run_file_request, source, fmt, chunk_config, selection, include_content, timings)
+        outcome, disconnected = await until_disconnected(http_request, work)
+        if disconnected:
+            print(f"[File] Client disconnected, abandoned {filename} ({fmt})")
+            return Response(status_code=CLIENT_CLOSED_REQUEST)
+
+        result, server_timing = outcome
+        response.headers['Server-Timing'] = server_timing
+        return result
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        import traceback
+        error_detail = f"{str(e)}\n{traceback.format_exc()}"
+        print(f"ERROR: {error_detail}")
+        raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        if upload_path is not None:
+            os.unlink(upload_path)
+
+@app.post("/chunk/sweep", response_model=SweepResponse)
+async def chunk_sweep(request: SweepRequest, http_request: Request):
+    """Chunk a sample corpus at every point of a parameter grid and compare the results"""
+    try:
+        try:
+            points, configs = sweep_configs(request.config, request.grid)
+        except (ValueError, ValidationError) as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+        if (request.texts is None) == (request.paths is None):
+            raise HTTPException(status_code=400, detail="Provide either texts or paths")
+        limit = min(CHUNKER_LIMITS.get(config.chunkerType, 25000) for config in configs)
+        max_chars = ABSOLUTE_MAX_CHARS if request.override_limit else limit + 1
+        texts = request.texts or [read_text_file(resolve_file_path(path), max_chars) for path in request.paths]
+        texts = [text for text in texts if text.strip()]
+        if not texts:
+            raise HTTPException(status_code=400, detail="No text provided")
+        if not request.override_limit and max(len(text) for text in texts) > limit:
+            raise HTTPException(
+                status_code=400,
+                detail=f"A document is over {limit:,} chars, the smallest limit among the swept chunkers. "
+                       f"Enable override to proceed."
+            )
+        if sum(len(text) for text in texts) > ABSOLUTE_MAX_CHARS:
+            raise HTTPException(status_code=400, detail=f"Sample corpus is over {ABSOLUTE_MAX_CHARS:,} chars")
+
+        workers = min(request.workers or cpu_budget.threads, len(points))
+        print(f"[Sweep] {len(points)} points over {len(texts)} documents with {workers} workers")
+        work = run_cancellable(run_sweep, texts, points, configs, build_sweep_chunker, workers,
+                               request.boundary_tolerance)
+        result, disconnected = await until_disconnected(http_request, work)
+        if disconnected:
+            print(f"[Sweep] Client disconnected, abandoned {len(points)}-point sweep")
+            return Response(status_code=CLIENT_CLOSED_REQUEST)
+        return result
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        import traceback
+        error_detail = f"{str(e)}\n{traceback.format_exc()}"
+        print(f"ERROR: {error_detail}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+def run_batch_request(request: ChunkBatchRequest, texts: List[str], config: ChunkConfig,
+                      selection: Optional[Dict[str, Any]]) -> tuple:
+    """Chunk every document of a batch with one chunker; returns (ChunkBatchResponse, Server-Timing)"""
+    start_time = time.time()
+    timer = StageTimer()
+    doc_times = []
+    with activate(timer):
+        with stage('construct'):
+            chunker = create_chunker(config)
+            instrument_chunker(chunker)
+
+        documents = []
+        for text in texts:
+            doc_start = time.time()
+            with stage('chunk'):
+                chunks = chunker.chunk(text)
+            with stage('format'):
+                documents.append(format_chunks(chunks))
+            doc_times.append(time.time() - doc_start)
+
+        dedup_summary = apply_dedup(documents, request.dedup)
+
+    cleaned_config = clean_config(config)
+    results = [
+        ChunkResponse(
             chunks=chunk_list,
             total_chunks=len(chunk_list),
-            processing_time=processing_time,
-            config=cleaned_config
+            processing_time=doc_time,
+            config=cleaned_config,
+            selection=selection
         )
-        
+        for chunk_list, doc_time in zip(documents, doc_times)
+    ]
+    result = ChunkBatchResponse(
+        results=results,
+        total_chunks=sum(result.total_chunks for result in results),
+        processing_time=time.time() - start_time,
+        dedup=dedup_summary
+    )
+    return result, timer.server_timing_header()
+
+@app.post("/chunk/batch", response_model=ChunkBatchResponse)
+async def chunk_batch(request: ChunkBatchRequest, response: Response, http_request: Request):
+    """Chunk several documents with one chunker, deduplicating across all of them"""
+    try:
+        texts = [
+            prepare_text(ChunkRequest(text=text, config=request.config, override_limit=request.override_limit))
+            for text in request.texts
+        ]
+        # The budget covers the whole batch
+        config, selection = resolve_config(request.config, sum(len(text) for text in texts), request.override_limit)
+
+        work = run_cancellable(run_batch_request, request, texts, config, selection)
+        outcome, disconnected = await until_disconnected(http_request, work)
+        if disconnected:
+            print(f"[Batch] Client disconnected, abandoned {len(texts)} documents ({config.chunkerType})")
+            return Response(status_code=CLIENT_CLOSED_REQUEST)
+
+        result, server_timing = outcome
+        response.headers['Server-Timing'] = server_timing
         return result
-        
+
+    except HTTPException:
+        raise
     except Exception as e:
         import traceback
         error_detail = f"{str(e)}\n{traceback.format_exc()}"
         print(f"ERROR: {error_detail}")
         raise HTTPException(status_code=500, detail=str(e))
 
+def run_code_repository(request: CodeRepositoryRequest) -> tuple:
+    """Chunk each file of a repository request; returns (CodeRepositoryResponse, Server-Timing)"""
+    start_time = time.time()
+    config = request.config.copy(update={'chunkerType': 'CodeChunker'})
+    limit = CHUNKER_LIMITS['CodeChunker']
+
+    timer = StageTimer()
+    results = []
+    languages = {}
+    with activate(timer):
+        with stage('construct'):
+            chunker = create_chunker(config)
+
+        for code_file in request.files:
+            result = CodeFileResult(path=code_file.path)
+            try:
+                if not request.override_limit and len(code_file.content) > limit:
+                    raise ValueError(f"File too long ({len(code_file.content):,} chars). Limit for CodeChunker: {limit:,}.")
+                with stage('chunk'):
+                    chunks = chunker.chunk(code_file.content[:ABSOLUTE_MAX_CHARS], path=code_file.path)
+                with stage('format'):
+                    result.chunks = format_chunks(chunks)
+                result.total_chunks = len(result.chunks)
+                result.language = chunker.last_language
+                if result.language:
+                    languages[result.language] = languages.get(result.language, 0) + 1
+            except ChunkCancelled:
+                raise
+            except Exception as e:
+                print(f"[CodeChunker] {code_file.path}: {e}")
+                result.error = str(e)
+            results.append(result)
+
+    result = CodeRepositoryResponse(
+        files=results,
+        total_files=len(results),
+        total_chunks=sum(result.total_chunks for result in results),
+        languages=languages,
+        processing_time=time.time() - start_time,
+        cache=code_chunker_cache.get_stats()
+    )
+    return result, timer.server_timing_header()
+
+@app.post("/chunk/code/repository", response_model=CodeRepositoryResponse)
+async def chunk_code_repository(request: CodeRepositoryRequest, response: Response, http_request: Request):
+    """Chunk many source files in one request, sharing cached parsers across them"""
+    outcome, disconnected = await until_disconnected(http_request, run_cancellable(run_code_repository, request))
+    if disconnected:
+        print(f"[CodeChunker] Client disconnected, abandoned {len(request.files)} files")
+        return Response(status_code=CLIENT_CLOSED_REQUEST)
+
+    result, server_timing = outcome
+    response.headers['Server-Timing'] = server_timing
+    return result
+
+@app.post("/chunk/jobs", status_code=202)
+async def submit_chunk_job(request: ChunkRequest):
+    """Accept a chunking request and process it in the background pool"""
+    text = prepare_text(request)
+    config, _ = resolve_config(request.config, len(text), request.override_limit)
+
+    key = request_key(text, config, request.dedup, request.include_content, request.pipeline)
+    job_id, created = job_store.create_job(key, len(text))
+    if created:
+        print(f"[Jobs] Queued job {job_id} ({len(text):,} chars, {config.chunkerType})")
+        chunk_executor.submit(
+            run_chunk_job, job_id, text, config, request.dedup, request.include_content, request.pipeline
+        )
+    else:
+        print(f"[Jobs] Reusing job {job_id} for repeated submission")
+
+    return job_status_payload(job_store.get_job(job_id))
+
+@app.get("/metrics")
+async def metrics():
+    """Process-wide counters for the optimisations that save work"""
+    return {
+        "coalescing": chunk_flight.get_stats(),
+        "cpu_budget": cpu_budget.as_dict(),
+        "code_cache": code_chunker_cache.get_stats(),
+        "late_embedding_cache": token_embedding_cache.get_stats(),
+        "slumber_decisions": get_decision_cache().get_stats(),
+        "throughput": throughput_tracker.get_stats()
+    }
+
+@app.get("/chunk/throughput")
+async def chunk_throughput():
+    """Measured speed per chunker, as used by chunkerType=auto"""
+    return {"chunkers": throughput_tracker.get_stats(), "default_latency_budget_ms": DEFAULT_LATENCY_BUDGET_MS}
+
+@app.get("/chunk/jobs")
+async def list_chunk_jobs():
+    return {"jobs": [job_status_payload(job) for job in job_store.list_jobs()]}
+
+@app.get("/chunk/jobs/{job_id}")
+async def get_chunk_job(job_id: str):
+    job = job_store.get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job_status_payload(job)
+
+@app.get("/chunk/jobs/{job_id}/result", response_model=ChunkResponse)
+async def get_chunk_job_result(job_id: str, response: Response, http_request: Request):
+    media_type = response_media_type(http_request)
+    response.headers['Vary'] = 'Accept'
+    job = job_store.get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job["status"] == ChunkJobStatus.FAILED:
+        raise HTTPException(status_code=500, detail=job["error"])
+    if job["status"] != ChunkJobStatus.COMPLETED:
+        raise HTTPException(status_code=409, detail=f"Job is {job['status'].value}")
+    if media_type != JSON_MEDIA_TYPE:
+        return await encoded_response(job["result"], media_type, response)
+    return job["result"]
+
+@app.get("/chunk/jobs/{job_id}/events")
+async def stream_chunk_job_events(job_id: str):
+    """Server-sent events with job progress until the job finishes"""
+    if job_store.get_job(job_id) is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    async def event_stream():
+        last_payload = None
+        while True:
+            job = job_store.get_job(job_id)
+            if job is None:
+                yield "event: error\ndata: {\"detail\": \"Job not found\"}\n\n"
+                return
+            payload = job_status_payload(job)
+            if payload != last_payload:
+                event = payload['status'] if job["status"] in TERMINAL_STATUSES else 'progress'
+                yield f"event: {event}\ndata: {json.dumps(payload)}\n\n"
+                last_payload = payload
+            if job["status"] in TERMINAL_STATUSES:
+                return
+            await asyncio.sleep(0.5)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        # Tell nginx not to buffer the stream
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+async def _receive_stream_messages(websocket: WebSocket, messages: asyncio.Queue) -> None:
+    """Queue client messages until "end"; raises WebSocketDisconnect if the client goes away"""
+    while True:
+        raw = await websocket.receive_text()
+        try:
+            message = json.loads(raw)
+            if not isinstance(message, dict):
+                raise ValueError("expected a JSON object")
+        except ValueError as e:
+            message = {'type': 'invalid', 'detail': f"Invalid message: {e}"}
+        await messages.put(message)
+        if message.get('type') in ('end', 'invalid'):
+            return
+
+async def _stream_chunks(websocket: WebSocket, messages: asyncio.Queue, stream: StreamingChunker,
+                         include_content: bool, limit: int) -> None:
+    """Feed queued fragments to the stream and send chunks as they become final"""
+    carried = None
+    while True:
+        message = carried or await messages.get()
+        carried = None
+        kind = message.get('type')
+
+        if kind == 'text':
+            parts = [message.get('text') or '']
+            # Fragments that arrived while the last re-chunk ran are pushed in one go
+            while not messages.empty():
+                queued = messages.get_nowait()
+                if queued.get('type') != 'text':
+                    carried = queued
+                    break
+                parts.append(queued.get('text') or '')
+            text = ''.join(parts)
+            if len(text) > limit:
+                raise ValueError(f"Fragment too long ({len(text):,} chars). Limit: {limit:,}")
+            chunks, offset = await run_cancellable(stream.push, text)
+            flushed = False
+        elif kind in ('flush', 'end'):
+            chunks, offset = await run_cancellable(stream.flush)
+            flushed = True
+        elif kind == 'invalid':
+            raise ValueError(message['detail'])
+        else:
+            raise ValueError(f"Unknown message type '{kind}'. Expected text, flush or end")
+
+        if chunks or flushed:
+            chunk_list = format_chunks(chunks, offset, stream.emitted - len(chunks))
+            if not include_content:
+                strip_content(chunk_list)
+            await websocket.send_json({
+                'type': 'chunks',
+                'chunks': [chunk.dict() for chunk in chunk_list],
+                'committed': stream.committed,
+                'open_chars': stream.open_chars,
+                'flushed': flushed
+            })
+        if kind == 'end':
+            return
+
+@app.websocket("/chunk/stream")
+async def chunk_stream(websocket: WebSocket):
+    """Chunk text that arrives in fragments, sending each chunk as soon as its boundaries are final.
+
+    The client sends JSON messages: {"type": "start", "config": {...},
+    "include_content": true} first, then any number of {"type": "text",
+    "text": "..."}, {"type": "flush"} where it knows a chunk must end (end
+    of a turn or utterance) and finally {"type": "end"}. The server answers
+    "start" with "ready", sends {"type": "chunks"} whenever chunks become
+    final (and after every flush), and ends with "done" or "error".
+    Offsets count from the first character of the stream.
+    """
+    await websocket.accept()
+    start_time = time.time()
+    messages: asyncio.Queue = asyncio.Queue()
+    stream = None
+    tasks = []
+    try:
+        try:
+            start = json.loads(await websocket.receive_text())
+        except ValueError as e:
+            raise ValueError(f"Invalid message: {e}")
+        if not isinstance(start, dict) or start.get('type') != 'start':
+            raise ValueError("First message must be {\"type\": \"start\", \"config\": {...}}")
+        config = ChunkConfig(**(start.get('config') or {}))
+        if config.chunkerType in UNSTREAMABLE_CHUNKERS:
+            raise ValueError(f"chunkerType '{config.chunkerType}' can't be streamed; choose a chunker")
+        include_content = start.get('include_content', True)
+        limit = CHUNKER_LIMITS.get(config.chunkerType, 25000)
+        holdback = STREAM_HOLDBACK_CHUNKS.get(config.chunkerType, DEFAULT_HOLDBACK_CHUNKS)
+
+        chunker = await asyncio.to_thread(create_chunker, config)
+        stream = StreamingChunker(chunker, holdback, STREAM_MIN_STEP_CHARS, max_open_chars=limit)
+        await websocket.send_json({'type': 'ready', 'config': response_config(config), 'holdback_chunks': holdback})
+
+        receiver = asyncio.ensure_future(_receive_stream_messages(websocket, messages))
+        processor = asyncio.ensure_future(_stream_chunks(websocket, messages, stream, include_content, limit))
+        tasks = [receiver, processor]
+        # The receiver only finishes first on "end" (or a bad message), which the processor still has to handle
+        await asyncio.wait({receiver, processor}, return_when=asyncio.FIRST_EXCEPTION)
+        for task in tasks:
+            if task.done() and task.exception() is not None:
+                raise task.exception()
+        await processor
+
+        await websocket.send_json({'type': 'done', 'processing_time': time.time() - start_time, **stream.get_stats()})
+        print(f"[Stream] {stream.received:,} chars, {stream.emitted} chunks ({config.chunkerType}) "
+              f"in {time.time() - start_time:.1f}s")
+        await websocket.close()
+
+    except WebSocketDisconnect:
+        if stream is not None:
+            print(f"[Stream] Client disconnected after {stream.received:,} chars, {stream.emitted} chunks")
+    except (ValueError, ValidationError) as e:
+        await websocket.send_json({'type': 'error', 'detail': str(e)})
+        await websocket.close(code=WS_POLICY_VIOLATION)
+    except Exception as e:
+        import traceback
+        error_detail = f"{str(e)}\n{traceback.format_exc()}"
+        print(f"ERROR: {error_detail}")
+        await websocket.send_json({'type': 'error', 'detail': str(e)})
+        await websocket.close(code=WS_INTERNAL_ERROR)
+    finally:
+        # Cancelling the processor also stops a re-chunk running in a worker thread
+        for task in tasks:
+            task.cancel()
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+import asyncio
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Optional
+
+
+class ChunkCancelled(Exception):
+    """Raised inside chunking work once nobody is waiting for its result"""
+
+
+class CancelToken:
+    """Thread-safe flag that chunking work polls at its cancellation points"""
+
+    def __init__(self):
+        self._event = threading.Event()
+
+    def cancel(self) -> None:
+        self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def check(self) -> None:
+        if self._event.is_set():
+            raise ChunkCancelled("Chunking cancelled: client disconnected")
+
+
+_active_token: ContextVar[Optional[CancelToken]] = ContextVar('chonkie_cancel_token', default=None)
+
+
+@contextmanager
+def cancellable(token: CancelToken):
+    """Make `token` the one that check_cancelled() consults for this context"""
+    reset = _active_token.set(token)
+    try:
+        yield token
+    finally:
+        _active_token.reset(reset)
+
+
+def current_token() -> Optional[CancelToken]:
+    """The active token, for handing on to threads that don't inherit this context"""
+    return _active_token.get()
+
+
+def check_cancelled() -> None:
+    """Cancellation point: raises ChunkCancelled if the active token was cancelled"""
+    token = _active_token.get()
+    if token is not None:
+        token.check()
+
+
+def call_with_token(token: CancelToken, fn: Callable, *args) -> Any:
+    with cancellable(token):
+        token.check()
+        return fn(*args)
+
+
+def _consume_exception(task: asyncio.Future) -> None:
+    # Abandoned work usually ends in ChunkCancelled; nobody is left to see it
+    if not task.cancelled():
+        task.exception()
+
+
+async def run_cancellable(fn: Callable, *args) -> Any:
+    """Run fn(*args) in a worker thread, cancelling it if the awaiting task is cancelled.
+
+    Threads can't be interrupted, so cancellation takes effect at the next
+    cancellation point (every timed stage, embedding batch and parallel
+    segment), after which the thread gives up and its result is discarded.
+    """
+    token = CancelToken()
+    task = asyncio.ensure_future(asyncio.to_thread(call_with_token, token, fn, *args))
+    try:
+        return await asyncio.shield(task)
+    except asyncio.CancelledError:
+        token.cancel()
+        task.add_done_callback(_consume_exception)
+        raise
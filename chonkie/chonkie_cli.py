@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""Chunk a whole corpus offline with the same chunkers as the API.
+
+Walks a directory (or reads a JSONL manifest), chunks documents across a
+process pool and writes chunk records to sharded JSONL or Parquet files.
+Finished documents are recorded in a checkpoint file, so an interrupted
+run can be restarted with the same arguments and picks up where it left off.
+
+    python chonkie_cli.py ./docs -o ./chunks --config config.json --workers 4
+    python chonkie_cli.py manifest.jsonl -o ./chunks --format parquet
+"""
+import os
+import sys
+import json
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from typing import Dict, Any, Iterator, List, Optional, Set
+
+from chonkie_api_enhanced import ChunkConfig, create_chunker, format_chunks
+from chonkie_cpu import cpu_budget
+
+DEFAULT_EXTENSIONS = ['.txt', '.md', '.markdown', '.rst', '.html', '.htm']
+
+# Per-process chunker, built once by the pool initializer
+_worker_chunker = None
+
+
+def _init_worker(config_data: Dict[str, Any]) -> None:
+    global _worker_chunker
+    _worker_chunker = create_chunker(ChunkConfig(**config_data))
+
+
+def _chunk_document(doc: Dict[str, Any]) -> Dict[str, Any]:
+    """Chunk one document in a worker; files are read here to avoid pickling text twice"""
+    text = doc.get('text')
+    if text is None:
+        with open(doc['path'], 'r', encoding='utf-8', errors='replace') as f:
+            text = f.read()
+
+    chunks = _worker_chunker.chunk(text) if text.strip() else []
+    records = []
+    for chunk in format_chunks(chunks):
+        record = chunk.dict(exclude={'duplicate_of'})
+        record['doc_id'] = doc['id']
+        record['source'] = doc.get('path')
+        records.append(record)
+
+    return {'id': doc['id'], 'chars': len(text), 'records': records}
+
+
+def iter_documents(source: str, extensions: List[str]) -> Iterator[Dict[str, Any]]:
+    """Yield {'id', 'path'} or {'id', 'text'} entries from a directory or JSONL manifest"""
+    if os.path.isdir(source):
+        for root, dirs, files in os.walk(source):
+            dirs.sort()
+            for name in sorted(files):
+                if os.path.splitext(name)[1].lower() in extensions:
+                    path = os.path.join(root, name)
+                    yield {'id': os.path.relpath(path, source), 'path': path}
+        return
+
+    base_dir = os.path.dirname(os.path.abspath(source))
+    with open(source, 'r', encoding='utf-8') as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            if 'text' not in entry and 'path' not in entry:
+                raise ValueError(f"Manifest line {line_number} needs a 'text' or 'path' field")
+            doc = {'id': str(entry.get('id', entry.get('path', line_number)))}
+            if 'text' in entry:
+                doc['text'] = entry['text']
+            else:
+                doc['path'] = os.path.join(base_dir, entry['path'])
+            yield doc
+
+
+class ShardWriter:
+    """Buffers chunk records and writes them out in shards.
+
+    A shard is written to a temporary name and renamed into place before
+    its documents are appended to the checkpoint, so a document is only
+    marked complete once all of its records are on disk.
+    """
+
+    def __init__(self, output_dir: str, fmt: str, shard_size: int, checkpoint_path: str):
+        self.output_dir = output_dir
+        self.fmt = fmt
+        self.shard_size = shard_size
+        self.checkpoint_path = checkpoint_path
+        self.run_id = time.strftime('%Y%m%d-%H%M%S')
+        self.shard_number = 0
+        self.records: List[Dict[str, Any]] = []
+        self.doc_ids: List[str] = []
+
+        if fmt == 'parquet':
+            try:
+                import pyarrow  # noqa: F401
+                import pyarrow.parquet  # noqa: F401
+            except ImportError:
+                raise ImportError("Parquet output needs pyarrow. Please install it via `pip install pyarrow`")
+
+    def add(self, doc_id: str, records: List[Dict[str, Any]]) -> None:
+        self.records.extend(records)
+        self.doc_ids.append(doc_id)
+        if len(self.records) >= self.shard_size:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self.doc_ids:
+            return
+
+        extension = 'parquet' if self.fmt == 'parquet' else 'jsonl'
+        path = os.path.join(self.output_dir, f"chunks-{self.run_id}-{self.shard_number:05d}.{extension}")
+        tmp_path = path + '.tmp'
+
+        if self.fmt == 'parquet':
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            pq.write_table(pa.Table.from_pylist(self.records), tmp_path)
+        else:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                for record in self.records:
+                    f.write(json.dumps(record, ensure_ascii=False) + '\n')
+        os.replace(tmp_path, path)
+
+        with open(self.checkpoint_path, 'a', encoding='utf-8') as f:
+            for doc_id in self.doc_ids:
+                f.write(doc_id + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+
+        self.shard_number += 1
+        self.records = []
+        self.doc_ids = []
+
+
+def load_checkpoint(path: str) -> Set[str]:
+    if not os.path.exists(path):
+        return set()
+    with open(path, 'r', encoding='utf-8') as f:
+        return {line.rstrip('\n') for line in f if line.strip()}
+
+
+def load_config(args: argparse.Namespace) -> ChunkConfig:
+    config_data = {}
+    if args.config:
+        with open(args.config, 'r', encoding='utf-8') as f:
+            config_data = json.load(f)
+    if args.chunker:
+        config_data['chunkerType'] = args.chunker
+    if args.chunk_size:
+        config_data['chunkSize'] = args.chunk_size
+    return ChunkConfig(**config_data)
+
+
+def print_stats(label: str, started: float, docs: int, chars: int, chunks: int) -> None:
+    elapsed = max(time.time() - started, 1e-9)
+    print(
+        f"[{label}] {docs:,} docs, {chunks:,} chunks in {elapsed:.1f}s "
+        f"({docs / elapsed:.1f} docs/s, {chars / elapsed / 1000:.1f}K chars/s, {chunks / elapsed:.1f} chunks/s)",
+        flush=True
+    )
+
+
+def run(args: argparse.Namespace) -> int:
+    config = load_config(args)
+    os.makedirs(args.output, exist_ok=True)
+    checkpoint_path = args.checkpoint or os.path.join(args.output, '_completed.txt')
+    completed = load_checkpoint(checkpoint_path)
+    extensions = [e if e.startswith('.') else '.' + e for e in args.extensions.split(',')]
+
+    writer = ShardWriter(args.output, args.format, args.shard_size, checkpoint_path)
+    pending_docs = (doc for doc in iter_documents(args.input, extensions) if doc['id'] not in completed)
+
+    print(f"[CLI] {config.chunkerType} with {args.workers} workers, {len(completed):,} documents already done")
+    started = last_report = time.time()
+    docs = chars = chunks = failed = 0
+
+    # Keep a bounded number of documents in flight so huge corpora don't sit in memory
+    max_in_flight = args.workers * 4
+    with ProcessPoolExecutor(
+        max_workers=args.workers,
+        initializer=_init_worker,
+        initargs=(config.dict(),)
+    ) as executor:
+        in_flight = {}
+        exhausted = False
+        while in_flight or not exhausted:
+            while not exhausted and len(in_flight) < max_in_flight:
+                doc = next(pending_docs, None)
+                if doc is None:
+                    exhausted = True
+                    break
+                in_flight[executor.submit(_chunk_document, doc)] = doc['id']
+
+            if not in_flight:
+                break
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                doc_id = in_flight.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    failed += 1
+                    print(f"ERROR: {doc_id}: {e}", file=sys.stderr)
+                    continue
+                writer.add(result['id'], result['records'])
+                docs += 1
+                chars += result['chars']
+                chunks += len(result['records'])
+
+            if time.time() - last_report >= args.report_every:
+                print_stats('Progress', started, docs, chars, chunks)
+                last_report = time.time()
+
+    writer.flush()
+    print_stats('Done', started, docs, chars, chunks)
+    if failed:
+        print(f"[CLI] {failed:,} documents failed and were not checkpointed; rerun to retry them")
+    return 1 if failed else 0
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Chunk a document corpus into sharded JSONL or Parquet files")
+    parser.add_argument('input', help="Directory to walk, or a JSONL manifest with 'path' or 'text' per line")
+    parser.add_argument('-o', '--output', required=True, help="Output directory for shards")
+    parser.add_argument('--config', help="JSON file with a ChunkConfig, as sent to /chunk")
+    parser.add_argument('--chunker', help="Override config.chunkerType")
+    parser.add_argument('--chunk-size', type=int, help="Override config.chunkSize")
+    parser.add_argument('--format', choices=['jsonl', 'parquet'], default='jsonl')
+    parser.add_argument('--workers', type=int, default=cpu_budget.threads)
+    parser.add_argument('--shard-size', type=int, default=50000, help="Chunk records per shard")
+    parser.add_argument('--checkpoint', help="Completed-documents file (default: <output>/_completed.txt)")
+    parser.add_argument('--extensions', default=','.join(DEFAULT_EXTENSIONS),
+                        help="Comma-separated file extensions to pick up when walking a directory")
+    parser.add_argument('--report-every', type=float, default=10.0, help="Seconds between progress lines")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    sys.exit(run(parse_args()))
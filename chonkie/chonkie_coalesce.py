@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+import time
+import asyncio
+from typing import Dict, Any, Callable, Tuple
+
+from chonkie_cancel import CancelToken, ChunkCancelled, call_with_token
+
+
+class _Call:
+    __slots__ = ('task', 'token', 'started', 'followers', 'waiters')
+
+    def __init__(self, task: asyncio.Future, token: CancelToken):
+        self.task = task
+        self.token = token
+        self.started = time.perf_counter()
+        self.followers = 0
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Runs at most one computation per key at a time; identical callers share it.
+
+    The first caller for a key starts `fn` in a worker thread. Callers that
+    arrive with the same key while it is still running wait for the same
+    result (or exception) instead of starting their own. Results are not
+    kept once the call finishes, so this only merges overlapping requests.
+    When every caller waiting on a computation has been cancelled, the
+    computation is cancelled too. All bookkeeping happens on the event loop,
+    so no lock is needed.
+    """
+
+    def __init__(self):
+        self._calls: Dict[str, _Call] = {}
+        self.stats = {'executions': 0, 'coalesced': 0, 'failures': 0, 'cancelled': 0, 'saved_seconds': 0.0}
+
+    async def run(self, key: str, fn: Callable, *args) -> Tuple[Any, bool]:
+        """Result of fn(*args), and whether it was shared with an earlier caller"""
+        call = self._calls.get(key)
+        shared = call is not None
+        if shared:
+            call.followers += 1
+            self.stats['coalesced'] += 1
+        else:
+            token = CancelToken()
+            task = asyncio.ensure_future(asyncio.to_thread(call_with_token, token, fn, *args))
+            call = self._calls[key] = _Call(task, token)
+            self.stats['executions'] += 1
+            call.task.add_done_callback(lambda task: self._finish(key, call))
+
+        call.waiters += 1
+        try:
+            # Shielded so one caller going away doesn't cancel the others' result
+            return await asyncio.shield(call.task), shared
+        except asyncio.CancelledError:
+            call.waiters -= 1
+            if call.waiters == 0 and not call.task.done():
+                call.token.cancel()
+                # Later identical requests start afresh rather than join a dying call
+                if self._calls.get(key) is call:
+                    del self._calls[key]
+            raise
+
+    def _finish(self, key: str, call: _Call) -> None:
+        if self._calls.get(key) is call:
+            del self._calls[key]
+        if call.task.cancelled() or isinstance(call.task.exception(), ChunkCancelled):
+            self.stats['cancelled'] += 1
+        elif call.task.exception() is not None:
+            self.stats['failures'] += 1
+        elif call.followers:
+            # Each follower would otherwise have paid for the whole computation
+            self.stats['saved_seconds'] += call.followers * (time.perf_counter() - call.started)
+
+    def get_stats(self) -> Dict[str, Any]:
+        requests = self.stats['executions'] + self.stats['coalesced']
+        return {
+            **self.stats,
+            'saved_seconds': round(self.stats['saved_seconds'], 3),
+            'requests': requests,
+            'coalesced_ratio': round(self.stats['coalesced'] / requests, 4) if requests else 0.0,
+            'in_flight': len(self._calls)
+        }
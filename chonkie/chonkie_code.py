@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+import hashlib
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Dict, Any, Optional
+
+try:
+    import chonkie
+except ImportError:
+    raise ImportError("Chonkie not installed")
+
+
+def language_from_path(path: str) -> Optional[str]:
+    """Language for a file name, if tree-sitter-language-pack can tell from the extension"""
+    try:
+        from tree_sitter_language_pack import detect_language_from_path
+    except ImportError:
+        return None
+    try:
+        return detect_language_from_path(path)
+    except Exception:
+        return None
+
+
+class CodeChunkerCache:
+    """Process-lifetime cache of CodeChunkers per language, plus memoized detection.
+
+    Building a CodeChunker checks the grammar downloads, loads the detection
+    model and (depending on the chonkie version) constructs a tree-sitter
+    parser, which used to happen on every request. Parsers are not safe to
+    use from two threads at once, so chunkers are checked out for the
+    duration of a call and returned to a per-language free list afterwards;
+    the pool grows only as far as the real concurrency. Detection results
+    are shared and keyed by a hash of the content.
+    """
+
+    def __init__(self, max_detections: int = 4096):
+        self._idle: Dict[tuple, list] = {}
+        self._detections: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.max_detections = max_detections
+        self.stats = {'chunkers_built': 0, 'detection_hits': 0, 'detection_misses': 0}
+
+    @contextmanager
+    def checkout(self, language: str, include_nodes: bool = False):
+        """Borrow a CodeChunker for a language (or 'auto') for exclusive use"""
+        key = (language, bool(include_nodes))
+        with self._lock:
+            idle = self._idle.setdefault(key, [])
+            chunker = idle.pop() if idle else None
+
+        if chunker is None:
+            print(f"[CodeChunker] Building chunker for language={language}")
+            chunker = chonkie.CodeChunker(language=language, include_nodes=include_nodes)
+            with self._lock:
+                self.stats['chunkers_built'] += 1
+
+        try:
+            yield chunker
+        finally:
+            with self._lock:
+                self._idle[key].append(chunker)
+
+    def detect_language(self, text: str, path: Optional[str] = None) -> str:
+        """Detect the language of some code, by file extension first, then by content"""
+        if path:
+            language = language_from_path(path)
+            if language:
+                return language
+
+        digest = hashlib.sha1(text.encode('utf-8')).hexdigest()
+        with self._lock:
+            language = self._detections.get(digest)
+            if language is not None:
+                self._detections.move_to_end(digest)
+                self.stats['detection_hits'] += 1
+                return language
+            self.stats['detection_misses'] += 1
+
+        # The 'auto' chunker owns the detection model, so it is cached like any other
+        with self.checkout('auto') as detector:
+            language = detector._detect_language(text)
+
+        with self._lock:
+            self._detections[digest] = language
+            while len(self._detections) > self.max_detections:
+                self._detections.popitem(last=False)
+        return language
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {**self.stats, 'cached_detections': len(self._detections)}
+
+
+code_chunker_cache = CodeChunkerCache()
+
+
+class CachedCodeChunker:
+    """Drop-in for CodeChunker that routes each text to a cached per-language chunker"""
+
+    def __init__(self, chunk_size: int = 2048, language: str = 'auto', include_nodes: bool = False,
+                 cache: CodeChunkerCache = code_chunker_cache):
+        self.chunk_size = chunk_size
+        self.language = language or 'auto'
+        self.include_nodes = include_nodes
+        self.cache = cache
+        self.last_language = None
+
+    def chunk(self, text: str, path: Optional[str] = None):
+        if not text.strip():
+            return []
+
+        language = self.language
+        if language == 'auto':
+            language = self.cache.detect_language(text, path)
+        self.last_language = language
+
+        with self.cache.checkout(language, self.include_nodes) as chunker:
+            # The chunker is ours until it is returned, so the size can be set per call
+            chunker.chunk_size = self.chunk_size
+            return chunker.chunk(text)
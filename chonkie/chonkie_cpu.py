@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""Fit library thread pools to the container's CPU quota.
+
+torch, OpenBLAS/MKL (numpy) and HuggingFace tokenizers size their pools
+from the host's core count, not the cgroup quota docker-compose sets, so a
+container limited to half a CPU on a 16-core host runs 16 BLAS threads per
+request and spends its quota switching between them. Importing this module
+detects the quota and sets the thread-count variables those libraries read
+when they load, so it has to be imported before numpy or torch. Variables
+that are already set are left alone.
+
+    python chonkie_cpu.py --concurrency 4 --oversubscribe 16
+"""
+import os
+import sys
+import time
+import json
+import argparse
+import subprocess
+from typing import Dict, Any, List, Optional
+
+# Read by OpenMP, OpenBLAS, MKL, Accelerate, numexpr and rayon (HF tokenizers) when they start
+THREAD_ENV_VARS = [
+    'OMP_NUM_THREADS',
+    'OPENBLAS_NUM_THREADS',
+    'MKL_NUM_THREADS',
+    'VECLIB_MAXIMUM_THREADS',
+    'NUMEXPR_NUM_THREADS',
+    'RAYON_NUM_THREADS',
+]
+
+_CGROUP_ROOT = '/sys/fs/cgroup'
+
+
+def _read(path: str) -> Optional[str]:
+    try:
+        with open(path) as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def _own_cgroup_paths() -> Dict[str, str]:
+    """Controller -> this process's cgroup path, from /proc/self/cgroup"""
+    paths = {}
+    for line in (_read('/proc/self/cgroup') or '').splitlines():
+        _, controllers, path = line.split(':', 2)
+        for controller in (controllers.split(',') if controllers else ['']):
+            paths[controller] = path
+    return paths
+
+
+def cgroup_cpu_quota() -> Optional[float]:
+    """CPUs allowed by the cgroup quota (cgroup v2 or v1), or None when unlimited"""
+    paths = _own_cgroup_paths()
+
+    # v2: "max 100000" or "<quota> <period>"; inside a container the root is usually our own cgroup
+    for directory in dict.fromkeys([os.path.join(_CGROUP_ROOT, paths.get('', '/').lstrip('/')), _CGROUP_ROOT]):
+        value = _read(os.path.join(directory, 'cpu.max'))
+        if value:
+            quota, _, period = value.partition(' ')
+            if quota == 'max':
+                return None
+            return int(quota) / int(period or 100000)
+
+    # v1: cfs_quota_us is -1 when unlimited
+    for mount in ('cpu', 'cpu,cpuacct', 'cpuacct,cpu'):
+        for directory in dict.fromkeys([os.path.join(_CGROUP_ROOT, mount, paths.get('cpu', '/').lstrip('/')),
+                                        os.path.join(_CGROUP_ROOT, mount)]):
+            quota = _read(os.path.join(directory, 'cpu.cfs_quota_us'))
+            period = _read(os.path.join(directory, 'cpu.cfs_period_us'))
+            if quota and period:
+                return None if int(quota) <= 0 else int(quota) / int(period)
+    return None
+
+
+def affinity_cpus() -> int:
+    """CPUs this process may be scheduled on (cpuset / taskset)"""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+class ThreadBudget:
+    """How many threads each pool gets, and where the number came from"""
+
+    def __init__(self, host_cpus: int, affinity: int, quota: Optional[float], limit: float, source: str):
+        self.host_cpus = host_cpus
+        self.affinity = affinity
+        self.quota = quota
+        self.limit = limit
+        self.source = source
+        # Whole CPUs only: a thread for a fractional CPU is throttled for the rest of every period
+        self.threads = max(1, int(limit))
+        # Concurrency comes from requests, not from torch running ops side by side
+        self.interop_threads = 1
+        self.applied: Dict[str, str] = {}
+        self.preset: Dict[str, str] = {}
+        self.torch: Optional[Dict[str, int]] = None
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            'host_cpus': self.host_cpus,
+            'affinity_cpus': self.affinity,
+            'cgroup_quota_cpus': self.quota,
+            'cpu_limit': self.limit,
+            'limit_source': self.source,
+            'threads': self.threads,
+            'interop_threads': self.interop_threads,
+            'env_applied': self.applied,
+            'env_preset': self.preset,
+            'torch': self.torch
+        }
+
+
+def detect_budget() -> ThreadBudget:
+    host = os.cpu_count() or 1
+    affinity = affinity_cpus()
+    quota = cgroup_cpu_quota()
+
+    override = os.getenv('CHONKIE_CPU_LIMIT')
+    if override:
+        return ThreadBudget(host, affinity, quota, float(override), 'CHONKIE_CPU_LIMIT')
+    if quota is not None and quota < affinity:
+        return ThreadBudget(host, affinity, quota, quota, 'cgroup')
+    return ThreadBudget(host, affinity, quota, float(affinity), 'affinity')
+
+
+def apply_thread_budget(budget: ThreadBudget) -> ThreadBudget:
+    """Set the thread-count variables the libraries read at load time"""
+    for name in THREAD_ENV_VARS:
+        if name in os.environ:
+            budget.preset[name] = os.environ[name]
+        else:
+            os.environ[name] = budget.applied[name] = str(budget.threads)
+    # With a single thread the tokenizers pool only adds hand-offs (and warns after a fork)
+    if budget.threads == 1 and 'TOKENIZERS_PARALLELISM' not in os.environ:
+        os.environ['TOKENIZERS_PARALLELISM'] = budget.applied['TOKENIZERS_PARALLELISM'] = 'false'
+    return budget
+
+
+def configure_torch(budget: ThreadBudget) -> Optional[Dict[str, int]]:
+    """Size torch's intra- and inter-op pools; loads torch if it is installed"""
+    try:
+        import torch
+    except ImportError:
+        return None
+    torch.set_num_threads(budget.threads)
+    try:
+        torch.set_num_interop_threads(budget.interop_threads)
+    except RuntimeError as e:
+        # Only allowed before torch first runs inter-op work
+        print(f"[CPU] Could not set torch inter-op threads: {e}")
+    budget.torch = {'intra_op': torch.get_num_threads(), 'inter_op': torch.get_num_interop_threads()}
+    return budget.torch
+
+
+def thread_pool_workers(budget: ThreadBudget) -> int:
+    # ThreadPoolExecutor's own default, min(32, cpus + 4), with the budget instead of the host count
+    return min(32, budget.threads + 4)
+
+
+cpu_budget = apply_thread_budget(detect_budget())
+print(f"[CPU] {cpu_budget.limit:g} CPUs ({cpu_budget.source}, host has {cpu_budget.host_cpus}): "
+      f"{cpu_budget.threads} threads per pool")
+
+
+def _bench_worker(concurrency: int, seconds: float, size: int) -> Dict[str, Any]:
+    """Run `concurrency` request threads of BLAS work (and torch, if installed) for `seconds`"""
+    import threading
+    import numpy as np
+
+    try:
+        import torch
+        configure_torch(cpu_budget)
+    except ImportError:
+        torch = None
+
+    rng = np.random.default_rng(0)
+    a = rng.standard_normal((size, size)).astype(np.float32)
+    latencies: List[float] = []
+    lock = threading.Lock()
+    deadline = time.perf_counter() + seconds
+
+    def request():
+        local = []
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            a @ a
+            if torch is not None:
+                t = torch.from_numpy(a)
+                t @ t
+            local.append(time.perf_counter() - start)
+        with lock:
+            latencies.extend(local)
+
+    threads = [threading.Thread(target=request) for _ in range(concurrency)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        'threads_per_pool': cpu_budget.threads,
+        'requests_per_second': round(len(latencies) / elapsed, 2),
+        'p50_ms': round(latencies[len(latencies) // 2] * 1000, 2),
+        'p95_ms': round(latencies[int(len(latencies) * 0.95)] * 1000, 2)
+    }
+
+
+def _run_bench(args: argparse.Namespace, cpu_limit: Optional[float]) -> Dict[str, Any]:
+    # Thread pools are sized when the libraries load, so each setting needs a fresh interpreter
+    env = {name: value for name, value in os.environ.items() if name not in THREAD_ENV_VARS}
+    env.pop('CHONKIE_CPU_LIMIT', None)
+    if cpu_limit is not None:
+        env['CHONKIE_CPU_LIMIT'] = str(cpu_limit)
+    command = [sys.executable, __file__, '--worker', '--concurrency', str(args.concurrency),
+               '--seconds', str(args.seconds), '--size', str(args.size)]
+    output = subprocess.run(command, env=env, check=True, capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Throughput with the budgeted thread count vs one per host core")
+    parser.add_argument('--concurrency', type=int, default=4, help="Concurrent request threads")
+    parser.add_argument('--seconds', type=float, default=5.0)
+    parser.add_argument('--size', type=int, default=384, help="Matrix size per operation")
+    parser.add_argument('--oversubscribe', type=int, default=None,
+                        help="Threads per pool without the budget (default: host CPU count)")
+    parser.add_argument('--worker', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(_bench_worker(args.concurrency, args.seconds, args.size)))
+        sys.exit(0)
+
+    unbudgeted = args.oversubscribe or cpu_budget.host_cpus
+    results = {
+        'budgeted': _run_bench(args, None),
+        'host_threads': _run_bench(args, unbudgeted)
+    }
+    print(json.dumps({'budget': cpu_budget.as_dict(), 'results': results}, indent=2))
+    speedup = results['budgeted']['requests_per_second'] / max(results['host_threads']['requests_per_second'], 1e-9)
+    print(f"Budgeted {cpu_budget.threads} vs {unbudgeted} threads per pool: {speedup:.2f}x throughput")
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+import re
+import zlib
+import hashlib
+from typing import Dict, Any, List, Optional, Tuple
+
+import numpy as np
+
+# MinHash signature layout: BANDS * ROWS_PER_BAND permutations. 16 bands of 4
+# rows put the LSH candidate cut-off around Jaccard 0.5, well below the
+# default match threshold, so true near-duplicates are rarely missed.
+NUM_PERMUTATIONS = 64
+BANDS = 16
+ROWS_PER_BAND = NUM_PERMUTATIONS // BANDS
+SHINGLE_WORDS = 3
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+_rng = np.random.default_rng(20240611)  # Fixed seed: signatures must be stable across processes
+_PERM_A = _rng.integers(1, 1 << 32, size=NUM_PERMUTATIONS, dtype=np.uint64)
+_PERM_B = _rng.integers(0, 1 << 32, size=NUM_PERMUTATIONS, dtype=np.uint64)
+_SHINGLE_MIX = np.array([0x9E3779B1, 0x85EBCA77, 0xC2B2AE3D], dtype=np.uint64)
+
+_WORD_RE = re.compile(r'\w+')
+
+
+def normalize_text(text: str) -> str:
+    """Lowercase and collapse whitespace so formatting differences don't matter"""
+    return ' '.join(text.lower().split())
+
+
+def shingle_hashes(text: str) -> np.ndarray:
+    """32-bit hashes of overlapping word 3-grams"""
+    words = _WORD_RE.findall(text.lower())
+    if not words:
+        return np.array([zlib.crc32(text.encode('utf-8'))], dtype=np.uint64)
+
+    word_hashes = np.fromiter(
+        (zlib.crc32(word.encode('utf-8')) for word in words), dtype=np.uint64, count=len(words)
+    )
+    if len(word_hashes) < SHINGLE_WORDS:
+        return word_hashes
+
+    # Combine neighbouring word hashes into one hash per shingle
+    n = len(word_hashes) - SHINGLE_WORDS + 1
+    combined = np.zeros(n, dtype=np.uint64)
+    for k in range(SHINGLE_WORDS):
+        combined ^= word_hashes[k:k + n] * _SHINGLE_MIX[k]
+    return combined & _MAX_HASH
+
+
+def minhash_signature(text: str) -> np.ndarray:
+    """MinHash signature of a text's word shingles"""
+    shingles = np.unique(shingle_hashes(text))
+    # (a * x + b) mod p for every permutation and shingle at once
+    permuted = (np.outer(_PERM_A, shingles) % _MERSENNE_PRIME + _PERM_B[:, None]) % _MERSENNE_PRIME
+    return permuted.min(axis=1)
+
+
+class NearDuplicateIndex:
+    """LSH index over MinHash signatures that maps each chunk to its canonical copy.
+
+    Chunks are added in order; the first occurrence of a piece of content is
+    canonical and every later exact or near duplicate points back to it. One
+    index can span many documents, so boilerplate repeated across a batch is
+    caught as well as repeats within one document.
+    """
+
+    def __init__(self, threshold: float = 0.9):
+        if not 0 < threshold <= 1:
+            raise ValueError("threshold must be in (0, 1]")
+        self.threshold = threshold
+        self._exact: Dict[str, Any] = {}
+        self._buckets: Dict[Tuple[int, bytes], List[Any]] = {}
+        self._signatures: Dict[Any, np.ndarray] = {}
+
+    def add(self, key: Any, text: str) -> Optional[Tuple[Any, float]]:
+        """Add a chunk; returns (canonical key, estimated similarity) if it is a duplicate"""
+        normalized = normalize_text(text)
+        digest = hashlib.sha1(normalized.encode('utf-8')).hexdigest()
+        if digest in self._exact:
+            return self._exact[digest], 1.0
+
+        signature = minhash_signature(normalized)
+        bands = [
+            (band, signature[band * ROWS_PER_BAND:(band + 1) * ROWS_PER_BAND].tobytes())
+            for band in range(BANDS)
+        ]
+
+        best_key, best_similarity = None, 0.0
+        seen = set()
+        for bucket in bands:
+            for candidate in self._buckets.get(bucket, ()):
+                if candidate in seen:
+                    continue
+                seen.add(candidate)
+                similarity = float(np.mean(self._signatures[candidate] == signature))
+                if similarity > best_similarity:
+                    best_key, best_similarity = candidate, similarity
+
+        if best_key is not None and best_similarity >= self.threshold:
+            return best_key, best_similarity
+
+        # New canonical chunk
+        self._exact[digest] = key
+        self._signatures[key] = signature
+        for bucket in bands:
+            self._buckets.setdefault(bucket, []).append(key)
+        return None
+
+
+def deduplicate(documents: List[List[Any]], threshold: float = 0.9, drop: bool = False) -> Dict[str, Any]:
+    """Flag or drop near-duplicate chunks across documents.
+
+    `documents` holds one list of ChunkResult per document. Duplicates get
+    `duplicate_of` set to the canonical chunk's document and index; with
+    drop=True they are also removed from the lists in place. Returns a
+    summary suitable for the API response.
+    """
+    index = NearDuplicateIndex(threshold)
+    duplicates = []
+    total = 0
+
+    for doc_id, chunks in enumerate(documents):
+        kept = []
+        for chunk in chunks:
+            total += 1
+            match = index.add((doc_id, chunk.index), chunk.content)
+            if match is None:
+                kept.append(chunk)
+                continue
+
+            (canonical_doc, canonical_index), similarity = match
+            chunk.duplicate_of = {'document': canonical_doc, 'index': canonical_index}
+            duplicates.append({
+                'document': doc_id,
+                'index': chunk.index,
+                'duplicate_of': chunk.duplicate_of,
+                'similarity': round(similarity, 4),
+                'characters': len(chunk.content)
+            })
+            if not drop:
+                kept.append(chunk)
+
+        if drop:
+            chunks[:] = kept
+
+    return {
+        'mode': 'drop' if drop else 'flag',
+        'threshold': threshold,
+        'total_chunks': total,
+        'unique_chunks': total - len(duplicates),
+        'duplicate_chunks': len(duplicates),
+        'duplicate_characters': sum(d['characters'] for d in duplicates),
+        'duplicates': duplicates
+    }
@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""Binary encodings of ChunkResponse for clients that send an Accept header.
+
+JSON repeats every key for every chunk and turns each offset into decimal
+text; for tens of thousands of chunks that dominates both encode time and
+payload size. Both binary formats here are columnar instead:
+
+- MessagePack (application/msgpack): a map with the response fields under
+  "meta" and the chunks under "columns". index/start_index/end_index/
+  token_count are little-endian int64 buffers, content is one UTF-8 buffer
+  plus an int64 buffer of n + 1 byte offsets (Arrow's layout), embeddings
+  one float32 buffer of n x dim.
+- Arrow IPC stream (application/vnd.apache.arrow.stream): one record batch
+  with a column per chunk field; the response fields are JSON in the
+  schema metadata under b"chonkie".
+
+decode_msgpack() and decode_arrow() turn both back into column arrays.
+
+    python chonkie_encode.py --chunks 50000
+"""
+import json
+import time
+import argparse
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+JSON_MEDIA_TYPE = 'application/json'
+MSGPACK_MEDIA_TYPE = 'application/msgpack'
+ARROW_MEDIA_TYPE = 'application/vnd.apache.arrow.stream'
+
+# Older clients still send the x- form
+_MEDIA_ALIASES = {'application/x-msgpack': MSGPACK_MEDIA_TYPE, 'application/vnd.msgpack': MSGPACK_MEDIA_TYPE}
+
+_INT_COLUMNS = ('index', 'start_index', 'end_index', 'token_count')
+
+
+def _available(media_type: str) -> bool:
+    try:
+        if media_type == MSGPACK_MEDIA_TYPE:
+            import msgpack  # noqa: F401
+        elif media_type == ARROW_MEDIA_TYPE:
+            import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def negotiate(accept: Optional[str]) -> Optional[str]:
+    """Best supported media type for an Accept header, or None if none is acceptable.
+
+    JSON wins ties and is the answer for a missing header or */*, so
+    existing clients are unaffected.
+    """
+    if not accept:
+        return JSON_MEDIA_TYPE
+    offers = []
+    for position, item in enumerate(accept.split(',')):
+        media_type, *params = [part.strip() for part in item.split(';')]
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition('=')
+            if name.strip() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        media_type = _MEDIA_ALIASES.get(media_type.lower(), media_type.lower())
+        if quality > 0:
+            offers.append((quality, media_type == JSON_MEDIA_TYPE, -position, media_type))
+
+    for _, _, _, media_type in sorted(offers, reverse=True):
+        if media_type in (JSON_MEDIA_TYPE, '*/*', 'application/*'):
+            return JSON_MEDIA_TYPE
+        if media_type in (MSGPACK_MEDIA_TYPE, ARROW_MEDIA_TYPE) and _available(media_type):
+            return media_type
+    return None
+
+
+def _split_response(response: Dict[str, Any]) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+    meta = {key: value for key, value in response.items() if key != 'chunks'}
+    return meta, response.get('chunks') or []
+
+
+def _column_arrays(chunks: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Chunk dicts to column arrays; content and embedding are None when no chunk has them"""
+    columns: Dict[str, Any] = {}
+    for name in _INT_COLUMNS:
+        # token_count can be missing; -1 marks it, as offsets are never negative
+        columns[name] = np.fromiter(
+            (chunk.get(name) if chunk.get(name) is not None else -1 for chunk in chunks),
+            dtype='<i8', count=len(chunks)
+        )
+    contents = [chunk.get('content') for chunk in chunks]
+    columns['content'] = None if all(content is None for content in contents) else contents
+    embeddings = [chunk.get('embedding') for chunk in chunks]
+    columns['embedding'] = None
+    if chunks and all(embedding is not None for embedding in embeddings):
+        columns['embedding'] = np.asarray(embeddings, dtype='<f4')
+    duplicates = [chunk.get('duplicate_of') for chunk in chunks]
+    columns['duplicate_of'] = None if all(dup is None for dup in duplicates) else duplicates
+    return columns
+
+
+def encode_msgpack(response: Dict[str, Any]) -> bytes:
+    import msgpack
+
+    meta, chunks = _split_response(response)
+    columns = _column_arrays(chunks)
+    packed: Dict[str, Any] = {'count': len(chunks)}
+    for name in _INT_COLUMNS:
+        packed[name] = columns[name].tobytes()
+    if columns['content'] is not None:
+        encoded = [(content or '').encode('utf-8') for content in columns['content']]
+        offsets = np.zeros(len(encoded) + 1, dtype='<i8')
+        np.cumsum([len(part) for part in encoded], out=offsets[1:])
+        packed['content'] = b''.join(encoded)
+        packed['content_offsets'] = offsets.tobytes()
+    if columns['embedding'] is not None:
+        packed['embedding'] = columns['embedding'].tobytes()
+        packed['embedding_dim'] = int(columns['embedding'].shape[1]) if columns['embedding'].ndim == 2 else 0
+    if columns['duplicate_of'] is not None:
+        packed['duplicate_of'] = columns['duplicate_of']
+    return msgpack.packb({'meta': meta, 'columns': packed}, use_bin_type=True)
+
+
+def decode_msgpack(payload: bytes) -> Dict[str, Any]:
+    """MessagePack response to {'meta', 'columns'} with NumPy arrays and a list of contents"""
+    import msgpack
+
+    data = msgpack.unpackb(payload, raw=False)
+    packed = data['columns']
+    columns: Dict[str, Any] = {name: np.frombuffer(packed[name], dtype='<i8') for name in _INT_COLUMNS}
+    if 'content' in packed:
+        offsets = np.frombuffer(packed['content_offsets'], dtype='<i8').tolist()
+        blob = packed['content']
+        columns['content'] = [blob[start:end].decode('utf-8') for start, end in zip(offsets, offsets[1:])]
+    if 'embedding' in packed:
+        columns['embedding'] = np.frombuffer(packed['embedding'], dtype='<f4').reshape(
+            packed['count'], packed['embedding_dim']
+        )
+    if 'duplicate_of' in packed:
+        columns['duplicate_of'] = packed['duplicate_of']
+    return {'meta': data['meta'], 'columns': columns}
+
+
+def encode_arrow(response: Dict[str, Any]) -> bytes:
+    import pyarrow as pa
+
+    meta, chunks = _split_response(response)
+    columns = _column_arrays(chunks)
+    arrays, names = [], []
+    for name in _INT_COLUMNS:
+        values = columns[name]
+        mask = values < 0 if name == 'token_count' else None
+        arrays.append(pa.array(values, type=pa.int64(), mask=mask))
+        names.append(name)
+    if columns['content'] is not None:
+        arrays.append(pa.array(columns['content'], type=pa.large_string()))
+        names.append('content')
+    if columns['embedding'] is not None and columns['embedding'].ndim == 2:
+        flat = pa.array(columns['embedding'].reshape(-1), type=pa.float32())
+        arrays.append(pa.FixedSizeListArray.from_arrays(flat, columns['embedding'].shape[1]))
+        names.append('embedding')
+    if columns['duplicate_of'] is not None:
+        arrays.append(pa.array([json.dumps(dup) if dup is not None else None for dup in columns['duplicate_of']],
+                               type=pa.string()))
+        names.append('duplicate_of')
+
+    batch = pa.RecordBatch.from_arrays(arrays, names=names)
+    schema = batch.schema.with_metadata({b'chonkie': json.dumps(meta).encode('utf-8')})
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, schema) as writer:
+        writer.write_batch(batch.replace_schema_metadata(schema.metadata))
+    return sink.getvalue().to_pybytes()
+
+
+def decode_arrow(payload: bytes) -> Dict[str, Any]:
+    """Arrow IPC response to {'meta', 'table'}"""
+    import pyarrow as pa
+
+    reader = pa.ipc.open_stream(payload)
+    table = reader.read_all()
+    meta = json.loads((reader.schema.metadata or {}).get(b'chonkie', b'{}'))
+    return {'meta': meta, 'table': table}
+
+
+def encode(response: Dict[str, Any], media_type: str) -> bytes:
+    if media_type == MSGPACK_MEDIA_TYPE:
+        return encode_msgpack(response)
+    if media_type == ARROW_MEDIA_TYPE:
+        return encode_arrow(response)
+    raise ValueError(f"No binary encoding for {media_type}")
+
+
+def _synthetic_response(n_chunks: int, chunk_chars: int, dim: int) -> Dict[str, Any]:
+    rng = np.random.default_rng(0)
+    words = ['chunk', 'token', 'offset', 'boundary', 'sentence', 'semantic', 'window', 'embedding']
+    chunks = []
+    position = 0
+    for i in range(n_chunks):
+        text = ' '.join(rng.choice(words, size=chunk_chars // 7))[:chunk_chars]
+        chunks.append({
+            'content': text, 'index': i, 'start_index': position, 'end_index': position + len(text),
+            'token_count': len(text) // 4, 'duplicate_of': None,
+            'embedding': rng.standard_normal(dim).astype(np.float32).tolist() if dim else None
+        })
+        position += len(text)
+    return {'chunks': chunks, 'total_chunks': n_chunks, 'processing_time': 0.1,
+            'config': {'chunkerType': 'RecursiveChunker', 'chunkSize': 512}}
+
+
+def _time(fn, repeat: int) -> Tuple[float, Any]:
+    best, result = float('inf'), None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000, result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Encode/decode time and size of JSON vs MessagePack vs Arrow")
+    parser.add_argument('--chunks', type=int, default=50000)
+    parser.add_argument('--chunk-chars', type=int, default=200)
+    parser.add_argument('--embedding-dim', type=int, default=0, help="Add LateChunker-style embeddings")
+    parser.add_argument('--no-content', action='store_true', help="Offsets only, as with include_content=false")
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    from fastapi.encoders import jsonable_encoder
+    from chonkie_api_enhanced import ChunkResponse
+
+    response = _synthetic_response(args.chunks, args.chunk_chars, args.embedding_dim)
+    if args.no_content:
+        for chunk in response['chunks']:
+            chunk['content'] = None
+    model = ChunkResponse(**response)
+
+    # What FastAPI does for a response_model: validate, jsonable_encoder, json.dumps
+    def encode_json():
+        return json.dumps(jsonable_encoder(ChunkResponse.model_validate(model)), ensure_ascii=False,
+                          allow_nan=False, separators=(',', ':')).encode('utf-8')
+
+    rows = []
+    encode_ms, payload = _time(encode_json, args.repeat)
+    decode_ms, _ = _time(lambda: json.loads(payload), args.repeat)
+    rows.append(('json', encode_ms, decode_ms, len(payload)))
+    for name, media_type, decoder in (('msgpack', MSGPACK_MEDIA_TYPE, decode_msgpack),
+                                      ('arrow', ARROW_MEDIA_TYPE, decode_arrow)):
+        if not _available(media_type):
+            print(f"{name}: not installed, skipped")
+            continue
+        # Same starting point as the server: the validated response model
+        encode_ms, payload = _time(lambda: encode(model.dict(), media_type), args.repeat)
+        decode_ms, _ = _time(lambda: decoder(payload), args.repeat)
+        rows.append((name, encode_ms, decode_ms, len(payload)))
+
+    print(f"{args.chunks:,} chunks of {args.chunk_chars} chars"
+          f"{', no content' if args.no_content else ''}{f', {args.embedding_dim}-d embeddings' if args.embedding_dim else ''}")
+    print(f"{'format':<8} {'encode ms':>10} {'decode ms':>10} {'bytes':>12} {'vs json':>8}")
+    for name, encode_ms, decode_ms, size in rows:
+        print(f"{name:<8} {encode_ms:>10.1f} {decode_ms:>10.1f} {size:>12,} {size / rows[0][3]:>8.2f}")
@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+"""Text extraction for /chunk/file: PDF pages, DOCX and HTML sections.
+
+Documents are produced as a stream of sections (a PDF page, or the text
+under a DOCX/HTML heading) so chunking can start on the first pages while
+later ones are still being extracted. PDF pages are extracted in batches
+on worker processes with a bounded number of batches in flight; DOCX and
+HTML are parsed incrementally in the calling thread.
+"""
+import os
+import zipfile
+from bisect import bisect_right
+from collections import deque
+from html.parser import HTMLParser
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Tuple
+from xml.etree.ElementTree import iterparse
+
+from chonkie_cancel import check_cancelled
+
+FILE_FORMATS = ('pdf', 'docx', 'html')
+
+# Separator placed between sections in the document coordinates chunks refer to
+SECTION_SEPARATOR = '\n\n'
+
+# Pages per extraction task; enough to amortise reopening the PDF in the worker
+PDF_PAGES_PER_BATCH = 8
+
+_EXTENSIONS = {'.pdf': 'pdf', '.docx': 'docx', '.html': 'html', '.htm': 'html', '.xhtml': 'html'}
+_CONTENT_TYPES = {
+    'application/pdf': 'pdf',
+    'application/vnd.openxmlformats-officedocument.wordprocessingml.document': 'docx',
+    'text/html': 'html',
+    'application/xhtml+xml': 'html',
+}
+
+
+class Section(NamedTuple):
+    number: int  # 1-based page (PDF) or section (DOCX, HTML) number
+    title: Optional[str]
+    text: str
+
+
+def detect_format(path: str, filename: Optional[str] = None, content_type: Optional[str] = None) -> str:
+    """File format from the file's leading bytes, falling back to its name and content type"""
+    with open(path, 'rb') as f:
+        head = f.read(512)
+    if head.startswith(b'%PDF-'):
+        return 'pdf'
+    if head.startswith(b'PK'):
+        with zipfile.ZipFile(path) as archive:
+            if 'word/document.xml' in archive.namelist():
+                return 'docx'
+    fmt = _EXTENSIONS.get(os.path.splitext(filename or path)[1].lower())
+    fmt = fmt or _CONTENT_TYPES.get((content_type or '').split(';')[0].strip().lower())
+    if fmt is None and b'<' in head.lower():
+        fmt = 'html'
+    if fmt is None:
+        raise ValueError(f"Unsupported file format. Supported: {', '.join(FILE_FORMATS)}")
+    return fmt
+
+
+# ---------------------------------------------------------------- PDF
+
+# Per-process reader for the file a worker is extracting, reused across its batches.
+# Only pool workers fill it; the API process opens its own reader per request.
+_worker_reader: Dict[str, Any] = {}
+
+
+def _open_pdf(path: str):
+    try:
+        from pypdf import PdfReader
+    except ImportError:
+        raise ImportError("pypdf is required for PDF extraction")
+    return PdfReader(path)
+
+
+def _pdf_reader(path: str):
+    key = f"{path}:{os.stat(path).st_mtime_ns}"
+    if _worker_reader.get('key') != key:
+        _worker_reader.clear()
+        _worker_reader.update(key=key, reader=_open_pdf(path))
+    return _worker_reader['reader']
+
+
+def extract_pdf_pages(path: str, first: int, last: int, reader=None) -> List[str]:
+    """Text of pages [first, last) (0-based); runs in a worker process unless given a reader"""
+    if reader is None:
+        reader = _pdf_reader(path)
+    return [(reader.pages[i].extract_text() or '').strip() for i in range(first, last)]
+
+
+def iter_pdf_pages(path: str, executor=None, workers: int = 1) -> Iterator[Section]:
+    """Pages in order, with at most 2 * workers batches extracted ahead of the consumer"""
+    reader = _open_pdf(path)
+    pages = len(reader.pages)
+    batches = [(first, min(first + PDF_PAGES_PER_BATCH, pages)) for first in range(0, pages, PDF_PAGES_PER_BATCH)]
+
+    if executor is None or workers <= 1:
+        for first, last in batches:
+            check_cancelled()
+            for number, text in enumerate(extract_pdf_pages(path, first, last, reader), first + 1):
+                yield Section(number, None, text)
+        return
+
+    # The workers open their own readers; this one was only needed for the page count
+    reader = None
+    pending = deque()
+    queued = iter(batches)
+    try:
+        for first, last in queued:
+            pending.append((first, executor.submit(extract_pdf_pages, path, first, last)))
+            if len(pending) >= 2 * workers:
+                break
+        while pending:
+            check_cancelled()
+            first, future = pending.popleft()
+            texts = future.result()
+            for first_next, last_next in queued:
+                pending.append((first_next, executor.submit(extract_pdf_pages, path, first_next, last_next)))
+                break
+            for number, text in enumerate(texts, first + 1):
+                yield Section(number, None, text)
+    finally:
+        # Consumer stopped early (limit reached, cancelled): drop batches that haven't started
+        for _, future in pending:
+            future.cancel()
+
+
+# ---------------------------------------------------------------- DOCX
+
+_W = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+
+
+def iter_docx_sections(path: str) -> Iterator[Section]:
+    """Sections of a DOCX body, split at Heading/Title paragraphs; parsed as a stream"""
+    number = 1
+    title = None
+    paragraphs: List[str] = []
+    with zipfile.ZipFile(path) as archive, archive.open('word/document.xml') as document:
+        parts: List[str] = []
+        style = ''
+        for event, element in iterparse(document, events=('start', 'end')):
+            tag = element.tag
+            if event == 'start':
+                if tag == f'{_W}p':
+                    parts, style = [], ''
+                continue
+            if tag == f'{_W}t':
+                parts.append(element.text or '')
+            elif tag == f'{_W}tab':
+                parts.append('\t')
+            elif tag in (f'{_W}br', f'{_W}cr'):
+                parts.append('\n')
+            elif tag == f'{_W}pStyle':
+                style = element.get(f'{_W}val', '')
+            elif tag == f'{_W}p':
+                text = ''.join(parts).strip()
+                if style.lower().startswith(('heading', 'title')) and text:
+                    if paragraphs or title:
+                        yield Section(number, title, '\n\n'.join(paragraphs))
+                        number += 1
+                        check_cancelled()
+                    title, paragraphs = text, [text]
+                elif text:
+                    paragraphs.append(text)
+                element.clear()
+    if paragraphs or title:
+        yield Section(number, title, '\n\n'.join(paragraphs))
+
+
+# ---------------------------------------------------------------- HTML
+
+class _SectionParser(HTMLParser):
+    """Collects visible text, starting a new section at each h1-h3"""
+
+    SKIP = {'script', 'style', 'noscript', 'template', 'head', 'svg'}
+    BLOCKS = {'p', 'div', 'br', 'li', 'tr', 'section', 'article', 'header', 'footer', 'blockquote', 'pre',
+              'table', 'ul', 'ol', 'h4', 'h5', 'h6', 'dt', 'dd', 'figcaption'}
+    HEADINGS = {'h1', 'h2', 'h3'}
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.completed: List[Tuple[Optional[str], str]] = []
+        self._skip = 0
+        self._title: Optional[str] = None
+        self._heading: Optional[List[str]] = None
+        self._parts: List[str] = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self.SKIP:
+            self._skip += 1
+        elif tag in self.HEADINGS:
+            self.flush()
+            self._heading = []
+        elif tag in self.BLOCKS:
+            self._parts.append('\n')
+
+    def handle_endtag(self, tag):
+        if tag in self.SKIP:
+            self._skip = max(0, self._skip - 1)
+        elif tag in self.HEADINGS and self._heading is not None:
+            self._title = ' '.join(''.join(self._heading).split()) or None
+            self._parts.append((self._title or '') + '\n')
+            self._heading = None
+        elif tag in self.BLOCKS:
+            self._parts.append('\n')
+
+    def handle_data(self, data):
+        if self._skip:
+            return
+        if self._heading is not None:
+            self._heading.append(data)
+        else:
+            self._parts.append(data)
+
+    def flush(self):
+        lines = [' '.join(line.split()) for line in ''.join(self._parts).split('\n')]
+        text = '\n'.join(line for line in lines if line)
+        if text:
+            self.completed.append((self._title, text))
+        self._title, self._parts = None, []
+
+
+def iter_html_sections(path: str, read_size: int = 1 << 16) -> Iterator[Section]:
+    parser = _SectionParser()
+    number = 1
+    with open(path, 'r', encoding='utf-8', errors='replace') as f:
+        while True:
+            data = f.read(read_size)
+            if data:
+                parser.feed(data)
+            else:
+                parser.close()
+                parser.flush()
+            for title, text in parser.completed:
+                yield Section(number, title, text)
+                number += 1
+            parser.completed.clear()
+            if not data:
+                return
+            check_cancelled()
+
+
+def iter_sections(path: str, fmt: str, executor=None, workers: int = 1) -> Iterator[Section]:
+    if fmt == 'pdf':
+        return iter_pdf_pages(path, executor, workers)
+    if fmt == 'docx':
+        return iter_docx_sections(path)
+    if fmt == 'html':
+        return iter_html_sections(path)
+    raise ValueError(f"Unsupported file format '{fmt}'. Supported: {', '.join(FILE_FORMATS)}")
+
+
+# ---------------------------------------------------------------- Chunking
+
+class SectionChunker:
+    """Chunks a section stream window by window, tracking where each chunk came from.
+
+    Sections are laid end to end, joined by SECTION_SEPARATOR, and chunk
+    offsets refer to that document. They are gathered into windows of at
+    most `window_chars`, cut at section boundaries, and each window is
+    chunked as soon as the next section doesn't fit, so only one window of
+    text is held at a time. A section longer than a window is chunked on
+    its own in segments. Extraction stops once `max_chars` is reached.
+    """
+
+    def __init__(self, chunker, window_chars: int, split_segments, max_chars: Optional[int] = None):
+        self.chunker = chunker
+        self.window_chars = window_chars
+        self.split_segments = split_segments
+        self.max_chars = max_chars
+        self.sections: List[Dict[str, Any]] = []
+        self.truncated_at: Optional[int] = None  # First section left out because of max_chars
+        self.chars = 0
+
+    def _chunk_window(self, window: List[Section], starts: List[int]) -> Iterator[Tuple[Any, int, int, Dict[str, Any]]]:
+        text = SECTION_SEPARATOR.join(section.text for section in window)
+        if len(text) > self.window_chars:
+            segments = self.split_segments(text, self.window_chars)
+        else:
+            segments = [(0, text)]
+        for segment_offset, segment in segments:
+            check_cancelled()
+            base = starts[0] + segment_offset
+            for chunk in self.chunker.chunk(segment):
+                start = base + getattr(chunk, 'start_index', 0)
+                end = base + getattr(chunk, 'end_index', len(segment))
+                first = max(0, bisect_right(starts, start) - 1)
+                last = max(first, bisect_right(starts, end - 1) - 1)
+                yield chunk, start, end, {
+                    'page_start': window[first].number,
+                    'page_end': window[last].number,
+                    'page_offset': start - starts[first],
+                    'section_title': window[first].title
+                }
+
+    def chunk(self, sections: Iterator[Section]) -> Iterator[Tuple[Any, int, int, Dict[str, Any]]]:
+        """Yields (chunk, start, end, provenance) with offsets in document coordinates"""
+        window: List[Section] = []
+        starts: List[int] = []
+        next_start = 0
+        for section in sections:
+            if self.max_chars is not None and next_start + len(section.text) > self.max_chars:
+                self.truncated_at = section.number
+                break
+            if window and next_start + len(section.text) - starts[0] > self.window_chars:
+                yield from self._chunk_window(window, starts)
+                window, starts = [], []
+            window.append(section)
+            starts.append(next_start)
+            self.sections.append({'number': section.number, 'title': section.title,
+                                  'start_index': next_start, 'chars': len(section.text)})
+            self.chars = next_start + len(section.text)
+            next_start = self.chars + len(SECTION_SEPARATOR)
+        if window:
+            yield from self._chunk_window(window, starts)
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+import time
+import uuid
+import threading
+from enum import Enum
+from typing import Dict, Any, List, Optional, Tuple
+
+
+class ChunkJobStatus(str, Enum):
+    """Status of an asynchronous chunking job."""
+    PENDING = "pending"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+TERMINAL_STATUSES = (ChunkJobStatus.COMPLETED, ChunkJobStatus.FAILED)
+
+
+class ChunkJobStore:
+    """Thread-safe in-memory store for chunking jobs.
+
+    Jobs are updated from worker threads, so every access goes through a
+    plain threading lock rather than an asyncio one. Jobs are keyed by a
+    hash of the request so a client retrying after a timeout attaches to
+    the job that is already running instead of submitting the work twice.
+    """
+
+    def __init__(self, max_jobs: int = 200, ttl_seconds: int = 3600):
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        self._jobs_by_key: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self.max_jobs = max_jobs
+        self.ttl_seconds = ttl_seconds
+
+    def create_job(self, key: str, total_chars: int) -> Tuple[str, bool]:
+        """Create a job for a request key, or return the live job for that key.
+
+        Returns the job id and whether a new job was created.
+        """
+        with self._lock:
+            self._evict_expired()
+
+            existing_id = self._jobs_by_key.get(key)
+            if existing_id is not None:
+                existing = self._jobs.get(existing_id)
+                if existing and existing["status"] != ChunkJobStatus.FAILED:
+                    return existing_id, False
+
+            job_id = str(uuid.uuid4())
+            self._jobs[job_id] = {
+                "job_id": job_id,
+                "key": key,
+                "status": ChunkJobStatus.PENDING,
+                "created_at": time.time(),
+                "started_at": None,
+                "completed_at": None,
+                "total_chars": total_chars,
+                "processed_chars": 0,
+                "result": None,
+                "error": None,
+            }
+            self._jobs_by_key[key] = job_id
+            return job_id, True
+
+    def start_job(self, job_id: str) -> None:
+        """Mark a job as running."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                job["status"] = ChunkJobStatus.RUNNING
+                job["started_at"] = time.time()
+
+    def update_progress(self, job_id: str, processed_chars: int) -> None:
+        """Record how many characters of the document have been chunked."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                job["processed_chars"] = min(processed_chars, job["total_chars"])
+
+    def complete_job(self, job_id: str, result: Any) -> None:
+        """Mark a job as completed and store its result."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                job["status"] = ChunkJobStatus.COMPLETED
+                job["completed_at"] = time.time()
+                job["processed_chars"] = job["total_chars"]
+                job["result"] = result
+
+    def fail_job(self, job_id: str, error: str) -> None:
+        """Mark a job as failed."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                job["status"] = ChunkJobStatus.FAILED
+                job["completed_at"] = time.time()
+                job["error"] = error
+
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Get a snapshot of a job, or None if it does not exist."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job is not None else None
+
+    def list_jobs(self) -> List[Dict[str, Any]]:
+        """List snapshots of all jobs, newest first."""
+        with self._lock:
+            jobs = [dict(job) for job in self._jobs.values()]
+        jobs.sort(key=lambda job: job["created_at"], reverse=True)
+        return jobs
+
+    def _evict_expired(self) -> None:
+        # Caller must hold the lock
+        now = time.time()
+        finished = [
+            job for job in self._jobs.values()
+            if job["status"] in TERMINAL_STATUSES
+        ]
+        expired = [job for job in finished if now - job["completed_at"] > self.ttl_seconds]
+
+        # Over capacity: drop the oldest finished jobs first
+        overflow = len(self._jobs) - len(expired) - self.max_jobs + 1
+        if overflow > 0:
+            remaining = sorted(
+                (job for job in finished if job not in expired),
+                key=lambda job: job["completed_at"]
+            )
+            expired.extend(remaining[:overflow])
+
+        for job in expired:
+            self._jobs.pop(job["job_id"], None)
+            if self._jobs_by_key.get(job["key"]) == job["job_id"]:
+                del self._jobs_by_key[job["key"]]
+
+
+def job_status_payload(job: Dict[str, Any]) -> Dict[str, Any]:
+    """Public view of a job, without the stored result."""
+    total = job["total_chars"]
+    percentage = (job["processed_chars"] / total * 100) if total > 0 else 0.0
+    return {
+        "job_id": job["job_id"],
+        "status": job["status"].value,
+        "created_at": job["created_at"],
+        "started_at": job["started_at"],
+        "completed_at": job["completed_at"],
+        "total_chars": total,
+        "processed_chars": job["processed_chars"],
+        "percentage": round(percentage, 2),
+        "error": job["error"],
+    }
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+import os
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, List, Tuple
+
+import numpy as np
+
+try:
+    import chonkie
+except ImportError:
+    raise ImportError("Chonkie not installed")
+
+
+class TokenEmbeddingCache:
+    """LRU cache of whole-document token embeddings, keyed by (model, text hash).
+
+    Late chunking encodes the entire document at token level and only then
+    pools token vectors per chunk. The encoding is by far the expensive part
+    and doesn't depend on the chunk size, so keeping it lets a document be
+    re-chunked at other sizes for the cost of the pooling alone. Entries are
+    bounded by total array size rather than count, since one long document
+    can outweigh hundreds of short ones.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+
+    @staticmethod
+    def key(model_name: str, text: str) -> Tuple[str, str]:
+        return model_name, hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+    def get(self, key: Tuple[str, str]):
+        with self._lock:
+            embeddings = self._entries.get(key)
+            if embeddings is None:
+                self.stats['misses'] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats['hits'] += 1
+            return embeddings
+
+    def put(self, key: Tuple[str, str], embeddings: np.ndarray) -> None:
+        if embeddings.nbytes > self.max_bytes:
+            return
+        # Cached arrays are handed to every later request, so they must not change
+        embeddings.setflags(write=False)
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous.nbytes
+            self._entries[key] = embeddings
+            self._bytes += embeddings.nbytes
+            while self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.nbytes
+                self.stats['evictions'] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {**self.stats, 'documents': len(self._entries), 'megabytes': round(self._bytes / 2**20, 2)}
+
+
+token_embedding_cache = TokenEmbeddingCache(int(float(os.getenv('CHONKIE_LATE_CACHE_MB', '256')) * 2**20))
+
+# Loaded embedding models, shared by every LateChunker in the process
+_models: Dict[str, Any] = {}
+_models_lock = threading.Lock()
+
+
+def late_embeddings(model: str):
+    """SentenceTransformerEmbeddings for a model name, loaded once per process"""
+    with _models_lock:
+        embeddings = _models.get(model)
+        if embeddings is None:
+            print(f"[LateChunker] Loading {model}")
+            embeddings = _models[model] = chonkie.SentenceTransformerEmbeddings(model=model)
+        return embeddings
+
+
+class _CachedTokenEmbeddings:
+    """Proxy for an embedding model whose embed_as_tokens goes through the cache"""
+
+    def __init__(self, model, model_name: str, cache: TokenEmbeddingCache):
+        self._model = model
+        self._model_name = model_name
+        self._cache = cache
+        self.last_hit = None
+
+    def __getattr__(self, name):
+        return getattr(self._model, name)
+
+    def embed_as_tokens(self, text: str) -> np.ndarray:
+        key = self._cache.key(self._model_name, text)
+        embeddings = self._cache.get(key)
+        # Only the first lookup since the chunker reset it says whether the document was cached
+        if self.last_hit is None:
+            self.last_hit = embeddings is not None
+        if embeddings is None:
+            embeddings = self._model.embed_as_tokens(text)
+            self._cache.put(key, embeddings)
+        return embeddings
+
+
+class CachedLateChunker(chonkie.LateChunker):
+    """LateChunker that reuses document token embeddings across chunk sizes.
+
+    The first request for a document pays for the long-context encoding;
+    later ones with the same model and text, at any chunk size, only
+    re-run the recursive split and per-chunk pooling. chunk_sizes() does
+    several sizes in one call.
+    """
+
+    def __init__(self, model: str = 'all-MiniLM-L6-v2', cache: TokenEmbeddingCache = token_embedding_cache,
+                 **kwargs):
+        super().__init__(embedding_model=late_embeddings(model), **kwargs)
+        self.embedding_model = _CachedTokenEmbeddings(self.embedding_model, model, cache)
+
+    @property
+    def last_cache_hit(self):
+        """Whether the last chunk()/chunk_sizes() call found the document already encoded"""
+        return self.embedding_model.last_hit
+
+    def chunk(self, text: str):
+        self.embedding_model.last_hit = None
+        return super().chunk(text)
+
+    def chunk_sizes(self, text: str, sizes: List[int]) -> List[Tuple[int, list]]:
+        """Chunk the text once per size, encoding the document at most once"""
+        original_size = self.chunk_size
+        self.embedding_model.last_hit = None
+        try:
+            results = []
+            for size in sizes:
+                if size <= 0:
+                    raise ValueError("chunk sizes must be greater than 0")
+                self.chunk_size = size
+                # Skips chunk() so the later sizes' lookups don't replace the first one's
+                results.append((size, super().chunk(text)))
+            return results
+        finally:
+            self.chunk_size = original_size
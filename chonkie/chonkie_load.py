@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+"""Load generator for the Chonkie API with a configurable traffic mix.
+
+Virtual users each loop: pick a scenario by weight, build a document of a
+size drawn from that scenario's distribution, POST it and record the
+outcome. Runs against a local instance (--url) or starts the API
+in-process on a free port (--in-process), sampling the server's RSS as
+it goes. The JSON report has totals, per-scenario and per-interval
+figures, and --compare prints the difference between two reports.
+
+    python chonkie_load.py --in-process --users 20 --duration 60 -o report.json
+    python chonkie_load.py --url http://127.0.0.1:8000 --pid $(pgrep -f uvicorn) --mix mix.json
+    python chonkie_load.py --compare before.json after.json
+
+A mix file is a list of scenarios:
+
+    [{"name": "semantic", "weight": 2, "config": {"chunkerType": "SemanticChunker"},
+      "median_chars": 6000, "sigma": 0.8, "max_chars": 8000, "override_rate": 0.0}]
+
+Sizes are log-normal around median_chars; with probability override_rate
+a request instead asks for up to override_chars with override_limit set.
+"""
+import os
+import sys
+import json
+import time
+import random
+import socket
+import asyncio
+import argparse
+import platform
+import subprocess
+import threading
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+# Close to what the visualizer sends: mostly fast chunkers on pasted text, some semantic, rare overrides
+DEFAULT_MIX = [
+    {'name': 'token', 'weight': 3, 'config': {'chunkerType': 'TokenChunker', 'chunkSize': 512},
+     'median_chars': 4000, 'sigma': 1.0, 'max_chars': 25000, 'override_rate': 0.05, 'override_chars': 200000},
+    {'name': 'sentence', 'weight': 2, 'config': {'chunkerType': 'SentenceChunker', 'chunkSize': 512},
+     'median_chars': 4000, 'sigma': 1.0, 'max_chars': 25000},
+    {'name': 'recursive', 'weight': 3, 'config': {'chunkerType': 'RecursiveChunker', 'chunkSize': 512},
+     'median_chars': 4000, 'sigma': 1.0, 'max_chars': 15000, 'override_rate': 0.05, 'override_chars': 100000},
+    {'name': 'semantic', 'weight': 2,
+     'config': {'chunkerType': 'SemanticChunker', 'chunkSize': 512, 'embeddingProvider': 'model2vec',
+                'embeddingModel': 'minishlab/potion-base-8M'},
+     'median_chars': 3000, 'sigma': 0.8, 'max_chars': 8000},
+]
+
+_WORDS = ('the of and to in is that for it as was with be by on not he this are or his from at which but have '
+          'an they you were her she there been one all we their has would when if so no what up can more out '
+          'about into them some could time these two may then do first any my now such like other how over '
+          'chunk token boundary semantic document sentence window embedding offset model text split').split()
+
+
+def make_text(rng: random.Random, chars: int) -> str:
+    """Prose-shaped filler: sentences of 6-24 words, paragraphs of 3-8 sentences"""
+    parts = []
+    size = 0
+    while size < chars:
+        paragraph = []
+        for _ in range(rng.randint(3, 8)):
+            words = rng.choices(_WORDS, k=rng.randint(6, 24))
+            paragraph.append(' '.join(words).capitalize() + '.')
+        text = ' '.join(paragraph)
+        parts.append(text)
+        size += len(text) + 2
+    return '\n\n'.join(parts)[:chars]
+
+
+def process_rss_mb(pid: int) -> Optional[float]:
+    try:
+        with open(f'/proc/{pid}/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    return None
+
+
+def latency_stats(latencies: List[float]) -> Dict[str, Optional[float]]:
+    if not latencies:
+        return {'p50_ms': None, 'p90_ms': None, 'p99_ms': None, 'max_ms': None}
+    p50, p90, p99 = np.percentile(latencies, [50, 90, 99]) * 1000
+    return {'p50_ms': round(float(p50), 1), 'p90_ms': round(float(p90), 1), 'p99_ms': round(float(p99), 1),
+            'max_ms': round(max(latencies) * 1000, 1)}
+
+
+def summarize(records: List[Dict[str, Any]], seconds: float) -> Dict[str, Any]:
+    ok = [r for r in records if r['ok']]
+    statuses: Dict[str, int] = {}
+    for record in records:
+        statuses[str(record['status'])] = statuses.get(str(record['status']), 0) + 1
+    return {
+        'requests': len(records),
+        'throughput_rps': round(len(records) / max(seconds, 1e-9), 2),
+        'chars_per_second': round(sum(r['chars'] for r in ok) / max(seconds, 1e-9)),
+        'error_rate': round(1 - len(ok) / len(records), 4) if records else 0.0,
+        'statuses': statuses,
+        # Latency of successful requests; failures are often fast and would flatter the percentiles
+        **latency_stats([r['latency'] for r in ok])
+    }
+
+
+class LoadTest:
+    def __init__(self, url: str, mix: List[Dict[str, Any]], users: int, duration: float, seed: int = 0,
+                 think_ms: float = 0, interval: float = 5.0, pid: Optional[int] = None, timeout: float = 120.0):
+        self.url = url.rstrip('/')
+        self.mix = mix
+        self.users = users
+        self.duration = duration
+        self.seed = seed
+        self.think = think_ms / 1000
+        self.interval = interval
+        self.pid = pid
+        self.timeout = timeout
+        self.records: List[Dict[str, Any]] = []
+        self.rss: List[Dict[str, Any]] = []
+        # Documents are cut from one long text so generating them doesn't load the client
+        longest = max(max(s.get('max_chars', 25000), s.get('override_chars', 0)) for s in mix)
+        self._corpus = make_text(random.Random(seed), longest + 10000)
+
+    def _request(self, rng: random.Random) -> Dict[str, Any]:
+        scenario = rng.choices(self.mix, weights=[s.get('weight', 1) for s in self.mix])[0]
+        override = rng.random() < scenario.get('override_rate', 0.0)
+        if override:
+            chars = rng.randint(scenario.get('max_chars', 25000) + 1, scenario.get('override_chars', 100000))
+        else:
+            median = scenario.get('median_chars', 4000)
+            chars = int(min(max(rng.lognormvariate(np.log(median), scenario.get('sigma', 1.0)), 50),
+                            scenario.get('max_chars', 25000)))
+        start = rng.randrange(0, len(self._corpus) - chars)
+        body = {'text': self._corpus[start:start + chars], 'config': scenario['config'],
+                'override_limit': override}
+        return {'scenario': scenario['name'], 'chars': chars, 'override': override, 'body': body}
+
+    async def _user(self, client, user: int, started: float, deadline: float) -> None:
+        rng = random.Random(self.seed * 1000 + user)
+        while time.perf_counter() < deadline:
+            request = self._request(rng)
+            sent = time.perf_counter()
+            try:
+                response = await client.post(f'{self.url}/chunk', json=request['body'], timeout=self.timeout)
+                status, size = response.status_code, len(response.content)
+            except Exception as e:
+                status, size = type(e).__name__, 0
+            finished = time.perf_counter()
+            self.records.append({
+                'scenario': request['scenario'], 'chars': request['chars'], 'override': request['override'],
+                'status': status, 'ok': status == 200, 'bytes': size,
+                'sent': sent - started, 'latency': finished - sent
+            })
+            if self.think:
+                await asyncio.sleep(rng.expovariate(1 / self.think))
+
+    async def _sample_rss(self, started: float, deadline: float) -> None:
+        while time.perf_counter() < deadline:
+            if self.pid is not None:
+                self.rss.append({'t': round(time.perf_counter() - started, 1), 'rss_mb': process_rss_mb(self.pid)})
+            await asyncio.sleep(1.0)
+
+    async def run(self) -> Dict[str, Any]:
+        import httpx
+
+        limits = httpx.Limits(max_connections=self.users, max_keepalive_connections=self.users)
+        async with httpx.AsyncClient(limits=limits) as client:
+            (await client.get(f'{self.url}/health')).raise_for_status()
+            started = time.perf_counter()
+            deadline = started + self.duration
+            await asyncio.gather(
+                self._sample_rss(started, deadline),
+                *(self._user(client, user, started, deadline) for user in range(self.users))
+            )
+            elapsed = time.perf_counter() - started
+            try:
+                server_metrics = (await client.get(f'{self.url}/metrics')).json()
+            except Exception:
+                server_metrics = None
+        return self.report(elapsed, server_metrics)
+
+    def report(self, elapsed: float, server_metrics: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        scenarios = {}
+        for name in dict.fromkeys(record['scenario'] for record in self.records):
+            scenarios[name] = summarize([r for r in self.records if r['scenario'] == name], elapsed)
+        overrides = [r for r in self.records if r['override']]
+
+        timeline = []
+        for bucket_start in np.arange(0, elapsed, self.interval):
+            bucket = [r for r in self.records if bucket_start <= r['sent'] + r['latency'] < bucket_start + self.interval]
+            rss = [s['rss_mb'] for s in self.rss
+                   if bucket_start <= s['t'] < bucket_start + self.interval and s['rss_mb'] is not None]
+            timeline.append({
+                't': round(float(bucket_start), 1),
+                **summarize(bucket, min(self.interval, elapsed - bucket_start)),
+                'rss_mb': max(rss) if rss else None
+            })
+
+        rss_values = [s['rss_mb'] for s in self.rss if s['rss_mb'] is not None]
+        return {
+            'run': {
+                'url': self.url, 'users': self.users, 'duration_s': round(elapsed, 1), 'seed': self.seed,
+                'think_ms': self.think * 1000, 'mix': self.mix, 'started_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                'revision': _git_revision(), 'python': platform.python_version(), 'host_cpus': os.cpu_count()
+            },
+            'totals': {
+                **summarize(self.records, elapsed),
+                'override_requests': len(overrides),
+                'rss_start_mb': rss_values[0] if rss_values else None,
+                'rss_peak_mb': max(rss_values) if rss_values else None,
+                'rss_end_mb': rss_values[-1] if rss_values else None
+            },
+            'scenarios': scenarios,
+            'timeline': timeline,
+            'server_metrics': server_metrics
+        }
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def start_in_process() -> str:
+    """Serve the API from a background thread on a free local port; returns its URL"""
+    import uvicorn
+    from chonkie_api_enhanced import app
+
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        port = s.getsockname()[1]
+    server = uvicorn.Server(uvicorn.Config(app, host='127.0.0.1', port=port, log_level='warning'))
+    threading.Thread(target=server.run, name='chonkie-load-server', daemon=True).start()
+    deadline = time.time() + 30
+    while not server.started:
+        if time.time() > deadline:
+            raise RuntimeError("In-process server did not start within 30s")
+        time.sleep(0.05)
+    return f'http://127.0.0.1:{port}'
+
+
+def compare(before: Dict[str, Any], after: Dict[str, Any]) -> None:
+    """Print the change in headline figures between two reports"""
+    def line(label: str, old, new, lower_is_better: bool) -> None:
+        if old is None or new is None:
+            print(f"  {label:<20} {old!s:>10} -> {new!s:<10}")
+            return
+        better = None if new == old else (new < old) == lower_is_better
+        mark = '' if better is None else ('  better' if better else '  WORSE')
+        change = f"({(new - old) / old * 100:+.1f}%)" if old else ''
+        print(f"  {label:<20} {old:>10} -> {new:<10} {change}{mark}")
+
+    print(f"{before['run'].get('revision')} -> {after['run'].get('revision')}")
+    for name in ['totals'] + [f'scenarios.{s}' for s in after.get('scenarios', {})]:
+        old = before['totals'] if name == 'totals' else before.get('scenarios', {}).get(name.split('.', 1)[1])
+        new = after['totals'] if name == 'totals' else after['scenarios'][name.split('.', 1)[1]]
+        if old is None:
+            continue
+        print(name)
+        line('throughput_rps', old['throughput_rps'], new['throughput_rps'], False)
+        for key in ('p50_ms', 'p99_ms', 'error_rate'):
+            line(key, old[key], new[key], True)
+        if name == 'totals':
+            line('rss_peak_mb', old.get('rss_peak_mb'), new.get('rss_peak_mb'), True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mixed-traffic load test for the Chonkie API")
+    parser.add_argument('--url', help="Running instance, e.g. http://127.0.0.1:8000")
+    parser.add_argument('--in-process', action='store_true', help="Start the API in this process instead")
+    parser.add_argument('--pid', type=int, help="Server process to sample RSS from (default: this one in-process)")
+    parser.add_argument('--mix', help="JSON file with the traffic mix (default: built-in visualizer-like mix)")
+    parser.add_argument('--users', type=int, default=20, help="Concurrent virtual users")
+    parser.add_argument('--duration', type=float, default=60.0, help="Seconds to run")
+    parser.add_argument('--think-ms', type=float, default=0.0, help="Mean pause between a user's requests")
+    parser.add_argument('--interval', type=float, default=5.0, help="Seconds per timeline bucket")
+    parser.add_argument('--timeout', type=float, default=120.0, help="Per-request timeout in seconds")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('-o', '--output', help="Write the JSON report here")
+    parser.add_argument('--compare', nargs=2, metavar=('BEFORE', 'AFTER'), help="Compare two reports and exit")
+    args = parser.parse_args()
+
+    if args.compare:
+        with open(args.compare[0]) as f_before, open(args.compare[1]) as f_after:
+            compare(json.load(f_before), json.load(f_after))
+        sys.exit(0)
+
+    if args.in_process == bool(args.url):
+        parser.error("Give exactly one of --url or --in-process")
+    mix = DEFAULT_MIX
+    if args.mix:
+        with open(args.mix) as f:
+            mix = json.load(f)
+
+    url = start_in_process() if args.in_process else args.url
+    pid = args.pid or (os.getpid() if args.in_process else None)
+    test = LoadTest(url, mix, args.users, args.duration, args.seed, args.think_ms, args.interval, pid, args.timeout)
+    print(f"[Load] {args.users} users for {args.duration:g}s against {url}")
+    report = asyncio.run(test.run())
+
+    totals = report['totals']
+    print(f"[Load] {totals['requests']} requests, {totals['throughput_rps']} req/s, "
+          f"p50 {totals['p50_ms']} ms, p99 {totals['p99_ms']} ms, errors {totals['error_rate']:.1%}, "
+          f"RSS peak {totals['rss_peak_mb']} MB")
+    for name, stats in report['scenarios'].items():
+        print(f"  {name:<12} {stats['requests']:>6} req  p50 {stats['p50_ms']} ms  p99 {stats['p99_ms']} ms  "
+              f"errors {stats['error_rate']:.1%}  {stats['statuses']}")
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"[Load] Report written to {args.output}")
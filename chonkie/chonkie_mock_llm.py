@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""OpenAI-compatible mock LLM for exercising SlumberChunker without a real model.
+
+Answers chat completions for SlumberChunker prompts with a deterministic
+split: the first passage that shares (almost) no words with the one before
+it, or N+1 when there is none. Latency is simulated per call, so the effect
+of concurrent calls and the decision cache can be measured.
+
+    python chonkie_mock_llm.py --port 9100 --latency-ms 500
+    CHONKIE_GENIE_BASE_URL=http://127.0.0.1:9100/v1 OPENAI_API_KEY=mock uvicorn chonkie_api_enhanced:app
+"""
+import re
+import json
+import time
+import asyncio
+import argparse
+from typing import Dict, Any, List
+
+from fastapi import FastAPI
+
+app = FastAPI(title="Mock LLM", description="Deterministic split decisions for SlumberChunker")
+
+LATENCY_SECONDS = 0.5
+_PASSAGE_RE = re.compile(r'^ID (\d+): (.*)$', re.MULTILINE)
+_WORD_RE = re.compile(r'\w+')
+stats = {'requests': 0, 'in_flight': 0, 'max_in_flight': 0}
+
+
+def choose_split(prompt: str) -> int:
+    passages = [(int(number), text) for number, text in _PASSAGE_RE.findall(prompt)]
+    if not passages:
+        return 1
+    previous = None
+    for number, text in passages:
+        words = set(_WORD_RE.findall(text.lower()))
+        if previous is not None and words and previous:
+            overlap = len(words & previous) / len(words | previous)
+            if overlap < 0.1:
+                return number
+        previous = words
+    return passages[-1][0] + 1
+
+
+@app.post("/v1/chat/completions")
+async def chat_completions(body: Dict[str, Any]):
+    stats['requests'] += 1
+    stats['in_flight'] += 1
+    stats['max_in_flight'] = max(stats['max_in_flight'], stats['in_flight'])
+    try:
+        await asyncio.sleep(LATENCY_SECONDS)
+    finally:
+        stats['in_flight'] -= 1
+
+    messages: List[Dict[str, Any]] = body.get('messages', [])
+    split = choose_split(messages[-1]['content'] if messages else '')
+    content = json.dumps({'split_index': split}) if body.get('response_format') else str(split)
+    return {
+        'id': f"mock-{stats['requests']}",
+        'object': 'chat.completion',
+        'created': int(time.time()),
+        'model': body.get('model', 'mock'),
+        'choices': [{
+            'index': 0,
+            'message': {'role': 'assistant', 'content': content},
+            'finish_reason': 'stop'
+        }],
+        'usage': {'prompt_tokens': 0, 'completion_tokens': 0, 'total_tokens': 0}
+    }
+
+
+@app.get("/stats")
+async def get_stats():
+    return stats
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Mock OpenAI-compatible LLM for SlumberChunker")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=9100)
+    parser.add_argument('--latency-ms', type=float, default=500.0, help="Simulated time per completion")
+    args = parser.parse_args()
+    LATENCY_SECONDS = args.latency_ms / 1000
+    uvicorn.run(app, host=args.host, port=args.port)
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+import os
+import json
+from concurrent.futures import ProcessPoolExecutor, wait
+from typing import Dict, Any, Callable, List, Tuple
+
+try:
+    import chonkie
+except ImportError:
+    raise ImportError("Chonkie not installed")
+
+from chonkie_cancel import ChunkCancelled, check_cancelled
+from chonkie_cpu import cpu_budget
+
+# Chunkers whose output only depends on text to the right of a chunk start,
+# which is what makes segment-and-repair give the sequential result
+PARALLEL_CHUNKERS = ('RecursiveChunker', 'SentenceChunker', 'TokenChunker')
+
+# Initial size of the window re-chunked around each segment boundary
+REPAIR_WINDOW_CHARS = 8192
+
+# How often the request thread looks for cancellation while segments run
+CANCEL_POLL_SECONDS = 0.1
+
+# Per-process chunkers, keyed by the serialized config
+_worker_chunkers: Dict[str, Any] = {}
+
+
+def _shift(chunks, offset: int) -> List[Any]:
+    """Copy chunks with their offsets moved into document coordinates"""
+    return [
+        chonkie.Chunk(
+            text=chunk.text,
+            start_index=chunk.start_index + offset,
+            end_index=chunk.end_index + offset,
+            token_count=chunk.token_count
+        )
+        for chunk in chunks
+    ]
+
+
+def _chunk_segment(config_json: str, segment: str, offset: int) -> List[Any]:
+    """Worker entry point: chunk one segment with a per-process chunker"""
+    # Imported here: the API module imports this one
+    from chonkie_api_enhanced import ChunkConfig, create_chunker
+
+    chunker = _worker_chunkers.get(config_json)
+    if chunker is None:
+        chunker = _worker_chunkers[config_json] = create_chunker(ChunkConfig(**json.loads(config_json)))
+    return _shift(chunker.chunk(segment), offset)
+
+
+def aligned_cuts(text_length: int, segments: int, step: int) -> List[int]:
+    """Segment starts on multiples of `step`, so every segment starts where a chunk would"""
+    size = max(step, -(-text_length // segments // step) * step)
+    return list(range(0, text_length, size))
+
+
+def stitch(text: str, cuts: List[int], segment_chunks: List[List[Any]],
+           rechunk: Callable[[int, int], List[Any]], is_anchor: Callable[[int], bool]) -> List[Any]:
+    """Join per-segment chunks into exactly the sequential result.
+
+    An anchor is a position where chunking the rest of the text afresh gives
+    the same chunks as the sequential run would from there (a paragraph
+    start for RecursiveChunker, a sentence start for SentenceChunker). At
+    each boundary the trusted chunks are cut back to their last anchored
+    start, and the text from there is re-chunked sequentially until one of
+    the re-chunked chunks matches an anchored chunk of a later segment.
+    From that chunk on both runs see the same text from the same position,
+    so the later segment's remaining chunks are taken as they are.
+    """
+    final: List[Any] = []
+    pending = segment_chunks[0]
+    k = 0
+    while k + 1 < len(segment_chunks):
+        # pending[0] is always anchored: it is either the document start or a match
+        last_anchor = max((i for i, c in enumerate(pending) if is_anchor(c.start_index)), default=None)
+        if last_anchor is None:
+            position = final[-1].end_index if final else 0
+        else:
+            final.extend(pending[:last_anchor])
+            position = pending[last_anchor].start_index
+
+        window = REPAIR_WINDOW_CHARS
+        while True:
+            end = min(len(text), position + window)
+            redo = rechunk(position, end)
+            # The last re-chunked chunk may be cut short by the window, unless at the end of the text
+            usable = redo if end == len(text) else redo[:-1]
+
+            match = None
+            for j, chunk in enumerate(usable):
+                if not is_anchor(chunk.start_index):
+                    continue
+                for next_k in range(k + 1, len(segment_chunks)):
+                    if cuts[next_k] > chunk.start_index:
+                        break
+                    for i, candidate in enumerate(segment_chunks[next_k]):
+                        if (candidate.start_index == chunk.start_index
+                                and candidate.end_index == chunk.end_index):
+                            match = (j, next_k, i)
+                            break
+                if match:
+                    break
+
+            if match:
+                j, next_k, i = match
+                final.extend(redo[:j])
+                pending = segment_chunks[next_k][i:]
+                k = next_k
+                break
+            if end == len(text):
+                # Never back in step; the re-chunked tail is the sequential result
+                final.extend(redo)
+                return final
+            window *= 2
+
+    final.extend(pending)
+    return final
+
+
+class ParallelChunker:
+    """Chunks one large document across a process pool with sequential-identical output"""
+
+    def __init__(self, chunker, config, executor: ProcessPoolExecutor, segments: int,
+                 safe_cuts: Callable[[str, int], List[Tuple[int, str]]]):
+        self.chunker = chunker
+        self.config = config
+        self.executor = executor
+        self.segments = segments
+        self.safe_cuts = safe_cuts
+
+    @staticmethod
+    def supports(config) -> bool:
+        # Word tokens don't map to fixed character positions, so there is no anchor test
+        if config.chunkerType == 'TokenChunker':
+            return config.tokenizerType != 'WordTokenizer'
+        return config.chunkerType in PARALLEL_CHUNKERS
+
+    def _token_step(self) -> int:
+        return max(1, self.config.chunkSize - (self.config.chunkOverlap or 0))
+
+    def _anchor_test(self, text: str) -> Callable[[int], bool]:
+        chunker_type = self.config.chunkerType
+        if chunker_type == 'TokenChunker':
+            step = self._token_step()
+            return lambda pos: pos % step == 0
+        if chunker_type == 'RecursiveChunker':
+            # Top-level rule splits on line breaks, keeping the delimiter with the previous piece
+            return lambda pos: pos == 0 or text[pos - 1] in '\n\r'
+        delims = getattr(self.chunker, 'delim', ['. ', '! ', '? ', '\n'])
+        if isinstance(delims, str):
+            delims = [delims]
+        return lambda pos: pos == 0 or any(text.startswith(d, pos - len(d)) for d in delims)
+
+    def _cuts(self, text: str) -> List[int]:
+        if self.config.chunkerType == 'TokenChunker':
+            # Cut exactly where sequential chunks start
+            return aligned_cuts(len(text), self.segments, self._token_step())
+        size = -(-len(text) // self.segments)
+        return [offset for offset, _ in self.safe_cuts(text, size)]
+
+    def chunk(self, text: str) -> List[Any]:
+        cuts = self._cuts(text)
+        if len(cuts) <= 1:
+            return self.chunker.chunk(text)
+
+        config_json = json.dumps(self.config.dict(), sort_keys=True)
+        bounds = list(zip(cuts, cuts[1:] + [len(text)]))
+        futures = [
+            self.executor.submit(_chunk_segment, config_json, text[start:end], start)
+            for start, end in bounds
+        ]
+        try:
+            pending = set(futures)
+            while pending:
+                _, pending = wait(pending, timeout=CANCEL_POLL_SECONDS)
+                check_cancelled()
+        except ChunkCancelled:
+            # Queued segments never start; ones already running finish and are dropped
+            for future in futures:
+                future.cancel()
+            raise
+        segment_chunks = [future.result() for future in futures]
+
+        def rechunk(start: int, end: int) -> List[Any]:
+            check_cancelled()
+            return _shift(self.chunker.chunk(text[start:end]), start)
+
+        return stitch(text, cuts, segment_chunks, rechunk, self._anchor_test(text))
+
+
+def default_workers() -> int:
+    return int(os.getenv('CHONKIE_PARALLEL_WORKERS', str(cpu_budget.threads)))
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+from typing import Any, List, Tuple
+
+try:
+    import chonkie
+except ImportError:
+    raise ImportError("Chonkie not installed")
+
+from chonkie_timing import stage
+
+PIPELINE_MODES = ('split', 'pack')
+
+
+def _span(text: str, start: int, end: int, token_count: int):
+    return chonkie.Chunk(text=text[start:end], start_index=start, end_index=end, token_count=token_count)
+
+
+def split_spans(text: str, spans: List[Any], chunker) -> List[Any]:
+    """Re-chunk every span with `chunker`, keeping offsets in document coordinates"""
+    refined = []
+    for span in spans:
+        pieces = chunker.chunk(span.text)
+        if not pieces:
+            # Nothing the chunker would keep (e.g. whitespace); leave the span alone
+            if span.text.strip():
+                refined.append(span)
+            continue
+        for piece in pieces:
+            start = span.start_index + piece.start_index
+            end = span.start_index + piece.end_index
+            refined.append(_span(text, start, end, piece.token_count))
+    return refined
+
+
+def pack_spans(text: str, spans: List[Any], tokenizer, budget: int) -> List[Any]:
+    """Greedily merge neighbouring spans while their token count stays within `budget`.
+
+    A span that is over budget on its own is kept as it is; packing never
+    splits. Merged spans run from the first span's start to the last one's
+    end, so text between spans (such as dropped whitespace) is kept.
+    """
+    packed = []
+    group_start = group_end = None
+    group_tokens = 0
+    for span in spans:
+        # span.token_count is in the previous stage's tokens; the budget is in this stage's
+        tokens = tokenizer.count_tokens(span.text)
+        if group_start is not None and group_tokens + tokens <= budget and span.start_index >= group_end:
+            group_end = span.end_index
+            group_tokens += tokens
+            continue
+        if group_start is not None:
+            packed.append(_span(text, group_start, group_end, tokenizer.count_tokens(text[group_start:group_end])))
+        group_start, group_end, group_tokens = span.start_index, span.end_index, tokens
+    if group_start is not None:
+        packed.append(_span(text, group_start, group_end, tokenizer.count_tokens(text[group_start:group_end])))
+    return packed
+
+
+class PipelineChunker:
+    """Runs a first chunker and then further stages over its output spans.
+
+    Every stage sees the previous stage's spans as offsets into the one
+    document, so composite strategies (recursive structure refined by
+    semantic splits, sentences packed into token budgets) take a single
+    request. 'split' stages re-chunk each span with their chunker; 'pack'
+    stages merge neighbouring spans up to their chunk size in tokens.
+    """
+
+    def __init__(self, chunker, stages: List[Tuple[str, Any, Any, int]]):
+        self.chunker = chunker
+        # (mode, chunker, tokenizer, chunk size) per stage
+        self.stages = stages
+
+    def __getattr__(self, name):
+        if name in ('chunker', 'stages'):
+            raise AttributeError(name)
+        # Expose the last stage's diagnostics (e.g. similarity_curve) like a plain chunker would
+        for _, chunker, _, _ in reversed(self.stages):
+            if chunker is not None and hasattr(chunker, name):
+                return getattr(chunker, name)
+        return getattr(self.chunker, name)
+
+    def chunk(self, text: str) -> List[Any]:
+        with stage('pipeline0'):
+            spans = self.chunker.chunk(text)
+        for number, (mode, chunker, tokenizer, chunk_size) in enumerate(self.stages, 1):
+            with stage(f'pipeline{number}'):
+                if mode == 'pack':
+                    spans = pack_spans(text, spans, tokenizer, chunk_size)
+                else:
+                    spans = split_spans(text, spans, chunker)
+        return spans
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+import threading
+import importlib.util
+from typing import Dict, Any, List, Optional, Tuple
+
+# Candidates for chunkerType="auto", highest quality first. Priors are rough
+# single-core figures (chars/s of chunking, ms of fixed construction cost,
+# which for semantic chunking is mostly loading the embedding model); they
+# are replaced by measurements as soon as real requests have been served.
+AUTO_CANDIDATES = [
+    {
+        'name': 'SemanticChunker/sentence-transformers/all-MiniLM-L6-v2',
+        'config': {'chunkerType': 'SemanticChunker', 'embeddingProvider': 'sentence-transformers',
+                   'embeddingModel': 'all-MiniLM-L6-v2'},
+        'requires': 'sentence_transformers',
+        'chars_per_second': 40000.0,
+        'overhead_ms': 3000.0,
+    },
+    {
+        'name': 'SemanticChunker/model2vec/minishlab/potion-base-8M',
+        'config': {'chunkerType': 'SemanticChunker', 'embeddingProvider': 'model2vec',
+                   'embeddingModel': 'minishlab/potion-base-8M'},
+        'requires': 'model2vec',
+        'chars_per_second': 400000.0,
+        'overhead_ms': 300.0,
+    },
+    {
+        'name': 'RecursiveChunker',
+        'config': {'chunkerType': 'RecursiveChunker'},
+        'chars_per_second': 5000000.0,
+        'overhead_ms': 1.0,
+    },
+    {
+        'name': 'SentenceChunker',
+        'config': {'chunkerType': 'SentenceChunker'},
+        'chars_per_second': 3000000.0,
+        'overhead_ms': 1.0,
+    },
+    {
+        'name': 'TokenChunker',
+        'config': {'chunkerType': 'TokenChunker', 'tokenizerType': 'CharacterTokenizer'},
+        'chars_per_second': 4000000.0,
+        'overhead_ms': 1.0,
+    },
+]
+
+# Weight of the newest observation in the moving averages
+THROUGHPUT_ALPHA = 0.3
+
+
+def candidate_name(config) -> str:
+    """Throughput key for a config: the chunker, plus the embedding backend and model for semantic chunking"""
+    if config.chunkerType == 'SemanticChunker':
+        return f"SemanticChunker/{config.embeddingProvider}/{config.embeddingModel}"
+    return config.chunkerType
+
+
+class ThroughputTracker:
+    """Moving averages of chunking speed and construction cost per candidate"""
+
+    def __init__(self, candidates: List[Dict[str, Any]] = AUTO_CANDIDATES, alpha: float = THROUGHPUT_ALPHA):
+        self.candidates = candidates
+        self.alpha = alpha
+        self._lock = threading.Lock()
+        self._stats = {
+            c['name']: {'chars_per_second': c['chars_per_second'], 'overhead_ms': c['overhead_ms'], 'samples': 0}
+            for c in candidates
+        }
+
+    def record(self, config, chars: int, construct_seconds: float, chunk_seconds: float) -> None:
+        name = candidate_name(config)
+        # Tiny inputs say more about call overhead than throughput
+        if name not in self._stats or chars < 1000 or chunk_seconds <= 0:
+            return
+        with self._lock:
+            stats = self._stats[name]
+            speed = chars / chunk_seconds
+            overhead = construct_seconds * 1000
+            if stats['samples'] == 0:
+                stats['chars_per_second'], stats['overhead_ms'] = speed, overhead
+            else:
+                stats['chars_per_second'] += self.alpha * (speed - stats['chars_per_second'])
+                stats['overhead_ms'] += self.alpha * (overhead - stats['overhead_ms'])
+            stats['samples'] += 1
+
+    def predict_ms(self, name: str, chars: int) -> float:
+        with self._lock:
+            stats = self._stats[name]
+            return stats['overhead_ms'] + chars / stats['chars_per_second'] * 1000
+
+    def choose(self, chars: int, budget_ms: float, limits: Dict[str, int],
+               override_limit: bool = False) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """Pick the best candidate predicted to finish within the budget.
+
+        Returns the candidate and a summary of the decision. When nothing
+        fits, the fastest eligible candidate is chosen and the summary says
+        the budget will be missed.
+        """
+        considered = []
+        for candidate in self.candidates:
+            entry = {'name': candidate['name'], 'predicted_ms': round(self.predict_ms(candidate['name'], chars), 1)}
+            if candidate.get('requires') and importlib.util.find_spec(candidate['requires']) is None:
+                entry['skipped'] = f"{candidate['requires']} not installed"
+            elif not override_limit and chars > limits.get(candidate['config']['chunkerType'], 25000):
+                entry['skipped'] = 'over the character limit'
+            considered.append(entry)
+
+        eligible = [(c, e) for c, e in zip(self.candidates, considered) if 'skipped' not in e]
+        if not eligible:
+            raise ValueError(f"No chunker can take {chars:,} chars without override_limit")
+
+        fitting = [(c, e) for c, e in eligible if e['predicted_ms'] <= budget_ms]
+        chosen, entry = fitting[0] if fitting else min(eligible, key=lambda ce: ce[1]['predicted_ms'])
+        return chosen, {
+            'chosen': chosen['name'],
+            'latency_budget_ms': budget_ms,
+            'predicted_ms': entry['predicted_ms'],
+            'within_budget': bool(fitting),
+            'characters': chars,
+            'candidates': considered
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                name: {
+                    'chars_per_second': round(stats['chars_per_second'], 1),
+                    'overhead_ms': round(stats['overhead_ms'], 1),
+                    'samples': stats['samples']
+                }
+                for name, stats in self._stats.items()
+            }
+
+
+throughput_tracker = ThroughputTracker()
+
+
+def select_config(config, chars: int, limits: Dict[str, int], default_budget_ms: float,
+                  override_limit: bool = False, tracker: Optional[ThroughputTracker] = None):
+    """Resolve chunkerType="auto" to a concrete config; returns (config, selection summary)"""
+    tracker = tracker or throughput_tracker
+    budget_ms = config.latencyBudgetMs if config.latencyBudgetMs is not None else default_budget_ms
+    candidate, selection = tracker.choose(chars, budget_ms, limits, override_limit)
+    chosen = config.copy(update=candidate['config'])
+    print(f"[Auto] {chars:,} chars, budget {budget_ms:.0f}ms -> {candidate['name']} "
+          f"(predicted {selection['predicted_ms']:.0f}ms)")
+    return chosen, selection
@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+import time
+from typing import List
+
+import numpy as np
+
+try:
+    import chonkie
+    import chonkie_core
+except ImportError:
+    raise ImportError("Chonkie not installed")
+
+from chonkie_cancel import check_cancelled
+
+
+# Candidate thresholds evaluated by automatic threshold selection
+AUTO_THRESHOLD_GRID = [round(t, 2) for t in np.arange(0.02, 1.0, 0.02)]
+
+# Similarity percentile used for automatic selection when no target is given
+AUTO_THRESHOLD_PERCENTILE = 25.0
+
+# Up to this window size, adding shifted slices beats a cumulative sum
+# (np.cumsum along axis 0 is several times slower than a few vector adds)
+SHIFTED_SUM_MAX_WINDOW = 8
+
+# Sentences embedded per call; each call is a point where an abandoned request can stop
+EMBED_BATCH_SENTENCES = 512
+
+
+def row_norms(matrix: np.ndarray) -> np.ndarray:
+    """L2 norm of each row, with zero rows reported as 1 to keep divisions safe"""
+    norms = np.sqrt(np.einsum('ij,ij->i', matrix, matrix))
+    norms[norms == 0] = 1.0
+    return norms
+
+
+def window_sums(embeddings: np.ndarray, window: int) -> np.ndarray:
+    """Sum of each run of `window` consecutive rows, for runs starting at 0..n-window-1"""
+    n = embeddings.shape[0]
+    if window <= SHIFTED_SUM_MAX_WINDOW:
+        sums = embeddings[0:n - window].copy()
+        for k in range(1, window):
+            sums += embeddings[k:n - window + k]
+        return sums
+
+    cumulative = np.zeros((n + 1, embeddings.shape[1]), dtype=np.float64)
+    np.cumsum(embeddings, axis=0, out=cumulative[1:])
+    return cumulative[window:n] - cumulative[0:n - window]
+
+
+def window_similarities(embeddings: np.ndarray, window: int) -> np.ndarray:
+    """Cosine similarity between each window of sentences and the sentence after it.
+
+    Row i compares the pooled embedding of sentences [i, i + window) with
+    sentence i + window, giving len(embeddings) - window scores, the same
+    layout SemanticChunker._get_similarity produces. Window vectors are sums
+    of sentence embeddings taken from the one matrix (cosine is scale-free,
+    so sum and mean pool the same), and the whole pass is O(n * dim).
+
+    The library embeds each window as concatenated text instead. The two
+    agree only when the embedder is linear in its input (embedding a
+    concatenation equals summing the parts); for transformer models the
+    curve, and so the boundaries, shift.
+    """
+    embeddings = np.asarray(embeddings)
+    n = embeddings.shape[0]
+    if n <= window:
+        return np.empty(0, dtype=np.float64)
+
+    windows = window_sums(embeddings, window)
+    sentences = embeddings[window:]
+    dots = np.einsum('ij,ij->i', windows, sentences)
+    # The boundary filter in chonkie_core only accepts float64
+    return (dots / (row_norms(windows) * row_norms(sentences))).astype(np.float64)
+
+
+class VectorizedSemanticChunker(chonkie.SemanticChunker):
+    """SemanticChunker with boundary detection done over one embedding matrix.
+
+    Sentences are embedded once and windows are pooled from those vectors
+    instead of being embedded again as concatenated text, which halves the
+    embedding calls and replaces the per-pair similarity loop with a single
+    NumPy pass.
+
+    This is a different computation from the library's: it reproduces
+    SemanticChunker exactly only for linear embedders, and approximates it
+    for mean-pooled static models (Model2Vec). It is opt-in for that reason.
+
+    Thresholding and min-sentence filtering stay in chonkie_core, which
+    already runs them over the whole similarity array natively.
+    """
+
+    def _get_similarity(self, sentences) -> np.ndarray:
+        texts = [s.text for s in sentences]
+        embeddings = []
+        for start in range(0, len(texts), EMBED_BATCH_SENTENCES):
+            check_cancelled()
+            embeddings.extend(self.embedding_model.embed_batch(texts[start:start + EMBED_BATCH_SENTENCES]))
+        return window_similarities(np.stack(embeddings, axis=0), self.similarity_window)
+
+
+class AutoThresholdSemanticChunker(VectorizedSemanticChunker):
+    """SemanticChunker that picks its own threshold from one similarity pass.
+
+    The similarity curve and its local minima are computed once; every
+    candidate threshold is then just a re-filter of those minima. With
+    target_chunks set, the threshold whose final chunk count lands closest
+    to the target wins. Otherwise splits go wherever a minimum falls in the
+    lowest threshold_percentile percent of the similarity curve.
+
+    The curve comes from the library's window embeddings unless
+    `vectorized` is set, in which case it is pooled as in
+    VectorizedSemanticChunker.
+
+    After chunk() the chosen threshold is in `self.threshold`, and the curve
+    and per-threshold chunk counts are in `self.similarity_curve` and
+    `self.threshold_selection`.
+    """
+
+    def __init__(self, *args, target_chunks: int = None, threshold_percentile: float = None,
+                 vectorized: bool = False, **kwargs):
+        # Placeholder threshold; the real one is chosen per document
+        kwargs.setdefault('threshold', 0.5)
+        super().__init__(*args, **kwargs)
+        if target_chunks is not None and target_chunks <= 0:
+            raise ValueError("target_chunks must be positive")
+        if threshold_percentile is not None and not 0 < threshold_percentile < 100:
+            raise ValueError("threshold_percentile must be between 0 and 100")
+        self.target_chunks = target_chunks
+        self.threshold_percentile = threshold_percentile
+        self.vectorized = vectorized
+        self.similarity_curve = []
+        self.threshold_selection = None
+        self._sentences = []
+
+    def chunk(self, text: str):
+        self.similarity_curve = []
+        self.threshold_selection = None
+        return super().chunk(text)
+
+    def _get_similarity(self, sentences) -> np.ndarray:
+        self._sentences = sentences
+        if self.vectorized:
+            return super()._get_similarity(sentences)
+        return chonkie.SemanticChunker._get_similarity(self, sentences)
+
+    def _split_indices_for(self, minima_indices, minima_values, threshold: float, n_similarities: int):
+        filtered_indices, _ = chonkie_core.filter_split_indices(
+            minima_indices, minima_values, threshold, self.min_sentences_per_chunk
+        )
+        return (
+            [0]
+            + [int(i + self.similarity_window) for i in filtered_indices.tolist()]
+            + [n_similarities + self.similarity_window]
+        )
+
+    def _count_chunks(self, split_indices) -> int:
+        groups = self._group_sentences(self._sentences, split_indices)
+        return len(self._split_groups(groups))
+
+    def _get_split_indices(self, similarities) -> list:
+        similarities = np.asarray(similarities, dtype=np.float64)
+        self.similarity_curve = similarities.tolist()
+
+        minima_indices = np.empty(0, dtype=np.int64)
+        minima_values = np.empty(0, dtype=np.float64)
+        if len(similarities) >= self.filter_window:
+            minima_indices, minima_values = chonkie_core.find_local_minima_interpolated(
+                similarities,
+                window_size=self.filter_window,
+                poly_order=self.filter_polyorder,
+                tolerance=self.filter_tolerance,
+            )
+        if len(minima_indices) == 0:
+            self.threshold_selection = {'mode': 'none', 'threshold': None, 'candidates': []}
+            return []
+
+        # Distinct thresholds often keep the same minima, so count each split set once
+        candidates = []
+        counts_by_splits = {}
+        for threshold in AUTO_THRESHOLD_GRID:
+            split_indices = self._split_indices_for(minima_indices, minima_values, threshold, len(similarities))
+            key = tuple(split_indices)
+            if key not in counts_by_splits:
+                counts_by_splits[key] = self._count_chunks(split_indices)
+            candidates.append({'threshold': threshold, 'chunks': counts_by_splits[key]})
+
+        if self.target_chunks is not None:
+            best = min(candidates, key=lambda c: (abs(c['chunks'] - self.target_chunks), c['threshold']))
+            threshold = best['threshold']
+            selection = {'mode': 'target_chunks', 'target_chunks': self.target_chunks}
+        else:
+            percentile = self.threshold_percentile or AUTO_THRESHOLD_PERCENTILE
+            cutoff = float(np.percentile(similarities, percentile))
+            # Library thresholds are percentiles over the minima, so convert the cutoff
+            share = float(np.mean(minima_values <= cutoff))
+            threshold = round(min(max(share, AUTO_THRESHOLD_GRID[0]), AUTO_THRESHOLD_GRID[-1]), 4)
+            selection = {'mode': 'percentile', 'percentile': percentile, 'similarity_cutoff': cutoff}
+
+        self.threshold = threshold
+        self.threshold_selection = {**selection, 'threshold': threshold, 'candidates': candidates}
+        return self._split_indices_for(minima_indices, minima_values, threshold, len(similarities))
+
+
+def _pairwise_similarities(embeddings: np.ndarray, window: int) -> List[float]:
+    # Per-pair loop over the same pooled windows, as a timing baseline
+    def cosine(u, v):
+        return float(np.dot(u, v) / (np.linalg.norm(u) * np.linalg.norm(v)))
+    return [
+        cosine(embeddings[i:i + window].sum(axis=0), embeddings[i + window])
+        for i in range(len(embeddings) - window)
+    ]
+
+
+if __name__ == "__main__":
+    # Timing of the pooled-window pass against a per-pair loop at 10K sentences.
+    # Agreement with chonkie.SemanticChunker is checked in tests/test_semantic.py.
+    rng = np.random.default_rng(0)
+    n_sentences, dim, window = 10000, 384, 3
+    embeddings = rng.standard_normal((n_sentences, dim)).astype(np.float32)
+
+    start = time.perf_counter()
+    _pairwise_similarities(embeddings, window)
+    reference_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    window_similarities(embeddings, window)
+    vectorized_time = time.perf_counter() - start
+
+    print(f"[Benchmark] {n_sentences:,} sentences, dim={dim}, window={window}")
+    print(f"  pairwise:   {reference_time * 1000:8.1f} ms")
+    print(f"  vectorized: {vectorized_time * 1000:8.1f} ms ({reference_time / vectorized_time:.0f}x)")
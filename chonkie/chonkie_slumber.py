@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+import os
+import time
+import sqlite3
+import hashlib
+import threading
+from bisect import bisect_left
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional
+
+try:
+    import chonkie
+    from chonkie.genie import BaseGenie
+except ImportError:
+    raise ImportError("Chonkie not installed")
+
+from chonkie_cancel import CancelToken, ChunkCancelled, cancellable, check_cancelled, current_token
+from chonkie_timing import stage
+
+# Persistent split decisions; lives on the data volume so it survives restarts
+LLM_CACHE_PATH = os.getenv('CHONKIE_LLM_CACHE_PATH', '/home/chonkie/data/slumber_cache.sqlite3')
+
+# Upper bound on LLM calls in flight for one document
+MAX_LLM_CONCURRENCY = int(os.getenv('CHONKIE_LLM_CONCURRENCY', '8'))
+
+
+class SplitDecisionCache:
+    """SQLite store of LLM split decisions, keyed by a hash of the prompt.
+
+    Passages in a prompt are numbered from the start of their window, so the
+    same stretch of text gives the same key wherever it appears; re-runs and
+    documents that share sections reuse earlier answers. Falls back to an
+    in-memory database if the file can't be opened.
+    """
+
+    def __init__(self, path: str = LLM_CACHE_PATH):
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'writes': 0}
+        try:
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute('PRAGMA journal_mode=WAL')
+            self.path = path
+        except (OSError, sqlite3.Error) as e:
+            print(f"[SlumberChunker] Decision cache at {path} unavailable ({e}); using memory")
+            self._db = sqlite3.connect(':memory:', check_same_thread=False)
+            self.path = ':memory:'
+        with self._lock:
+            self._db.execute(
+                'CREATE TABLE IF NOT EXISTS split_decisions '
+                '(key TEXT PRIMARY KEY, split_index INTEGER NOT NULL, created_at REAL NOT NULL)'
+            )
+            self._db.commit()
+
+    @staticmethod
+    def key(*parts: str) -> str:
+        digest = hashlib.sha256()
+        for part in parts:
+            digest.update(part.encode('utf-8'))
+            digest.update(b'\0')
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[int]:
+        with self._lock:
+            row = self._db.execute('SELECT split_index FROM split_decisions WHERE key = ?', (key,)).fetchone()
+            self.stats['hits' if row else 'misses'] += 1
+        return row[0] if row else None
+
+    def put(self, key: str, split_index: int) -> None:
+        with self._lock:
+            self._db.execute(
+                'INSERT OR REPLACE INTO split_decisions (key, split_index, created_at) VALUES (?, ?, ?)',
+                (key, split_index, time.time())
+            )
+            self._db.commit()
+            self.stats['writes'] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            entries = self._db.execute('SELECT COUNT(*) FROM split_decisions').fetchone()[0]
+            return {**self.stats, 'entries': entries, 'path': self.path}
+
+
+_decision_cache = None
+_decision_cache_lock = threading.Lock()
+
+
+def get_decision_cache() -> SplitDecisionCache:
+    """Process-wide decision cache, opened on first use"""
+    global _decision_cache
+    with _decision_cache_lock:
+        if _decision_cache is None:
+            _decision_cache = SplitDecisionCache()
+        return _decision_cache
+
+
+def make_genie(provider: Optional[str] = None, model: Optional[str] = None) -> BaseGenie:
+    """Genie for a provider name; CHONKIE_GENIE_BASE_URL points OpenAI-style calls elsewhere (e.g. a mock)"""
+    provider = provider or os.getenv('CHONKIE_GENIE', 'openai')
+    if provider == 'gemini':
+        return chonkie.GeminiGenie(model=model or 'gemini-2.5-flash')
+    if provider == 'openai':
+        return chonkie.OpenAIGenie(model=model or 'gpt-4.1-mini', base_url=os.getenv('CHONKIE_GENIE_BASE_URL'))
+    raise ValueError(f"Unsupported genie '{provider}'. Use 'openai' or 'gemini'")
+
+
+def genie_json_mode(genie: BaseGenie) -> str:
+    # Same test SlumberChunker uses for extract_mode="auto"
+    return 'text' if type(genie).generate_json is BaseGenie.generate_json else 'json'
+
+
+class ConcurrentSlumberChunker(chonkie.SlumberChunker):
+    """SlumberChunker that asks the LLM about many windows at once.
+
+    Every decision depends only on where its window starts, so the document
+    is cut into regions and each region's chain of decisions runs in its own
+    thread. A final sequential pass walks the chain from the start of the
+    document, reusing the recorded decisions; where a region's chain began
+    somewhere the sequential walk never goes, a few extra decisions are made
+    until the walk lands on a start the next region already visited. With a
+    deterministic LLM the chunks are the same as SlumberChunker's.
+
+    Decisions are cached by prompt hash in SplitDecisionCache, and LLM
+    failures fall back to keeping the window together without being cached.
+    """
+
+    def __init__(self, genie: BaseGenie, max_in_flight: int = MAX_LLM_CONCURRENCY,
+                 cache: Optional[SplitDecisionCache] = None, **kwargs):
+        kwargs.setdefault('extract_mode', genie_json_mode(genie))
+        kwargs.setdefault('verbose', False)
+        super().__init__(genie=genie, **kwargs)
+        self.max_in_flight = max(1, max_in_flight)
+        self.cache = cache if cache is not None else get_decision_cache()
+        self._cache_scope = f"{type(genie).__name__}:{getattr(genie, 'model', '')}:{self.extract_mode}"
+        self.last_stats: Dict[str, int] = {}
+
+    def _ask(self, prompt: str, group_size: int) -> Optional[int]:
+        """Split index the LLM picks for a window, or None if every attempt failed"""
+        for attempt in range(self.max_retries):
+            try:
+                with stage('llm'):
+                    if self.extract_mode == 'json':
+                        index = int(self.genie.generate_json(prompt, self.Split)['split_index'])
+                    else:
+                        index = self._extract_index_from_text(self.genie.generate(prompt))
+                if index > group_size:
+                    raise ValueError(f"Split index {index} is out of bounds (max {group_size})")
+                return index
+            except (KeyboardInterrupt, SystemExit, ChunkCancelled):
+                # A cancelled request stops here instead of counting as a failed attempt
+                raise
+            except Exception as e:
+                print(f"[SlumberChunker] LLM attempt {attempt + 1}/{self.max_retries} failed: {e}")
+        return None
+
+    def _decide(self, splits, passages: List[str], cumulative: List[int], position: int,
+                stats: Dict[str, int]) -> int:
+        """Where the chunk starting at split `position` ends"""
+        check_cancelled()
+        group_end = min(bisect_left(cumulative, cumulative[position] + self.chunk_size) - 1, len(splits))
+        if group_end == position:
+            group_end += 1
+
+        # Window-relative IDs keep the prompt independent of where the text sits in the document
+        window = "\n".join(f"ID {i}: {text}" for i, text in enumerate(passages[position:group_end]))
+        prompt = self.template.format(passages=window)
+        key = self.cache.key(self._cache_scope, prompt)
+
+        index = self.cache.get(key)
+        if index is not None:
+            stats['cache_hits'] += 1
+        else:
+            stats['llm_calls'] += 1
+            index = self._ask(prompt, group_end - position)
+            if index is None:
+                index = group_end - position
+            else:
+                self.cache.put(key, index)
+
+        return position + max(index, 1)
+
+    def _region_starts(self, cumulative: List[int], n_splits: int) -> List[int]:
+        # At least two windows per region, or the parallel work is mostly resync
+        regions = min(self.max_in_flight, max(1, cumulative[-1] // (2 * self.chunk_size)))
+        starts = {0}
+        for k in range(1, regions):
+            starts.add(min(bisect_left(cumulative, cumulative[-1] * k // regions), n_splits - 1))
+        return sorted(starts)
+
+    def chunk(self, text: str):
+        splits = self._recursive_split(text, level=0, offset=0)
+        if not splits:
+            return []
+        # Same passage text as the library prompt, minus the absolute IDs
+        passages = [split.text.replace("\n", " ").strip() for split in splits]
+        cumulative = self._get_cumulative_token_counts(splits)
+        stats = {'llm_calls': 0, 'cache_hits': 0, 'resync_decisions': 0}
+        stats_lock = threading.Lock()
+        decisions: Dict[int, int] = {}
+
+        # Region threads honour cancellation but don't time stages (StageTimer is per-thread)
+        token = current_token() or CancelToken()
+
+        def run_region(start: int, stop: int) -> Dict[int, int]:
+            local_stats = {'llm_calls': 0, 'cache_hits': 0}
+            chain = {}
+            position = start
+            with cancellable(token):
+                while position < stop:
+                    chain[position] = self._decide(splits, passages, cumulative, position, local_stats)
+                    position = chain[position]
+            with stats_lock:
+                for name, value in local_stats.items():
+                    stats[name] += value
+            return chain
+
+        starts = self._region_starts(cumulative, len(splits))
+        bounds = list(zip(starts, starts[1:] + [len(splits)]))
+        if len(bounds) > 1:
+            with ThreadPoolExecutor(max_workers=len(bounds), thread_name_prefix='slumber') as executor:
+                for chain in executor.map(lambda bound: run_region(*bound), bounds):
+                    decisions.update(chain)
+
+        # Sequential walk over the recorded decisions, filling the gaps at region boundaries
+        chunks = []
+        position = 0
+        while position < len(splits):
+            end = decisions.get(position)
+            if end is None:
+                before = stats['llm_calls'] + stats['cache_hits']
+                end = decisions[position] = self._decide(splits, passages, cumulative, position, stats)
+                if len(bounds) > 1:
+                    stats['resync_decisions'] += stats['llm_calls'] + stats['cache_hits'] - before
+            start_index = splits[position].start_index
+            end_index = splits[end - 1].end_index
+            chunks.append(chonkie.Chunk(
+                text=text[start_index:end_index],
+                start_index=start_index,
+                end_index=end_index,
+                token_count=cumulative[end] - cumulative[position]
+            ))
+            position = end
+
+        stats['regions'] = len(bounds)
+        self.last_stats = stats
+        print(f"[SlumberChunker] {len(chunks)} chunks from {len(splits)} passages: {stats}")
+        return chunks
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""Incremental chunking of text that arrives in fragments (transcripts, chat).
+
+StreamingChunker keeps only the open tail of the stream. Each time text is
+pushed, the tail is re-chunked. The chunkers here fill chunks left to right,
+so text arriving later can only change the chunks at the end: a chunk is
+final once it is ahead of the last `holdback_chunks` and came out the same
+at the previous re-chunk (a short unfinished sentence can be merged into the
+one before it until more of it arrives). Final chunks are emitted once, with
+offsets in stream coordinates, and the tail is cut back to the start of the
+first chunk still open.
+
+Semantic, neural and late chunkers look at neighbouring sentences (or the
+whole window) to place a boundary, so they hold back more chunks; their
+boundaries are final relative to the text seen so far rather than to the
+whole stream.
+
+    python chonkie_stream.py document.txt --chunker RecursiveChunker --fragment 40
+"""
+import time
+import random
+import argparse
+from typing import Any, List, Optional, Tuple
+
+from chonkie_cancel import check_cancelled
+
+# Chunks kept open at the end of the tail, by chunker
+STREAM_HOLDBACK_CHUNKS = {
+    'SemanticChunker': 2,
+    'NeuralChunker': 2,
+    'LateChunker': 2,
+    'SlumberChunker': 2,
+}
+DEFAULT_HOLDBACK_CHUNKS = 1
+
+# Chunker types that can't be streamed: "auto" picks a chunker from the document length
+UNSTREAMABLE_CHUNKERS = ('auto',)
+
+
+class StreamingChunker:
+    """Chunks a growing text, returning each chunk once its boundaries can no longer change.
+
+    `min_step_chars` skips re-chunking until that much new text has
+    arrived; `max_open_chars` finalises the whole tail when it grows past
+    it without producing enough chunks (one very long sentence, or a
+    chunk size larger than the tail), so memory and re-chunking cost stay
+    bounded.
+    """
+
+    def __init__(self, chunker, holdback_chunks: int = DEFAULT_HOLDBACK_CHUNKS,
+                 min_step_chars: int = 0, max_open_chars: Optional[int] = None):
+        self.chunker = chunker
+        self.holdback_chunks = max(1, holdback_chunks)
+        self.min_step_chars = min_step_chars
+        self.max_open_chars = max_open_chars
+        self.tail = ''
+        self.committed = 0  # Stream offset where the tail starts
+        self.emitted = 0  # Chunks returned so far
+        self.received = 0  # Chars pushed so far
+        self.rechunks = 0
+        self._unchunked = 0
+        self._previous = set()  # (start, end) of the open chunks at the last re-chunk
+
+    @property
+    def open_chars(self) -> int:
+        return len(self.tail)
+
+    def push(self, text: str) -> Tuple[List[Any], int]:
+        """Append text; returns (chunks it made final, stream offset their indices are relative to)"""
+        self.tail += text
+        self.received += len(text)
+        self._unchunked += len(text)
+        if self.max_open_chars is not None and len(self.tail) > self.max_open_chars:
+            return self._finalize(final=True)
+        if self._unchunked < self.min_step_chars:
+            return [], self.committed
+        return self._finalize(final=False)
+
+    def flush(self) -> Tuple[List[Any], int]:
+        """Close the tail (end of stream, or a point the client knows is a boundary)"""
+        return self._finalize(final=True)
+
+    def _finalize(self, final: bool) -> Tuple[List[Any], int]:
+        self._unchunked = 0
+        offset = self.committed
+        if not self.tail.strip():
+            if final:
+                self.committed += len(self.tail)
+                self.tail = ''
+            return [], offset
+
+        check_cancelled()
+        chunks = list(self.chunker.chunk(self.tail))
+        self.rechunks += 1
+        spans = [
+            (offset + getattr(chunk, 'start_index', 0), offset + getattr(chunk, 'end_index', len(self.tail)))
+            for chunk in chunks
+        ]
+        if final:
+            ready = len(chunks)
+        else:
+            # A chunk is final once it's out of the held tail and came out the same at the last re-chunk
+            ready = 0
+            while ready < len(chunks) - self.holdback_chunks and spans[ready] in self._previous:
+                ready += 1
+            self._previous = set(spans[ready:])
+        if ready == 0:
+            return [], offset
+        self.emitted += ready
+
+        # Later chunks are re-derived from the start of the first one still open
+        cut = len(self.tail) if final else getattr(chunks[ready], 'start_index', 0)
+        self.committed += cut
+        self.tail = self.tail[cut:]
+        return chunks[:ready], offset
+
+    def get_stats(self) -> dict:
+        return {
+            'received_chars': self.received,
+            'committed_chars': self.committed,
+            'open_chars': len(self.tail),
+            'emitted_chunks': self.emitted,
+            'rechunks': self.rechunks
+        }
+
+
+def _fragments(text: str, size: int, rng: random.Random):
+    position = 0
+    while position < len(text):
+        step = max(1, int(rng.expovariate(1 / size)))
+        yield text[position:position + step]
+        position += step
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Stream a file through StreamingChunker and compare with one-shot chunking")
+    parser.add_argument('file')
+    parser.add_argument('--chunker', default='RecursiveChunker')
+    parser.add_argument('--chunk-size', type=int, default=512)
+    parser.add_argument('--fragment', type=int, default=40, help="Mean fragment length in chars")
+    parser.add_argument('--min-step', type=int, default=0)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    from chonkie_api_enhanced import ChunkConfig, create_chunker
+
+    with open(args.file, encoding='utf-8') as f:
+        text = f.read()
+    config = ChunkConfig(chunkerType=args.chunker, chunkSize=args.chunk_size)
+
+    started = time.perf_counter()
+    batch = [(chunk.start_index, chunk.end_index) for chunk in create_chunker(config).chunk(text)]
+    batch_ms = (time.perf_counter() - started) * 1000
+
+    stream = StreamingChunker(create_chunker(config), STREAM_HOLDBACK_CHUNKS.get(args.chunker, DEFAULT_HOLDBACK_CHUNKS),
+                              min_step_chars=args.min_step)
+    lags, streamed = [], []
+    started = time.perf_counter()
+    for fragment in _fragments(text, args.fragment, random.Random(args.seed)):
+        chunks, offset = stream.push(fragment)
+        for chunk in chunks:
+            streamed.append((offset + chunk.start_index, offset + chunk.end_index))
+            # How far past the chunk's end the stream had to get before it was final
+            lags.append(stream.received - streamed[-1][1])
+    chunks, offset = stream.flush()
+    streamed.extend((offset + chunk.start_index, offset + chunk.end_index) for chunk in chunks)
+    stream_ms = (time.perf_counter() - started) * 1000
+
+    same = sum(1 for boundary in streamed if boundary in set(batch))
+    lags.sort()
+    print(f"{len(text):,} chars, {args.chunker} chunk_size={args.chunk_size}, fragments ~{args.fragment} chars")
+    print(f"one-shot: {len(batch)} chunks in {batch_ms:.0f} ms")
+    print(f"streamed: {len(streamed)} chunks in {stream_ms:.0f} ms, {stream.rechunks} re-chunks, "
+          f"{same}/{len(streamed)} identical to one-shot")
+    if lags:
+        print(f"chars received after a chunk's end before it was final: "
+              f"p50 {lags[len(lags) // 2]:,}, max {lags[-1]:,}")
@@ -0,0 +1,342 @@
+#!/usr/bin/env python3
+"""Grid search over chunking parameters on a sample corpus.
+
+Every grid point chunks the whole sample; sentence splits and sentence
+embeddings are computed once and shared by all points that would produce
+the same ones, so a 30-point sweep over chunkSize and semanticThreshold
+embeds the corpus once instead of 30 times. Points run on a thread pool.
+
+Each point reports its chunk-size distribution, throughput, and boundary
+stability: how many of its chunk boundaries survive (within a tolerance)
+when one parameter moves to the neighbouring grid value.
+
+    python chonkie_sweep.py ./sample --config config.json --grid grid.json -o report.json
+"""
+import os
+import sys
+import json
+import time
+import hashlib
+import itertools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from chonkie_cancel import ChunkCancelled, CancelToken, cancellable, check_cancelled, current_token
+
+# Sweeps bigger than this are almost always a mistake in the grid
+SWEEP_MAX_POINTS = 256
+
+# Boundaries this many characters apart count as the same boundary
+DEFAULT_BOUNDARY_TOLERANCE = 20
+
+
+def expand_grid(grid: Dict[str, List[Any]]) -> List[Dict[str, Any]]:
+    """Cartesian product of the grid, in key order then value order"""
+    for name, values in grid.items():
+        if not isinstance(values, list) or not values:
+            raise ValueError(f"grid.{name} must be a non-empty list of values")
+    names = list(grid)
+    points = [dict(zip(names, values)) for values in itertools.product(*(grid[name] for name in names))]
+    if len(points) > SWEEP_MAX_POINTS:
+        raise ValueError(f"Grid has {len(points)} points; the limit is {SWEEP_MAX_POINTS}")
+    return points
+
+
+def _text_key(text: str) -> str:
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+
+class SweepPrecompute:
+    """Sentence splits and sentence embeddings shared by every grid point of a sweep.
+
+    Embedding models are loaded once per (provider, model) and their
+    embed_batch is wrapped with a per-sentence cache, so points that split
+    sentences the same way never embed a sentence twice. _prepare_sentences
+    (splitting plus token counting) is wrapped on each chunker and memoised
+    on the text and the settings that affect it. The first point to need a
+    value computes it; concurrent points asking for the same one wait.
+    """
+
+    def __init__(self):
+        self._models: Dict[Tuple[str, str], Any] = {}
+        self._vectors: Dict[int, Dict[str, Any]] = {}
+        self._sentences: Dict[Tuple, Any] = {}
+        self._key_locks: Dict[Tuple, threading.Lock] = {}
+        self._lock = threading.Lock()
+        self.stats = {'models_loaded': 0, 'sentence_splits': 0, 'sentence_split_hits': 0,
+                      'sentences_embedded': 0, 'sentence_embedding_hits': 0, 'embed_seconds': 0.0}
+
+    def _count(self, name: str, amount=1) -> None:
+        with self._lock:
+            self.stats[name] += amount
+
+    def _key_lock(self, key: Tuple) -> threading.Lock:
+        with self._lock:
+            return self._key_locks.setdefault(key, threading.Lock())
+
+    def embeddings(self, provider: str, model: str, load: Callable) -> Any:
+        """Shared embedding model, loaded with load(provider, model=model) on first use"""
+        key = (provider, model)
+        with self._key_lock(('model',) + key):
+            embeddings = self._models.get(key)
+            if embeddings is None:
+                embeddings = self._models[key] = load(provider, model=model)
+                self._cache_embeddings(embeddings)
+                self._count('models_loaded')
+            return embeddings
+
+    def _cache_embeddings(self, embeddings) -> None:
+        vectors = self._vectors.setdefault(id(embeddings), {})
+        embed_batch = embeddings.embed_batch
+        # One model call at a time: misses are batched, and the model isn't assumed thread-safe
+        model_lock = threading.Lock()
+
+        def cached_embed_batch(texts: List[str], *args, **kwargs):
+            with model_lock:
+                missing = list(dict.fromkeys(text for text in texts if text not in vectors))
+                if missing:
+                    started = time.perf_counter()
+                    for text, vector in zip(missing, embed_batch(missing, *args, **kwargs)):
+                        vectors[text] = vector
+                    self._count('embed_seconds', time.perf_counter() - started)
+                    self._count('sentences_embedded', len(missing))
+                self._count('sentence_embedding_hits', len(texts) - len(missing))
+                return [vectors[text] for text in texts]
+
+        embeddings.embed_batch = cached_embed_batch
+
+    def attach(self, chunker) -> None:
+        """Route the chunker's sentence preparation through the shared cache"""
+        prepare = getattr(chunker, '_prepare_sentences', None)
+        if prepare is None:
+            return
+        owner = next(cls for cls in type(chunker).__mro__ if '_prepare_sentences' in vars(cls))
+
+        def shared_prepare_sentences(text: str):
+            key = (
+                _text_key(text),
+                json.dumps(getattr(chunker, 'delim', None)),
+                getattr(chunker, 'include_delim', None),
+                getattr(chunker, 'min_characters_per_sentence', None),
+                # Chunkers sharing an implementation and tokenizer split and count alike
+                owner.__qualname__,
+                id(getattr(chunker, 'embedding_model', None) or type(chunker.tokenizer)),
+            )
+            with self._key_lock(('sentences',) + key):
+                sentences = self._sentences.get(key)
+                if sentences is None:
+                    sentences = self._sentences[key] = prepare(text)
+                    self._count('sentence_splits')
+                else:
+                    self._count('sentence_split_hits')
+            # Chunkers build new groups from these but never modify the list itself
+            return sentences
+
+        chunker._prepare_sentences = shared_prepare_sentences
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {**self.stats, 'embed_seconds': round(self.stats['embed_seconds'], 3)}
+
+
+def distribution(values: List[float]) -> Optional[Dict[str, float]]:
+    if not values:
+        return None
+    array = np.asarray(values, dtype=np.float64)
+    p10, p50, p90 = np.percentile(array, [10, 50, 90])
+    return {
+        'min': float(array.min()), 'p10': round(float(p10), 1), 'p50': round(float(p50), 1),
+        'p90': round(float(p90), 1), 'max': float(array.max()),
+        'mean': round(float(array.mean()), 1), 'std': round(float(array.std()), 1)
+    }
+
+
+def boundary_agreement(a: List[List[int]], b: List[List[int]], tolerance: int) -> float:
+    """F1 of matching boundaries between two runs over the same documents.
+
+    Boundaries are the start offsets of every chunk after the first; two
+    boundaries match if they are within `tolerance` characters, each one
+    matching at most once. 1.0 means both runs cut the corpus in the same
+    places.
+    """
+    matched = total_a = total_b = 0
+    for doc_a, doc_b in zip(a, b):
+        total_a += len(doc_a)
+        total_b += len(doc_b)
+        i = j = 0
+        while i < len(doc_a) and j < len(doc_b):
+            if abs(doc_a[i] - doc_b[j]) <= tolerance:
+                matched += 1
+                i += 1
+                j += 1
+            elif doc_a[i] < doc_b[j]:
+                i += 1
+            else:
+                j += 1
+    if total_a + total_b == 0:
+        return 1.0
+    return round(2 * matched / (total_a + total_b), 4)
+
+
+def _run_point(chunker, texts: List[str], chunk_size: Optional[int]) -> Dict[str, Any]:
+    token_counts, char_counts, boundaries = [], [], []
+    started = time.perf_counter()
+    for text in texts:
+        check_cancelled()
+        chunks = chunker.chunk(text)
+        starts = sorted(getattr(chunk, 'start_index', 0) for chunk in chunks)
+        boundaries.append(starts[1:])
+        for chunk in chunks:
+            token_counts.append(getattr(chunk, 'token_count', 0) or 0)
+            char_counts.append(len(getattr(chunk, 'text', '')))
+    seconds = time.perf_counter() - started
+    chars = sum(len(text) for text in texts)
+    return {
+        'total_chunks': len(token_counts),
+        'token_count': distribution(token_counts),
+        'chars': distribution(char_counts),
+        'over_chunk_size': (round(sum(count > chunk_size for count in token_counts) / len(token_counts), 4)
+                            if chunk_size and token_counts else None),
+        'seconds': round(seconds, 4),
+        'chars_per_second': round(chars / max(seconds, 1e-9)),
+        '_boundaries': boundaries
+    }
+
+
+def _grid_positions(points: List[Dict[str, Any]]) -> Tuple[List[str], List[Tuple[int, ...]]]:
+    """Parameter names, and each point's index along every parameter's value list"""
+    names = list(points[0]) if points else []
+    encoded = [tuple(json.dumps(point[name], sort_keys=True) for name in names) for point in points]
+    values = [list(dict.fromkeys(key[k] for key in encoded)) for k in range(len(names))]
+    return names, [tuple(values[k].index(key[k]) for k in range(len(names))) for key in encoded]
+
+
+def run_sweep(texts: List[str], points: List[Dict[str, Any]], configs: List[Any],
+              build_chunker: Callable[[Any, SweepPrecompute], Any], workers: int = 1,
+              tolerance: int = DEFAULT_BOUNDARY_TOLERANCE) -> Dict[str, Any]:
+    """Chunk `texts` once per grid point and compare the points.
+
+    `points` are the grid values of each point and `configs` the matching
+    chunker configs; build_chunker(config, precompute) returns a chunker
+    whose sentence splits and embeddings go through `precompute`.
+    """
+    precompute = SweepPrecompute()
+    # Pool threads don't inherit the request's context, so hand them its cancel token
+    token = current_token() or CancelToken()
+
+    def run(index: int) -> Dict[str, Any]:
+        with cancellable(token):
+            try:
+                chunker = build_chunker(configs[index], precompute)
+                return _run_point(chunker, texts, getattr(configs[index], 'chunkSize', None))
+            except ChunkCancelled:
+                raise
+            except Exception as e:
+                print(f"[Sweep] Point {points[index]} failed: {e}")
+                return {'error': str(e)}
+
+    started = time.time()
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix='chonkie-sweep') as executor:
+        futures = [executor.submit(run, index) for index in range(len(points))]
+        try:
+            results = [future.result() for future in futures]
+        except ChunkCancelled:
+            for future in futures:
+                future.cancel()
+            raise
+
+    names, positions = _grid_positions(points)
+    index_at = {position: index for index, position in enumerate(positions)}
+
+    reports = []
+    for index, (point, result) in enumerate(zip(points, results)):
+        report = {'params': point, **{k: v for k, v in result.items() if k != '_boundaries'}}
+        if 'error' not in result:
+            # Neighbours differ in exactly one parameter, by one step along its value list
+            by_param = {}
+            for k, name in enumerate(names):
+                scores = []
+                for step in (-1, 1):
+                    position = positions[index][:k] + (positions[index][k] + step,) + positions[index][k + 1:]
+                    other = results[index_at[position]] if position in index_at else None
+                    if other is not None and 'error' not in other:
+                        scores.append(boundary_agreement(result['_boundaries'], other['_boundaries'], tolerance))
+                if scores:
+                    by_param[name] = round(sum(scores) / len(scores), 4)
+            report['stability_by_param'] = by_param
+            report['boundary_stability'] = round(sum(by_param.values()) / len(by_param), 4) if by_param else None
+        reports.append(report)
+
+    summary = {
+        'points': reports,
+        'total_points': len(points),
+        'documents': len(texts),
+        'total_chars': sum(len(text) for text in texts),
+        'boundary_tolerance': tolerance,
+        'workers': max(1, workers),
+        'precompute': precompute.get_stats(),
+        'processing_time': round(time.time() - started, 3)
+    }
+    print(f"[Sweep] {len(points)} points over {len(texts)} documents in {summary['processing_time']}s, "
+          f"precompute {summary['precompute']}")
+    return summary
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from chonkie_cli import DEFAULT_EXTENSIONS, iter_documents
+    from chonkie_api_enhanced import ChunkConfig, build_sweep_chunker, sweep_configs
+    from chonkie_cpu import cpu_budget
+
+    parser = argparse.ArgumentParser(description="Grid search over chunking parameters on a sample corpus")
+    parser.add_argument('input', help="Directory to walk, or a JSONL manifest with 'path' or 'text' per line")
+    parser.add_argument('--grid', required=True, help='JSON file mapping ChunkConfig fields to value lists')
+    parser.add_argument('--config', help="JSON file with the base ChunkConfig")
+    parser.add_argument('--sample', type=int, default=50, help="Documents to use from the input")
+    parser.add_argument('--workers', type=int, default=cpu_budget.threads)
+    parser.add_argument('--tolerance', type=int, default=DEFAULT_BOUNDARY_TOLERANCE,
+                        help="Characters within which two boundaries count as the same")
+    parser.add_argument('--extensions', default=','.join(DEFAULT_EXTENSIONS))
+    parser.add_argument('-o', '--output', help="Write the full report here (default: stdout)")
+    args = parser.parse_args()
+
+    with open(args.grid, 'r', encoding='utf-8') as f:
+        grid = json.load(f)
+    base = {}
+    if args.config:
+        with open(args.config, 'r', encoding='utf-8') as f:
+            base = json.load(f)
+
+    texts = []
+    extensions = [ext.strip().lower() for ext in args.extensions.split(',') if ext.strip()]
+    for doc in itertools.islice(iter_documents(args.input, extensions), args.sample):
+        if 'text' not in doc:
+            with open(doc['path'], 'r', encoding='utf-8', errors='replace') as f:
+                doc['text'] = f.read()
+        if doc['text'].strip():
+            texts.append(doc['text'])
+
+    points, configs = sweep_configs(ChunkConfig(**base), grid)
+    report = run_sweep(texts, points, configs, build_sweep_chunker, args.workers, args.tolerance)
+
+    for point in report['points']:
+        if 'error' in point:
+            print(f"{json.dumps(point['params'])}: ERROR {point['error']}", file=sys.stderr)
+            continue
+        tokens = point['token_count'] or {}
+        print(f"{json.dumps(point['params'])}: {point['total_chunks']} chunks, "
+              f"tokens p50 {tokens.get('p50')} p90 {tokens.get('p90')}, "
+              f"stability {point['boundary_stability']}, {point['chars_per_second']:,} chars/s",
+              file=sys.stderr)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output)
+    else:
+        print(output)
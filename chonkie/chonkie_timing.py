@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+import io
+import time
+import pstats
+import cProfile
+import functools
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, List, Optional
+
+from chonkie_cancel import check_cancelled
+
+# Chunker internals worth timing separately, mapped to the stage they belong to.
+# Methods missing on a given chunker (or chonkie version) are simply skipped.
+CHUNKER_STAGE_METHODS = {
+    '_prepare_sentences': 'split',
+    '_split_sentences': 'split',
+    '_get_similarity': 'similarity',
+    '_get_windowed_similarity': 'similarity',
+    '_get_split_indices': 'boundaries',
+    '_group_sentences': 'merge',
+    '_skip_and_merge': 'merge',
+    '_split_groups': 'merge',
+    '_create_chunks': 'merge',
+}
+
+EMBEDDING_STAGE_METHODS = {
+    'embed': 'embed',
+    'embed_batch': 'embed',
+    'embed_as_tokens': 'embed',
+}
+
+_active_timer: ContextVar[Optional['StageTimer']] = ContextVar('chonkie_stage_timer', default=None)
+
+
+class StageTimer:
+    """Accumulates exclusive wall time per named stage.
+
+    Stages may nest (embedding happens inside similarity computation); time
+    spent in a nested stage is only counted against the inner stage, so the
+    per-stage numbers add up to the total.
+    """
+
+    def __init__(self):
+        self.durations: Dict[str, float] = {}
+        self._stack: List[list] = []
+        self._started = time.perf_counter()
+
+    @contextmanager
+    def stage(self, name: str):
+        # Each frame is [name, start, time spent in nested stages]
+        frame = [name, time.perf_counter(), 0.0]
+        self._stack.append(frame)
+        try:
+            yield
+        finally:
+            self._stack.pop()
+            elapsed = time.perf_counter() - frame[1]
+            self.durations[name] = self.durations.get(name, 0.0) + elapsed - frame[2]
+            if self._stack:
+                self._stack[-1][2] += elapsed
+
+    def total(self) -> float:
+        return time.perf_counter() - self._started
+
+    def as_milliseconds(self) -> Dict[str, float]:
+        """Stage durations in ms, plus the wall time since the timer started"""
+        timings = {name: round(seconds * 1000, 3) for name, seconds in self.durations.items()}
+        timings['total'] = round(self.total() * 1000, 3)
+        return timings
+
+    def server_timing_header(self) -> str:
+        return ', '.join(f"{name};dur={ms}" for name, ms in self.as_milliseconds().items())
+
+
+@contextmanager
+def activate(timer: StageTimer):
+    """Make `timer` the one that `stage()` records into for this context"""
+    token = _active_timer.set(timer)
+    try:
+        yield timer
+    finally:
+        _active_timer.reset(token)
+
+
+@contextmanager
+def stage(name: str):
+    """Time a stage against the active timer, if any.
+
+    Entering a stage is also a cancellation point, so abandoned requests
+    stop at the next stage boundary.
+    """
+    check_cancelled()
+    timer = _active_timer.get()
+    if timer is None:
+        yield
+    else:
+        with timer.stage(name):
+            yield
+
+
+def _wrap_method(obj, method_name: str, stage_name: str) -> None:
+    method = getattr(obj, method_name, None)
+    if method is None or not callable(method):
+        return
+
+    @functools.wraps(method)
+    def timed(*args, **kwargs):
+        with stage(stage_name):
+            return method(*args, **kwargs)
+
+    try:
+        setattr(obj, method_name, timed)
+    except (AttributeError, TypeError):
+        pass
+
+
+def instrument_chunker(chunker) -> None:
+    """Wrap known chunker and embedding methods so they report stage timings.
+
+    Wrappers look up the active timer at call time, so an instrumented object
+    can safely be shared between requests.
+    """
+    targets = [(chunker, CHUNKER_STAGE_METHODS)]
+    embedding_model = getattr(chunker, 'embedding_model', None)
+    if embedding_model is not None:
+        targets.append((embedding_model, EMBEDDING_STAGE_METHODS))
+
+    for obj, methods in targets:
+        if getattr(obj, '_stage_timing_instrumented', False):
+            continue
+        for method_name, stage_name in methods.items():
+            _wrap_method(obj, method_name, stage_name)
+        try:
+            obj._stage_timing_instrumented = True
+        except (AttributeError, TypeError):
+            pass
+
+
+@contextmanager
+def profiled(enabled: bool, top: int = 30):
+    """Run the block under cProfile when enabled; yields a dict receiving the summary"""
+    summary = {}
+    if not enabled:
+        yield summary
+        return
+
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield summary
+    finally:
+        profiler.disable()
+        buffer = io.StringIO()
+        pstats.Stats(profiler, stream=buffer).sort_stats('cumulative').print_stats(top)
+        summary['profile'] = buffer.getvalue()
@@ -0,0 +1,98 @@
+import re
+import zlib
+
+import numpy as np
+import chonkie
+
+from chonkie_semantic import AutoThresholdSemanticChunker, VectorizedSemanticChunker, window_similarities
+
+TOPICS = [
+    "The harbour froze early that winter and the fishing boats stayed tied to the pier.",
+    "Compilers lower the syntax tree into an intermediate form before register allocation.",
+    "Sourdough needs a lively starter, a long cold proof and a very hot oven.",
+    "The orchestra tuned to the oboe while the conductor waited by the podium.",
+]
+
+
+class BagOfWordsEmbeddings(chonkie.BaseEmbeddings):
+    """Hashed word counts: embedding a concatenation is the sum of embedding its parts"""
+
+    def __init__(self, dimension: int = 256):
+        super().__init__()
+        self._dimension = dimension
+
+    @property
+    def dimension(self) -> int:
+        return self._dimension
+
+    def embed(self, text: str) -> np.ndarray:
+        vector = np.zeros(self._dimension, dtype=np.float32)
+        for word in re.findall(r"\w+", text.lower()):
+            vector[zlib.crc32(word.encode()) % self._dimension] += 1.0
+        return vector
+
+    def get_tokenizer(self):
+        return "word"
+
+
+def _document(sentences_per_topic: int = 6, rounds: int = 3) -> str:
+    sentences = []
+    for round_index in range(rounds):
+        for topic in TOPICS:
+            words = topic.split()
+            for k in range(sentences_per_topic):
+                # Rotate the words so each sentence differs but keeps its topic vocabulary
+                shift = (k + round_index) % len(words)
+                sentence = " ".join(words[shift:] + words[:shift]).rstrip(".")
+                sentences.append(sentence[0].upper() + sentence[1:] + ".")
+    return " ".join(sentences)
+
+
+def _chunkers(window: int):
+    params = dict(
+        embedding_model=BagOfWordsEmbeddings(),
+        threshold=0.5,
+        chunk_size=512,
+        similarity_window=window,
+        min_sentences_per_chunk=1,
+        min_characters_per_sentence=24,
+        skip_window=0,
+    )
+    return chonkie.SemanticChunker(**params), VectorizedSemanticChunker(**params)
+
+
+def test_similarity_curve_matches_library_for_linear_embedder():
+    text = _document()
+    for window in (1, 3, 12):
+        library, vectorized = _chunkers(window)
+        sentences = library._prepare_sentences(text)
+        expected = library._get_similarity(sentences)
+        actual = vectorized._get_similarity(sentences)
+        assert len(actual) == len(expected)
+        np.testing.assert_allclose(actual, expected, atol=1e-5)
+
+
+def test_chunks_match_library_for_linear_embedder():
+    text = _document()
+    library, vectorized = _chunkers(3)
+    expected = [(c.start_index, c.end_index, c.text) for c in library.chunk(text)]
+    actual = [(c.start_index, c.end_index, c.text) for c in vectorized.chunk(text)]
+    assert len(expected) > 1
+    assert actual == expected
+
+
+def test_auto_threshold_uses_library_curve_unless_vectorized():
+    text = _document()
+    library, _ = _chunkers(3)
+    expected = library._get_similarity(library._prepare_sentences(text))
+    for vectorized in (False, True):
+        chunker = AutoThresholdSemanticChunker(
+            embedding_model=BagOfWordsEmbeddings(), chunk_size=512, similarity_window=3,
+            min_characters_per_sentence=24, skip_window=0, target_chunks=8, vectorized=vectorized,
+        )
+        chunker.chunk(text)
+        np.testing.assert_allclose(chunker.similarity_curve, expected, atol=1e-5)
+
+
+def test_window_similarities_short_input():
+    assert window_similarities(np.ones((3, 4)), 3).shape == (0,)
@@ -13,12 +13,12 @@ from ..models.evaluation import (
     DatasetEvaluationRequest,
 )
 from ..services.deepeval_service import DeepEvalService
-from ..services.job_service import JobService
+from ..services.job_service import get_job_service
 from ..config import settings
 
 router = APIRouter(prefix="/evaluate", tags=["Evaluation"])
 deepeval_service = DeepEvalService()
-job_service = JobService()
+job_service = get_job_service()
 
 
 @router.post("/", response_model=EvaluationResponse)
@@ -30,7 +30,8 @@ async def evaluate_single(request: EvaluationRequest):
     try:
         result = await deepeval_service.evaluate_single(
             request.test_case,
-            request.metrics
+            request.metrics,
+            use_cache=request.use_cache is not False
         )
         
         return EvaluationResponse(result=result)
@@ -52,7 +53,8 @@ async def evaluate_bulk(request: BulkEvaluationRequest):
         evaluation_data = await deepeval_service.evaluate_bulk(
             request.test_cases,
             request.metrics,
-            max_concurrent=request.max_concurrent or settings.default_max_concurrent
+            max_concurrent=request.max_concurrent or settings.default_max_concurrent,
+            use_cache=request.use_cache is not False
         )
         
         return BulkEvaluationResponse(
@@ -186,7 +188,8 @@ async def _run_async_single_evaluation(job_id: str, request: EvaluationRequest):
         
         result = await deepeval_service.evaluate_single(
             request.test_case,
-            request.metrics
+            request.metrics,
+            use_cache=request.use_cache is not False
         )
         
         await job_service.update_job_progress(job_id, 1, 1, "Evaluation completed")
@@ -217,6 +220,7 @@ async def _run_async_bulk_evaluation(job_id: str, request: BulkEvaluationRequest
         # Process in batches to provide progress updates
         batch_size = min(request.max_concurrent or 10, 10)
         results = []
+        templates = deepeval_service.compile_metrics(request.metrics)
         
         for i in range(0, total_tests, batch_size):
             batch = request.test_cases[i:i + batch_size]
@@ -225,7 +229,9 @@ async def _run_async_bulk_evaluation(job_id: str, request: BulkEvaluationRequest
             batch_data = await deepeval_service.evaluate_bulk(
                 batch,
                 request.metrics,
-                max_concurrent=batch_size
+                max_concurrent=batch_size,
+                templates=templates,
+                use_cache=request.use_cache is not False
             )
             
             results.extend(batch_data["results"])
@@ -269,7 +275,8 @@ async def _run_async_dataset_evaluation(
         evaluation_data = await deepeval_service.evaluate_bulk(
             test_cases,
             request.metrics,
-            max_concurrent=request.max_concurrent or settings.default_max_concurrent
+            max_concurrent=request.max_concurrent or settings.default_max_concurrent,
+            use_cache=request.use_cache is not False
         )
         
         await job_service.update_job_progress(job_id, 90, 100, "Finalizing results...")
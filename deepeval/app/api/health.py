@@ -91,9 +91,12 @@ async def detailed_health_check():
                 "anthropic": health_data.get("anthropic_configured", False),
                 "google": health_data.get("google_configured", False),
             },
+            "metric_cache": health_data.get("metric_cache"),
         },
         "configuration": {
             "max_concurrent": settings.default_max_concurrent,
+            "max_concurrent_metrics": settings.max_concurrent_metrics,
+            "max_concurrent_llm_metrics": settings.max_concurrent_llm_metrics,
             "timeout": settings.default_timeout,
             "api_keys_configured": len(settings.api_keys_list),
         }
@@ -3,10 +3,10 @@ from typing import Optional
 
 from ..models.auth import User
 from ..models.evaluation import JobStatus, AsyncEvaluationResponse, JobListResponse
-from ..services.job_service import JobService
+from ..services.job_service import get_job_service
 
 router = APIRouter(prefix="/jobs", tags=["Jobs"])
-job_service = JobService()
+job_service = get_job_service()
 
 
 @router.get("/", response_model=JobListResponse)
@@ -76,7 +76,7 @@ async def get_job_stats():
     from ..auth import get_current_user
     current_user = await get_current_user()
     
-    return job_service.get_job_stats()
+    return await job_service.get_job_stats()
 
 
 @router.post("/cleanup")
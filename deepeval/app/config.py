@@ -39,6 +39,10 @@ class Settings(BaseSettings):
     google_api_key: Optional[str] = os.getenv("GOOGLE_API_KEY")
     cohere_api_key: Optional[str] = os.getenv("COHERE_API_KEY")
     
+    # Job store: "sqlite" (default), "redis" or "memory"; USE_REDIS=true also selects Redis
+    job_store_backend: str = os.getenv("JOB_STORE_BACKEND", "sqlite")
+    job_store_path: str = os.getenv("JOB_STORE_PATH", "data/jobs.db")
+    
     # Redis Configuration (optional)
     use_redis: bool = os.getenv("USE_REDIS", "false").lower() == "true"
     redis_url: str = os.getenv("REDIS_URL", "redis://localhost:6379/0")
@@ -49,6 +53,14 @@ class Settings(BaseSettings):
     
     # Evaluation Configuration
     default_max_concurrent: int = 10
+    max_concurrent_metrics: int = 5  # Metrics of one test case evaluated at once
+    max_concurrent_llm_metrics: int = 20  # LLM-judged metrics in flight across all requests
+    
+    # Metric result cache: in-memory LRU in front of SQLite (empty path keeps it in memory only)
+    metric_cache_enabled: bool = True
+    metric_cache_path: str = "data/metric_cache.db"
+    metric_cache_memory_entries: int = 10000
+    metric_cache_ttl_seconds: int = 7 * 24 * 3600
     default_timeout: int = 300  # 5 minutes
     max_file_size: int = 10 * 1024 * 1024  # 10MB
     
@@ -30,6 +30,24 @@ async def lifespan(app: FastAPI):
     # Startup
     logger.info(f"Starting {settings.app_name} v{settings.version}")
     
+    # The job store holds every async job, so the app can't run without it
+    try:
+        from .services.job_service import get_job_service
+        store = get_job_service().store
+        logger.info(f"Job store: {type(store).__name__}")
+    except Exception as e:
+        backend = "redis" if settings.use_redis else settings.job_store_backend
+        logger.error(f"Failed to open the {backend} job store: {e}")
+        raise RuntimeError(f"Job store unavailable: {e}") from e
+    
+    # Shares the data/ volume with the job store; without it, cached results don't survive a restart
+    from .services.result_cache import get_metric_cache
+    metric_cache = get_metric_cache()
+    if metric_cache is not None and metric_cache.disk_error is not None:
+        logger.error(
+            f"Metric cache is memory-only, {settings.metric_cache_path} is not writable: {metric_cache.disk_error}"
+        )
+    
     # Initialize services
     try:
         from .services.deepeval_service import DeepEvalService
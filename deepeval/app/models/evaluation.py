@@ -63,6 +63,7 @@ class EvaluationRequest(BaseModel):
     run_async: Optional[bool] = True
     ignore_errors: Optional[bool] = False
     verbose_mode: Optional[bool] = False
+    use_cache: Optional[bool] = True  # False re-runs every metric and refreshes the cached results
     
     # Job configuration
     job_name: Optional[str] = None
@@ -84,6 +85,7 @@ class BulkEvaluationRequest(BaseModel):
     ignore_errors: Optional[bool] = True
     verbose_mode: Optional[bool] = False
     max_concurrent: Optional[int] = 10
+    use_cache: Optional[bool] = True  # False re-runs every metric and refreshes the cached results
     
     # Job configuration
     job_name: Optional[str] = None
@@ -145,6 +147,7 @@ class DatasetEvaluationRequest(BaseModel):
     run_async: Optional[bool] = True
     ignore_errors: Optional[bool] = True
     max_concurrent: Optional[int] = 10
+    use_cache: Optional[bool] = True  # False re-runs every metric and refreshes the cached results
     
     # Job configuration
     job_name: Optional[str] = None
@@ -137,6 +137,8 @@ class MetricResult(BaseModel):
     
     # For arena metrics
     winner: Optional[str] = None  # "Model A" or "Model B"
+    
+    cached: bool = False  # Served from the metric result cache; cost is that of the original evaluation
 
 
 class MetricInfo(BaseModel):
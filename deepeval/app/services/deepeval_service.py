@@ -1,5 +1,7 @@
 import os
+import copy
 import asyncio
+import logging
 import time
 from typing import List, Dict, Any, Union, Optional
 from datetime import datetime
@@ -82,6 +84,57 @@ from ..models import (
     LLMTestCaseParam,
 )
 from ..config import settings
+from .result_cache import get_metric_cache, metric_cache_key
+
+logger = logging.getLogger(__name__)
+
+# Shared by every DeepEvalService instance; created on first use so it binds to the server's event loop
+_llm_semaphore: Optional[asyncio.Semaphore] = None
+
+
+def _get_llm_semaphore() -> asyncio.Semaphore:
+    """Global limit on LLM-judged metrics being evaluated at once."""
+    global _llm_semaphore
+    if _llm_semaphore is None:
+        _llm_semaphore = asyncio.Semaphore(settings.max_concurrent_llm_metrics)
+    return _llm_semaphore
+
+
+class MetricTemplate:
+    """A metric request compiled once and instantiated for each test case.
+
+    Compiling runs parameter mapping, validation and judge-model
+    construction into a prototype metric; each instance is a shallow copy
+    of it, sharing the judge model but keeping its own score, reason and
+    logs. A request that fails to compile keeps its error, raised on every
+    instantiate() so each test case reports it as before.
+    """
+    
+    def __init__(self, metric_request: MetricRequest, prototype=None, error: Optional[Exception] = None):
+        self.metric_request = metric_request
+        self.prototype = prototype
+        self.error = error
+    
+    @property
+    def judge_model(self) -> Optional[str]:
+        """Name of the resolved judge model, part of the result cache key."""
+        return getattr(self.prototype, "evaluation_model", None)
+    
+    def instantiate(self):
+        """Fresh metric instance for one evaluation."""
+        if self.error is not None:
+            raise ValueError(str(self.error))
+        return copy.copy(self.prototype)
+    
+    def learn(self, metric) -> None:
+        """Keep G-Eval steps generated from `criteria` so later instances don't ask the judge again."""
+        if (
+            self.prototype is not None
+            and getattr(self.prototype, "criteria", None)
+            and not getattr(self.prototype, "evaluation_steps", None)
+            and getattr(metric, "evaluation_steps", None)
+        ):
+            self.prototype.evaluation_steps = list(metric.evaluation_steps)
 
 
 class DeepEvalService:
@@ -507,6 +560,16 @@ class DeepEvalService:
         except Exception as e:
             raise ValueError(f"Failed to create metric {metric_type}: {str(e)}")
     
+    def compile_metrics(self, metric_requests: List[MetricRequest]) -> List[MetricTemplate]:
+        """Compile metric requests into templates to instantiate per test case."""
+        templates = []
+        for metric_request in metric_requests:
+            try:
+                templates.append(MetricTemplate(metric_request, prototype=self.create_metric(metric_request)))
+            except Exception as e:
+                templates.append(MetricTemplate(metric_request, error=e))
+        return templates
+    
     def create_test_case(self, test_case_request) -> Union[LLMTestCase, ConversationalTestCase, MLLMTestCase, ArenaTestCase]:
         """Create a DeepEval test case from request."""
         if isinstance(test_case_request, LLMTestCaseRequest):
@@ -659,27 +722,71 @@ class DeepEvalService:
     async def evaluate_single(
         self, 
         test_case_request,
-        metric_requests: List[MetricRequest]
+        metric_requests: List[MetricRequest],
+        templates: Optional[List[MetricTemplate]] = None,
+        use_cache: bool = True
     ) -> TestCaseResult:
-        """Evaluate a single test case with multiple metrics."""
+        """Evaluate a single test case with multiple metrics.
+
+        Metrics run concurrently, at most `max_concurrent_metrics` at a time
+        for this test case and `max_concurrent_llm_metrics` LLM-judged ones
+        across all requests. Results keep the order of `metric_requests`.
+        `templates` are the requests already compiled by compile_metrics().
+        
+        Results are cached by content hash; a hit is returned without
+        waiting for a concurrency slot. `use_cache=False` skips the lookup
+        but still stores the fresh result.
+        """
         start_time = time.time()
         test_case = self.create_test_case(test_case_request)
-        metric_results = []
-        
-        for metric_request in metric_requests:
-            try:
-                metric = self.create_metric(metric_request)
-                result = await self._evaluate_metric_async(metric, test_case)
-                metric_results.append(result)
-            except Exception as e:
-                error_result = MetricResult(
-                    metric_type=metric_request.metric_type.value,
-                    score=0.0,
-                    threshold=metric_request.threshold or 0.5,
-                    success=False,
-                    error=str(e)
-                )
-                metric_results.append(error_result)
+        if templates is None:
+            templates = self.compile_metrics(metric_requests)
+        semaphore = asyncio.Semaphore(settings.max_concurrent_metrics)
+        cache = get_metric_cache()
+        
+        async def evaluate_with_semaphore(template: MetricTemplate) -> MetricResult:
+            metric_request = template.metric_request
+            cache_key = None
+            if cache is not None and template.error is None:
+                cache_key = metric_cache_key(metric_request, test_case_request, template.judge_model)
+                if use_cache:
+                    try:
+                        cached = await cache.get(cache_key)
+                    except Exception as e:
+                        logger.warning(f"Metric cache lookup failed, evaluating instead: {e}")
+                        cached = None
+                    if cached is not None:
+                        return cached
+            async with semaphore:
+                try:
+                    metric = template.instantiate()
+                    # Deterministic metrics (tool and JSON correctness) have no judge model
+                    if getattr(metric, 'model', None) is None:
+                        result = await self._evaluate_metric_async(metric, test_case)
+                    else:
+                        async with _get_llm_semaphore():
+                            result = await self._evaluate_metric_async(metric, test_case)
+                    template.learn(metric)
+                except Exception as e:
+                    return MetricResult(
+                        metric_type=metric_request.metric_type.value,
+                        score=0.0,
+                        threshold=metric_request.threshold or 0.5,
+                        success=False,
+                        error=str(e)
+                    )
+            # A failed write only costs a future hit; the result is already paid for
+            if cache_key is not None and result.error is None:
+                try:
+                    await cache.set(cache_key, result)
+                except Exception as e:
+                    logger.warning(f"Metric cache write failed: {e}")
+            return result
+        
+        metric_results = await asyncio.gather(
+            *(evaluate_with_semaphore(template) for template in templates)
+        )
+        metric_results = list(metric_results)
         
         overall_success = all(result.success for result in metric_results)
         execution_time = time.time() - start_time
@@ -695,17 +802,23 @@ class DeepEvalService:
         self,
         test_case_requests: List,
         metric_requests: List[MetricRequest],
-        max_concurrent: int = 10
+        max_concurrent: int = 10,
+        templates: Optional[List[MetricTemplate]] = None,
+        use_cache: bool = True
     ) -> Dict[str, Any]:
         """Evaluate multiple test cases with multiple metrics."""
         start_time = time.time()
         
+        # Metric requests are compiled once and instantiated per test case
+        if templates is None:
+            templates = self.compile_metrics(metric_requests)
+        
         # Create semaphore for concurrency control
         semaphore = asyncio.Semaphore(max_concurrent)
         
         async def evaluate_with_semaphore(test_case_request):
             async with semaphore:
-                return await self.evaluate_single(test_case_request, metric_requests)
+                return await self.evaluate_single(test_case_request, metric_requests, templates, use_cache)
         
         # Execute evaluations concurrently
         tasks = [evaluate_with_semaphore(tc) for tc in test_case_requests]
@@ -860,6 +973,8 @@ class DeepEvalService:
             deepeval_available = False
             deepeval_version = None
         
+        metric_cache = get_metric_cache()
+        
         return {
             "deepeval_available": deepeval_available,
             "deepeval_version": deepeval_version,
@@ -867,4 +982,5 @@ class DeepEvalService:
             "anthropic_configured": bool(settings.anthropic_api_key),
             "google_configured": bool(settings.google_api_key),
             "supported_metrics": len(self._metric_registry),
+            "metric_cache": metric_cache.get_stats() if metric_cache is not None else None,
         }
@@ -0,0 +1,443 @@
+import os
+import json
+import asyncio
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from ..models.evaluation import JobStatus
+from ..config import settings
+
+
+# Columns every backend can filter on; results and summary are only loaded by get()
+JOB_FIELDS = (
+    "job_id", "status", "created_at", "started_at", "completed_at", "job_name",
+    "tags", "metadata", "results", "summary", "error", "progress",
+)
+_DATETIME_FIELDS = ("created_at", "started_at", "completed_at")
+_JSON_FIELDS = ("tags", "metadata", "results", "summary", "progress")
+_HEAVY_FIELDS = ("results", "summary")
+
+
+def _to_storage(job: Dict[str, Any]) -> Dict[str, Any]:
+    """Job dict to JSON-safe values: datetimes as ISO strings, status as its value."""
+    stored = dict(job)
+    for field in _DATETIME_FIELDS:
+        if isinstance(stored.get(field), datetime):
+            stored[field] = stored[field].isoformat()
+    if "status" in stored:
+        stored["status"] = JobStatus(stored["status"]).value
+    return stored
+
+
+def _from_storage(stored: Dict[str, Any]) -> Dict[str, Any]:
+    job = dict(stored)
+    for field in _DATETIME_FIELDS:
+        if job.get(field):
+            job[field] = datetime.fromisoformat(job[field])
+    if job.get("status"):
+        job["status"] = JobStatus(job["status"])
+    return job
+
+
+class JobStore:
+    """Where JobService keeps jobs. Jobs are dicts with the keys in JOB_FIELDS.
+
+    Implementations must make update(..., only_if_status=...) a single
+    conditional write, so a cancelled job isn't overwritten by a worker in
+    another process finishing it.
+    """
+
+    async def create(self, job: Dict[str, Any]) -> None:
+        raise NotImplementedError
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        raise NotImplementedError
+
+    async def update(
+        self,
+        job_id: str,
+        fields: Dict[str, Any],
+        only_if_status: Optional[Sequence[JobStatus]] = None
+    ) -> bool:
+        """Set `fields` on a job; False if it doesn't exist or its status isn't in `only_if_status`."""
+        raise NotImplementedError
+
+    async def delete(self, job_id: str) -> bool:
+        raise NotImplementedError
+
+    async def list(
+        self,
+        status: Optional[JobStatus] = None,
+        tag: Optional[str] = None,
+        offset: int = 0,
+        limit: int = 20
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        """Newest-first page of jobs without results and summary, and the total matching."""
+        raise NotImplementedError
+
+    async def delete_finished_before(self, cutoff: datetime) -> int:
+        """Delete completed, failed and cancelled jobs that finished before `cutoff`."""
+        raise NotImplementedError
+
+    async def stats(self, recent_cutoff: datetime) -> Dict[str, Any]:
+        raise NotImplementedError
+
+
+FINISHED_STATUSES = (JobStatus.COMPLETED, JobStatus.FAILED, JobStatus.CANCELLED)
+
+
+class MemoryJobStore(JobStore):
+    """Jobs in a dict; lost on restart and private to the process. For tests and single-shot runs."""
+
+    def __init__(self):
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        self._lock = asyncio.Lock()
+
+    async def create(self, job: Dict[str, Any]) -> None:
+        async with self._lock:
+            self._jobs[job["job_id"]] = _to_storage(job)
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        async with self._lock:
+            stored = self._jobs.get(job_id)
+            return _from_storage(json.loads(json.dumps(stored))) if stored else None
+
+    async def update(self, job_id, fields, only_if_status=None) -> bool:
+        async with self._lock:
+            stored = self._jobs.get(job_id)
+            if stored is None:
+                return False
+            if only_if_status is not None and JobStatus(stored["status"]) not in only_if_status:
+                return False
+            stored.update(_to_storage(fields))
+            return True
+
+    async def delete(self, job_id: str) -> bool:
+        async with self._lock:
+            return self._jobs.pop(job_id, None) is not None
+
+    async def list(self, status=None, tag=None, offset=0, limit=20):
+        async with self._lock:
+            jobs = [
+                {key: value for key, value in stored.items() if key not in _HEAVY_FIELDS}
+                for stored in self._jobs.values()
+                if (status is None or stored["status"] == JobStatus(status).value)
+                and (tag is None or tag in (stored.get("tags") or []))
+            ]
+        jobs.sort(key=lambda job: job["created_at"], reverse=True)
+        return [_from_storage(job) for job in jobs[offset:offset + limit]], len(jobs)
+
+    async def delete_finished_before(self, cutoff: datetime) -> int:
+        finished = {status.value for status in FINISHED_STATUSES}
+        async with self._lock:
+            expired = [
+                job_id for job_id, stored in self._jobs.items()
+                if stored["status"] in finished and stored.get("completed_at")
+                and stored["completed_at"] < cutoff.isoformat()
+            ]
+            for job_id in expired:
+                del self._jobs[job_id]
+        return len(expired)
+
+    async def stats(self, recent_cutoff: datetime) -> Dict[str, Any]:
+        async with self._lock:
+            jobs = list(self._jobs.values())
+        by_status: Dict[str, int] = {}
+        for stored in jobs:
+            by_status[stored["status"]] = by_status.get(stored["status"], 0) + 1
+        return {
+            "total_jobs": len(jobs),
+            "by_status": by_status,
+            "recent_jobs": sum(1 for stored in jobs if stored["created_at"] > recent_cutoff.isoformat()),
+        }
+
+
+class SQLiteJobStore(JobStore):
+    """Jobs in a SQLite table, indexed by status and creation time.
+
+    Survives restarts and is shared by every process on the host that
+    opens the same file (WAL mode). Queries run in a worker thread.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            " job_id TEXT PRIMARY KEY, status TEXT NOT NULL, created_at TEXT NOT NULL,"
+            " started_at TEXT, completed_at TEXT, job_name TEXT, tags TEXT, metadata TEXT,"
+            " results TEXT, summary TEXT, error TEXT, progress TEXT)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS idx_jobs_created_at ON jobs (created_at)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status_created_at ON jobs (status, created_at)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status_completed_at ON jobs (status, completed_at)")
+
+    @staticmethod
+    def _to_row(job: Dict[str, Any]) -> Dict[str, Any]:
+        row = _to_storage(job)
+        for field in _JSON_FIELDS:
+            if field in row:
+                row[field] = json.dumps(row[field]) if row[field] is not None else None
+        return row
+
+    @staticmethod
+    def _from_row(row: sqlite3.Row) -> Dict[str, Any]:
+        stored = dict(row)
+        for field in _JSON_FIELDS:
+            if stored.get(field) is not None:
+                stored[field] = json.loads(stored[field])
+        return _from_storage(stored)
+
+    def _execute(self, sql: str, params: Sequence[Any] = ()) -> sqlite3.Cursor:
+        with self._lock:
+            return self._db.execute(sql, params)
+
+    def _query(self, sql: str, params: Sequence[Any] = ()) -> List[sqlite3.Row]:
+        with self._lock:
+            return self._db.execute(sql, params).fetchall()
+
+    async def create(self, job: Dict[str, Any]) -> None:
+        row = self._to_row(job)
+        columns = [field for field in JOB_FIELDS if field in row]
+        await asyncio.to_thread(
+            self._execute,
+            f"INSERT INTO jobs ({', '.join(columns)}) VALUES ({', '.join('?' for _ in columns)})",
+            [row[column] for column in columns]
+        )
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        rows = await asyncio.to_thread(self._query, "SELECT * FROM jobs WHERE job_id = ?", (job_id,))
+        return self._from_row(rows[0]) if rows else None
+
+    async def update(self, job_id, fields, only_if_status=None) -> bool:
+        row = self._to_row(fields)
+        columns = [field for field in JOB_FIELDS if field in row and field != "job_id"]
+        sql = f"UPDATE jobs SET {', '.join(f'{column} = ?' for column in columns)} WHERE job_id = ?"
+        params = [row[column] for column in columns] + [job_id]
+        if only_if_status is not None:
+            sql += f" AND status IN ({', '.join('?' for _ in only_if_status)})"
+            params += [JobStatus(status).value for status in only_if_status]
+        cursor = await asyncio.to_thread(self._execute, sql, params)
+        return cursor.rowcount > 0
+
+    async def delete(self, job_id: str) -> bool:
+        cursor = await asyncio.to_thread(self._execute, "DELETE FROM jobs WHERE job_id = ?", (job_id,))
+        return cursor.rowcount > 0
+
+    async def list(self, status=None, tag=None, offset=0, limit=20):
+        conditions, params = [], []
+        if status is not None:
+            conditions.append("status = ?")
+            params.append(JobStatus(status).value)
+        if tag is not None:
+            conditions.append("EXISTS (SELECT 1 FROM json_each(jobs.tags) WHERE json_each.value = ?)")
+            params.append(tag)
+        where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+        columns = ", ".join(field for field in JOB_FIELDS if field not in _HEAVY_FIELDS)
+
+        rows = await asyncio.to_thread(
+            self._query,
+            f"SELECT {columns} FROM jobs{where} ORDER BY created_at DESC LIMIT ? OFFSET ?",
+            params + [limit, offset]
+        )
+        total = (await asyncio.to_thread(self._query, f"SELECT COUNT(*) FROM jobs{where}", params))[0][0]
+        return [self._from_row(row) for row in rows], total
+
+    async def delete_finished_before(self, cutoff: datetime) -> int:
+        cursor = await asyncio.to_thread(
+            self._execute,
+            "DELETE FROM jobs WHERE status IN (?, ?, ?) AND completed_at < ?",
+            [status.value for status in FINISHED_STATUSES] + [cutoff.isoformat()]
+        )
+        return cursor.rowcount
+
+    async def stats(self, recent_cutoff: datetime) -> Dict[str, Any]:
+        by_status = await asyncio.to_thread(self._query, "SELECT status, COUNT(*) FROM jobs GROUP BY status")
+        recent = await asyncio.to_thread(
+            self._query, "SELECT COUNT(*) FROM jobs WHERE created_at > ?", (recent_cutoff.isoformat(),)
+        )
+        return {
+            "total_jobs": sum(row[1] for row in by_status),
+            "by_status": {row[0]: row[1] for row in by_status},
+            "recent_jobs": recent[0][0],
+        }
+
+
+class RedisJobStore(JobStore):
+    """Jobs in Redis, shared by every process and host using the same server.
+
+    Each job is a hash (`meta` plus `results` and `summary`, which list()
+    never reads). Sorted sets scored by creation time index all jobs, jobs
+    per status and jobs per tag. `client` takes any redis.asyncio-compatible
+    client, e.g. fakeredis for tests.
+    """
+
+    def __init__(self, url: Optional[str] = None, client=None, prefix: str = "deepeval:jobs"):
+        if client is None:
+            try:
+                import redis.asyncio as redis_asyncio
+            except ImportError:
+                raise ImportError("The redis package is required for the Redis job store: pip install redis")
+            client = redis_asyncio.from_url(url or settings.redis_url, decode_responses=True)
+        self._redis = client
+        self.prefix = prefix
+
+    def _job_key(self, job_id: str) -> str:
+        return f"{self.prefix}:job:{job_id}"
+
+    def _index_key(self, status: Optional[str] = None, tag: Optional[str] = None) -> str:
+        if status is not None:
+            return f"{self.prefix}:status:{status}"
+        if tag is not None:
+            return f"{self.prefix}:tag:{tag}"
+        return f"{self.prefix}:created"
+
+    @staticmethod
+    def _score(created_at: str) -> float:
+        return datetime.fromisoformat(created_at).timestamp()
+
+    async def create(self, job: Dict[str, Any]) -> None:
+        stored = _to_storage(job)
+        meta = {key: value for key, value in stored.items() if key not in _HEAVY_FIELDS}
+        score = self._score(stored["created_at"])
+        async with self._redis.pipeline(transaction=True) as pipe:
+            pipe.hset(self._job_key(stored["job_id"]), mapping={
+                "meta": json.dumps(meta),
+                "results": json.dumps(stored.get("results")),
+                "summary": json.dumps(stored.get("summary")),
+            })
+            pipe.zadd(self._index_key(), {stored["job_id"]: score})
+            pipe.zadd(self._index_key(status=stored["status"]), {stored["job_id"]: score})
+            for tag in stored.get("tags") or []:
+                pipe.zadd(self._index_key(tag=tag), {stored["job_id"]: score})
+            await pipe.execute()
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        data = await self._redis.hgetall(self._job_key(job_id))
+        if not data:
+            return None
+        stored = json.loads(data["meta"])
+        stored["results"] = json.loads(data.get("results") or "null")
+        stored["summary"] = json.loads(data.get("summary") or "null")
+        return _from_storage(stored)
+
+    async def update(self, job_id, fields, only_if_status=None) -> bool:
+        from redis.exceptions import WatchError
+
+        key = self._job_key(job_id)
+        changes = _to_storage(fields)
+        allowed = {JobStatus(status).value for status in only_if_status} if only_if_status is not None else None
+        async with self._redis.pipeline(transaction=True) as pipe:
+            while True:
+                try:
+                    # Re-read and retry if another process changes the job between the check and the write
+                    await pipe.watch(key)
+                    raw = await pipe.hget(key, "meta")
+                    if raw is None:
+                        return False
+                    meta = json.loads(raw)
+                    if allowed is not None and meta["status"] not in allowed:
+                        return False
+                    old_status = meta["status"]
+                    meta.update({k: v for k, v in changes.items() if k not in _HEAVY_FIELDS})
+                    pipe.multi()
+                    pipe.hset(key, "meta", json.dumps(meta))
+                    for field in _HEAVY_FIELDS:
+                        if field in changes:
+                            pipe.hset(key, field, json.dumps(changes[field]))
+                    if meta["status"] != old_status:
+                        score = self._score(meta["created_at"])
+                        pipe.zrem(self._index_key(status=old_status), job_id)
+                        pipe.zadd(self._index_key(status=meta["status"]), {job_id: score})
+                    await pipe.execute()
+                    return True
+                except WatchError:
+                    continue
+
+    async def delete(self, job_id: str) -> bool:
+        from redis.exceptions import WatchError
+
+        key = self._job_key(job_id)
+        async with self._redis.pipeline(transaction=True) as pipe:
+            while True:
+                try:
+                    # Like update(): a status change after the read would leave the id in the new status index
+                    await pipe.watch(key)
+                    raw = await pipe.hget(key, "meta")
+                    if raw is None:
+                        return False
+                    meta = json.loads(raw)
+                    pipe.multi()
+                    pipe.delete(key)
+                    pipe.zrem(self._index_key(), job_id)
+                    pipe.zrem(self._index_key(status=meta["status"]), job_id)
+                    for tag in meta.get("tags") or []:
+                        pipe.zrem(self._index_key(tag=tag), job_id)
+                    results = await pipe.execute()
+                    return bool(results[0])
+                except WatchError:
+                    continue
+
+    async def _metas(self, job_ids: List[str]) -> List[Dict[str, Any]]:
+        if not job_ids:
+            return []
+        async with self._redis.pipeline(transaction=False) as pipe:
+            for job_id in job_ids:
+                pipe.hget(self._job_key(job_id), "meta")
+            raws = await pipe.execute()
+        return [json.loads(raw) for raw in raws if raw is not None]
+
+    async def list(self, status=None, tag=None, offset=0, limit=20):
+        status_value = JobStatus(status).value if status is not None else None
+        index = self._index_key(status=status_value, tag=tag if status_value is None else None)
+        if status_value is not None and tag is not None:
+            # No combined index; walk the status index and filter by tag
+            metas = await self._metas(await self._redis.zrevrange(index, 0, -1))
+            metas = [meta for meta in metas if tag in (meta.get("tags") or [])]
+            return [_from_storage(meta) for meta in metas[offset:offset + limit]], len(metas)
+
+        total = await self._redis.zcard(index)
+        job_ids = await self._redis.zrevrange(index, offset, offset + limit - 1)
+        return [_from_storage(meta) for meta in await self._metas(job_ids)], total
+
+    async def delete_finished_before(self, cutoff: datetime) -> int:
+        deleted = 0
+        for status in FINISHED_STATUSES:
+            job_ids = await self._redis.zrange(self._index_key(status=status.value), 0, -1)
+            for meta in await self._metas(job_ids):
+                if meta.get("completed_at") and meta["completed_at"] < cutoff.isoformat():
+                    deleted += await self.delete(meta["job_id"])
+        return deleted
+
+    async def stats(self, recent_cutoff: datetime) -> Dict[str, Any]:
+        by_status = {}
+        for status in JobStatus:
+            count = await self._redis.zcard(self._index_key(status=status.value))
+            if count:
+                by_status[status.value] = count
+        return {
+            "total_jobs": await self._redis.zcard(self._index_key()),
+            "by_status": by_status,
+            "recent_jobs": await self._redis.zcount(self._index_key(), recent_cutoff.timestamp(), "+inf"),
+        }
+
+
+def create_job_store() -> JobStore:
+    """Job store selected by settings: redis (also when USE_REDIS is set), sqlite or memory."""
+    backend = "redis" if settings.use_redis else settings.job_store_backend.lower()
+    if backend == "redis":
+        return RedisJobStore(settings.redis_url)
+    if backend == "memory":
+        return MemoryJobStore()
+    if backend == "sqlite":
+        return SQLiteJobStore(settings.job_store_path)
+    raise ValueError(f"Unknown job store backend: {settings.job_store_backend}")
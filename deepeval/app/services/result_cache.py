@@ -0,0 +1,182 @@
+import os
+import json
+import time
+import asyncio
+import hashlib
+import logging
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from ..models.metrics import MetricRequest, MetricResult
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+# Bump when the key payload or the stored result format changes
+CACHE_KEY_VERSION = 1
+
+# Test case fields that describe the case but are never shown to a metric
+UNEVALUATED_FIELDS = {"name", "additional_metadata", "comments", "tags"}
+
+try:
+    from importlib.metadata import version as _package_version
+    DEEPEVAL_VERSION = _package_version("deepeval")
+except Exception:
+    DEEPEVAL_VERSION = "unknown"
+
+
+def metric_cache_key(metric_request: MetricRequest, test_case_request, judge_model: Optional[str] = None) -> str:
+    """Content hash of everything a metric result depends on.
+
+    Covers the metric type and parameters, the resolved judge model, the
+    deepeval version and the test case fields a metric can read, so an
+    unchanged test case maps to the same key on every run.
+    """
+    payload = {
+        "version": CACHE_KEY_VERSION,
+        "deepeval": DEEPEVAL_VERSION,
+        "metric": metric_request.model_dump(mode="json"),
+        "judge_model": judge_model or metric_request.model,
+        "test_case_type": type(test_case_request).__name__,
+        "test_case": test_case_request.model_dump(mode="json", exclude=UNEVALUATED_FIELDS),
+    }
+    encoded = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+class MetricResultCache:
+    """Metric results by content hash: an in-memory LRU in front of SQLite.
+
+    Entries expire `ttl_seconds` after they are stored, in both tiers. A
+    result found only in SQLite is promoted to the LRU. With no `path`,
+    or when the database can't be opened, the cache is memory-only.
+    SQLite work runs in a worker thread so a lookup never blocks the
+    event loop.
+    """
+
+    def __init__(self, path: Optional[str] = None, max_memory_entries: int = 10000, ttl_seconds: int = 7 * 24 * 3600):
+        self.path = path
+        self.max_memory_entries = max_memory_entries
+        self.ttl_seconds = ttl_seconds
+        self._memory: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()  # key -> (expires_at, result JSON)
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        self._stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "stores": 0}
+        self.disk_error: Optional[str] = None
+        if path:
+            try:
+                self._db = self._open(path)
+            except (OSError, sqlite3.Error) as e:
+                self.disk_error = str(e)
+                logger.warning(f"Metric cache database {path} unavailable, caching in memory only: {e}")
+
+    @staticmethod
+    def _open(path: str) -> sqlite3.Connection:
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        try:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS metric_results ("
+                " key TEXT PRIMARY KEY, result TEXT NOT NULL, created_at REAL NOT NULL, expires_at REAL NOT NULL)"
+            )
+            db.execute("CREATE INDEX IF NOT EXISTS idx_metric_results_expires_at ON metric_results (expires_at)")
+            db.execute("DELETE FROM metric_results WHERE expires_at <= ?", (time.time(),))
+        except sqlite3.Error:
+            db.close()
+            raise
+        return db
+
+    def _remember(self, key: str, expires_at: float, result_json: str) -> None:
+        self._memory[key] = (expires_at, result_json)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def _get_memory(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.time():
+                del self._memory[key]
+                return None
+            self._memory.move_to_end(key)
+            self._stats["memory_hits"] += 1
+            return entry[1]
+
+    def _get_disk(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT result, expires_at FROM metric_results WHERE key = ? AND expires_at > ?", (key, time.time())
+            ).fetchone()
+            if row is None:
+                return None
+            self._remember(key, row[1], row[0])
+            self._stats["disk_hits"] += 1
+            return row[0]
+
+    def _set(self, key: str, result_json: str) -> None:
+        now = time.time()
+        expires_at = now + self.ttl_seconds
+        with self._lock:
+            self._remember(key, expires_at, result_json)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO metric_results (key, result, created_at, expires_at) VALUES (?, ?, ?, ?)",
+                    (key, result_json, now, expires_at)
+                )
+            self._stats["stores"] += 1
+
+    async def get(self, key: str) -> Optional[MetricResult]:
+        """Cached result for `key`, or None if missing or expired."""
+        # Memory hits stay on the event loop; they are what makes unchanged test cases fast
+        result_json = self._get_memory(key)
+        if result_json is None and self._db is not None:
+            result_json = await asyncio.to_thread(self._get_disk, key)
+        if result_json is None:
+            with self._lock:
+                self._stats["misses"] += 1
+            return None
+        result = MetricResult.model_validate_json(result_json)
+        result.cached = True
+        return result
+
+    async def set(self, key: str, result: MetricResult) -> None:
+        """Store a result; only results without an error should be cached."""
+        await asyncio.to_thread(self._set, key, result.model_dump_json(exclude={"cached"}))
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["memory_entries"] = len(self._memory)
+            if self._db is not None:
+                stats["disk_entries"] = self._db.execute("SELECT COUNT(*) FROM metric_results").fetchone()[0]
+        lookups = stats["memory_hits"] + stats["disk_hits"] + stats["misses"]
+        stats["hit_rate"] = (stats["memory_hits"] + stats["disk_hits"]) / lookups if lookups else 0.0
+        stats["path"] = self.path
+        stats["disk_error"] = self.disk_error
+        stats["ttl_seconds"] = self.ttl_seconds
+        return stats
+
+
+_metric_cache: Optional[MetricResultCache] = None
+
+
+def get_metric_cache() -> Optional[MetricResultCache]:
+    """Process-wide result cache, or None when disabled in settings."""
+    global _metric_cache
+    if not settings.metric_cache_enabled:
+        return None
+    if _metric_cache is None:
+        _metric_cache = MetricResultCache(
+            path=settings.metric_cache_path or None,
+            max_memory_entries=settings.metric_cache_memory_entries,
+            ttl_seconds=settings.metric_cache_ttl_seconds,
+        )
+    return _metric_cache
@@ -0,0 +1,120 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+import fakeredis
+
+from app.models import LLMTestCaseRequest, MetricResult
+from app.models.evaluation import EvaluationSummary, JobStatus
+from app.models.evaluation import TestCaseResult as CaseResult  # Not a test class; keeps pytest from collecting it
+from app.services.job_service import JobService
+from app.services.job_store import MemoryJobStore, RedisJobStore, SQLiteJobStore
+
+
+@pytest.fixture(params=["memory", "sqlite", "redis"])
+def open_store(request, tmp_path):
+    """Factory returning a store; calling it again reopens the same data where the backend persists it"""
+    if request.param == "memory":
+        store = MemoryJobStore()
+        return lambda: store
+    if request.param == "sqlite":
+        return lambda: SQLiteJobStore(str(tmp_path / "jobs.db"))
+    server = fakeredis.FakeServer()
+    return lambda: RedisJobStore(client=fakeredis.aioredis.FakeRedis(server=server, decode_responses=True))
+
+
+def _result() -> CaseResult:
+    return CaseResult(
+        test_case=LLMTestCaseRequest(input="question", actual_output="answer"),
+        metrics=[MetricResult(metric_type="answer_relevancy", score=1.0, threshold=0.5, success=True)],
+        overall_success=True,
+    )
+
+
+def _summary() -> EvaluationSummary:
+    return EvaluationSummary(
+        total_test_cases=1, successful_test_cases=1, failed_test_cases=0,
+        success_rate=1.0, total_execution_time=0.1,
+    )
+
+
+def test_job_lifecycle(open_store):
+    async def run():
+        service = JobService(open_store())
+        ids = [
+            await service.create_job(job_name=f"job-{i}", tags=["ci"] if i % 2 else ["nightly"], metadata={"i": i})
+            for i in range(12)
+        ]
+        await service.update_job_status(ids[0], JobStatus.RUNNING)
+        await service.update_job_progress(ids[0], 1, 2, "half way")
+        await service.complete_job(ids[0], [_result()], _summary())
+        assert await service.cancel_job(ids[1])
+        # A job that was cancelled stays cancelled when its worker fails afterwards
+        await service.fail_job(ids[1], "late failure")
+        assert not await service.cancel_job(ids[0])
+
+        service = JobService(open_store())
+        completed = await service.get_job(ids[0])
+        assert completed.status == JobStatus.COMPLETED
+        assert completed.results[0].metrics[0].score == 1.0
+        assert completed.summary.success_rate == 1.0
+        cancelled = await service.get_job(ids[1])
+        assert cancelled.status == JobStatus.CANCELLED
+        assert cancelled.error is None
+
+        page = await service.list_jobs(page=1, page_size=5)
+        assert page.total == 12
+        assert [job.job_name for job in page.jobs] == [f"job-{i}" for i in range(11, 6, -1)]
+        ci = await service.list_jobs(page=2, page_size=4, tag_filter="ci")
+        assert ci.total == 6
+        assert [job.job_name for job in ci.jobs] == ["job-3", "job-1"]
+        pending_ci = await service.list_jobs(status_filter=JobStatus.PENDING, tag_filter="ci", page_size=100)
+        assert pending_ci.total == 5
+
+        stats = await service.get_job_stats()
+        assert stats["total_jobs"] == 12
+        assert stats["by_status"][JobStatus.PENDING.value] == 10
+
+        assert await service.delete_job(ids[5])
+        assert not await service.delete_job("missing")
+        assert await service.store.delete_finished_before(datetime.now() + timedelta(seconds=1)) == 2
+        assert (await service.get_job_stats())["total_jobs"] == 9
+
+    asyncio.run(run())
+
+
+def test_redis_delete_during_status_change():
+    """A status change between delete's read and write must not leave the id in a status index"""
+    async def run():
+        server = fakeredis.FakeServer()
+        store = RedisJobStore(client=fakeredis.aioredis.FakeRedis(server=server, decode_responses=True))
+        worker = JobService(RedisJobStore(client=fakeredis.aioredis.FakeRedis(server=server, decode_responses=True)))
+        job_id = await JobService(store).create_job(job_name="racy")
+
+        changed = []
+
+        def change_after_read(hget):
+            async def wrapper(*args):
+                value = await hget(*args)
+                if not changed:
+                    changed.append(True)
+                    await worker.update_job_status(job_id, JobStatus.RUNNING)
+                return value
+            return wrapper
+
+        # The first read of the job, on the client or in a pipeline, is followed by the worker's update
+        pipeline = store._redis.pipeline
+
+        def interleaved_pipeline(*args, **kwargs):
+            pipe = pipeline(*args, **kwargs)
+            pipe.hget = change_after_read(pipe.hget)
+            return pipe
+
+        store._redis.hget = change_after_read(store._redis.hget)
+        store._redis.pipeline = interleaved_pipeline
+        assert await store.delete(job_id)
+        stats = await worker.get_job_stats()
+        assert stats["total_jobs"] == 0
+        assert stats["by_status"] == {}
+
+    asyncio.run(run())